@@ -1,19 +1,111 @@
+import threading
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
 from sqlmodel import SQLModel, create_engine, Session
 from app.deps import get_settings
 
 settings = get_settings()
 
-engine = create_engine(
-    settings.db_url,
-    echo=settings.debug,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.db_url else {}
-)
+_SQLITE_JOURNAL_MODES = {"WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"}
+_SQLITE_SYNCHRONOUS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+def _is_sqlite_memory(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+def _engine_kwargs(url: str) -> dict:
+    """Connection and pool options; in-memory SQLite keeps SQLAlchemy's single-connection pool"""
+    kwargs = {"echo": settings.debug}
+    if _is_sqlite(url):
+        kwargs["connect_args"] = {
+            "check_same_thread": False,
+            # sqlite3's own lock wait, in seconds; busy_timeout below covers later statements
+            "timeout": settings.sqlite_busy_timeout_ms / 1000,
+        }
+    if not _is_sqlite_memory(url):
+        kwargs.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_pre_ping=not _is_sqlite(url),
+        )
+    return kwargs
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def _validated_pragmas():
+    journal_mode = settings.sqlite_journal_mode.upper()
+    synchronous = settings.sqlite_synchronous.upper()
+    if journal_mode not in _SQLITE_JOURNAL_MODES:
+        raise RuntimeError(f"Unsupported SQLITE_JOURNAL_MODE: {settings.sqlite_journal_mode}")
+    if synchronous not in _SQLITE_SYNCHRONOUS:
+        raise RuntimeError(f"Unsupported SQLITE_SYNCHRONOUS: {settings.sqlite_synchronous}")
+    return journal_mode, synchronous
+
+def _create_engine():
+    engine = create_engine(settings.db_url, **_engine_kwargs(settings.db_url))
+    if not _is_sqlite(settings.db_url):
+        return engine
+    journal_mode, synchronous = _validated_pragmas()
+
+    @event.listens_for(engine, "connect")
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+        """WAL lets readers run alongside a writer; busy_timeout makes writers queue instead of failing"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        if not _is_sqlite_memory(settings.db_url):
+            cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+            cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+        cursor.execute(f"PRAGMA synchronous={synchronous}")
+        # Negative cache_size is in KiB rather than pages
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kb)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+    return engine
+
+def get_engine():
+    """The process-wide engine, created on first use rather than at import time"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _create_engine()
+    return _engine
+
+def __getattr__(name):
+    # Keeps ``from app.db import engine`` working for scripts; it creates the engine when imported
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def create_all():
-    """Create all database tables"""
-    SQLModel.metadata.create_all(engine)
+    """Create all database tables, upgrade older ones, and add any indexes missing from existing tables"""
+    engine = get_engine()
+    try:
+        SQLModel.metadata.create_all(engine)
+    except OperationalError as e:
+        # Several workers starting at once can race on CREATE TABLE; the loser retries
+        if "already exists" not in str(e):
+            raise
+        SQLModel.metadata.create_all(engine)
+    # Tables created by earlier versions are brought up to the models before their indexes are checked
+    from app.migrations import upgrade
+
+    upgrade(engine)
+    # create_all skips tables that exist, so indexes added to a model later are created here
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(engine, checkfirst=True)
+            except OperationalError as e:
+                if "already exists" not in str(e):
+                    raise
 
 def get_session():
     """Dependency to get database session"""
-    with Session(engine) as session:
+    with Session(get_engine()) as session:
         yield session
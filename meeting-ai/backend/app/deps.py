@@ -1,12 +1,10 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 from pathlib import Path
 import os
 from app.providers.base import BaseProvider
-from app.providers.openai_provider import OpenAIProvider
-from app.providers.hf_provider import HFProvider
-from app.providers.mock_provider import MockProvider
+from app.providers.registry import load_provider_class
 
 class Settings(BaseSettings):
     # Resolve .env relative to the backend root regardless of current working directory
@@ -19,36 +17,152 @@ class Settings(BaseSettings):
     hf_token: Optional[str] = Field(default=None, alias="HF_TOKEN")
     provider: str = Field(default="openai", alias="PROVIDER")
     db_url: str = Field(default="sqlite:///./app.db", alias="DB_URL")
+    # Connection pool per worker process
+    db_pool_size: int = Field(default=5, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, alias="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(default=30.0, alias="DB_POOL_TIMEOUT")
+    # SQLite pragmas applied on every new connection
+    sqlite_journal_mode: str = Field(default="WAL", alias="SQLITE_JOURNAL_MODE")
+    sqlite_synchronous: str = Field(default="NORMAL", alias="SQLITE_SYNCHRONOUS")
+    sqlite_busy_timeout_ms: int = Field(default=5000, alias="SQLITE_BUSY_TIMEOUT_MS")
+    sqlite_mmap_size: int = Field(default=256 * 1024 * 1024, alias="SQLITE_MMAP_SIZE")
+    sqlite_cache_size_kb: int = Field(default=32 * 1024, alias="SQLITE_CACHE_SIZE_KB")
     host: str = Field(default="0.0.0.0", alias="HOST")
     port: int = Field(default=8000, alias="PORT")
+    # uvicorn worker processes when started with `python -m app.main` or `make serve`
+    workers: int = Field(default=1, alias="WEB_CONCURRENCY")
     debug: bool = Field(default=True, alias="DEBUG")
     allowed_origins: str = Field(
         default="http://localhost:5173,http://127.0.0.1:5173,http://localhost:3000",
         alias="ALLOWED_ORIGINS",
     )
+    # Minimum share of obligation phrases the rule-based extractor must attribute
+    # before providers are told to skip LLM action extraction
+    action_extractor_min_confidence: float = Field(default=0.8, alias="ACTION_EXTRACTOR_MIN_CONFIDENCE")
+    # Trigram similarity at which a seeded action item is merged into an open item instead of added
+    action_merge_threshold: float = Field(default=0.7, alias="ACTION_MERGE_THRESHOLD")
+    # Approximate prompt-token ceiling for the compacted transcript (0 disables the cap)
+    summary_token_budget: int = Field(default=6000, alias="SUMMARY_TOKEN_BUDGET")
+    # Downmix/resample/silence-trim WAV uploads before transcription
+    audio_preprocess: bool = Field(default=True, alias="AUDIO_PREPROCESS")
+    audio_min_silence_ms: int = Field(default=700, alias="AUDIO_MIN_SILENCE_MS")
+    # Uploads up to this size are handed to providers from memory; larger ones spill to a temp file
+    audio_spool_max_bytes: int = Field(default=8 * 1024 * 1024, alias="AUDIO_SPOOL_MAX_BYTES")
+    # Live transcription: seconds of audio per provider request, and windows allowed to wait for the provider
+    live_window_sec: float = Field(default=15.0, alias="LIVE_WINDOW_SEC")
+    live_max_pending_windows: int = Field(default=4, alias="LIVE_MAX_PENDING_WINDOWS")
+    # Fold live text into the rolling summary after this many windows (0 disables)
+    live_summary_every_windows: int = Field(default=0, alias="LIVE_SUMMARY_EVERY_WINDOWS")
+    # Transcripts older than this are moved to append-only segment files by scripts/offload_transcripts.py
+    transcript_cold_after_days: int = Field(default=90, alias="TRANSCRIPT_COLD_AFTER_DAYS")
+    transcript_segment_dir: str = Field(default="./transcript_segments", alias="TRANSCRIPT_SEGMENT_DIR")
+    # Memory-mapped vectors for semantic search over summaries and action items
+    search_index_dir: str = Field(default="./search_index", alias="SEARCH_INDEX_DIR")
+    # Job specs and per-meeting checkpoints for batch summarization
+    batch_checkpoint_dir: str = Field(default="./batch_jobs", alias="BATCH_CHECKPOINT_DIR")
+    # Provider usage ledger: rows are buffered and written in batches every interval
+    usage_ledger: bool = Field(default=True, alias="USAGE_LEDGER")
+    usage_flush_interval_sec: float = Field(default=2.0, alias="USAGE_FLUSH_INTERVAL_SEC")
+    usage_max_buffer: int = Field(default=10000, alias="USAGE_MAX_BUFFER")
+    # How long a finished transcribe/summarize response is replayed for a repeated Idempotency-Key
+    idempotency_ttl_sec: int = Field(default=3600, alias="IDEMPOTENCY_TTL_SEC")
+    # Request deadlines; clients may ask for less with X-Request-Timeout, up to the maximum
+    transcribe_timeout_sec: float = Field(default=300.0, alias="TRANSCRIBE_TIMEOUT_SEC")
+    summarize_timeout_sec: float = Field(default=120.0, alias="SUMMARIZE_TIMEOUT_SEC")
+    max_request_timeout_sec: float = Field(default=600.0, alias="MAX_REQUEST_TIMEOUT_SEC")
+    # Per upstream request timeout; shortened to what is left of the request deadline
+    provider_timeout_sec: float = Field(default=120.0, alias="PROVIDER_TIMEOUT_SEC")
+    # Retries of connection errors, rate limits and 5xx per upstream request, each counted in the ledger
+    provider_max_retries: int = Field(default=2, alias="PROVIDER_MAX_RETRIES")
+    # PROVIDER=router spreads calls over these comma-separated providers by latency and health
+    router_backends: str = Field(default="", alias="ROUTER_BACKENDS")
+    # Consecutive failures that take a backend out of rotation, and for how long
+    router_failure_threshold: int = Field(default=3, alias="ROUTER_FAILURE_THRESHOLD")
+    router_cooldown_sec: float = Field(default=30.0, alias="ROUTER_COOLDOWN_SEC")
+    # Also send a call to the next backend once it has run this long (0 disables hedging)
+    router_hedge_after_ms: float = Field(default=0.0, alias="ROUTER_HEDGE_AFTER_MS")
+    # Request profiling is off unless a sample rate or an admin token for the X-Profile header is set
+    profile_sample_rate: float = Field(default=0.0, alias="PROFILE_SAMPLE_RATE")
+    profile_admin_token: str = Field(default="", alias="PROFILE_ADMIN_TOKEN")
+    profile_buffer_size: int = Field(default=100, alias="PROFILE_BUFFER_SIZE")
+    profile_interval_ms: float = Field(default=5.0, alias="PROFILE_INTERVAL_MS")
+    # Change feed: how often each process looks for writes made elsewhere, and how much log to keep
+    change_poll_sec: float = Field(default=1.0, alias="CHANGE_POLL_SEC")
+    change_log_max_rows: int = Field(default=100000, alias="CHANGE_LOG_MAX_ROWS")
 
 settings = Settings()
 
+# Providers hold HTTP clients, so one instance per backend and credential is reused across requests
+_providers: Dict[Tuple[str, str], BaseProvider] = {}
+# Other spellings accepted for built-in providers, in PROVIDER and ROUTER_BACKENDS alike
+_PROVIDER_ALIASES = {"huggingface": "hf", "hugging_face": "hf"}
+
+def _provider_name(name: str) -> str:
+    name = name.lower().strip()
+    return _PROVIDER_ALIASES.get(name, name)
+
 def get_provider() -> BaseProvider:
-    """Factory function to get the appropriate AI provider"""
-    provider_name = settings.provider.lower().strip()
+    """Factory function to get the appropriate AI provider.
 
+    Only the configured backend is imported, on first use.
+    """
+    provider_name = _provider_name(settings.provider)
+    if provider_name == "router":
+        return _router()
+    return _backend(provider_name)
+
+def _backend(provider_name: str) -> BaseProvider:
     if provider_name == "openai":
         # Prefer explicit env var, fallback to .env value
         api_key = (os.getenv("OPENAI_API_KEY") or settings.openai_api_key or "").strip()
         if not api_key:
             # Fail fast with clear message rather than silently using Mock
             raise RuntimeError("OPENAI_API_KEY is not configured but PROVIDER=openai is set.")
-        return OpenAIProvider(api_key)
+        return _cached("openai", api_key)
 
-    if provider_name in ("hf", "huggingface", "hugging_face"):
+    if provider_name == "hf":
         token = (os.getenv("HF_TOKEN") or settings.hf_token or "").strip()
         if not token:
             raise RuntimeError("HF_TOKEN is not configured but PROVIDER=hf is set.")
-        return HFProvider(token)
+        return _cached("hf", token)
+
+    # Providers from installed packages take no credentials here and read their own config
+    if provider_name not in ("", "mock") and load_provider_class(provider_name) is not None:
+        return _cached(provider_name)
+
+    # Default to Mock only when provider is not explicitly OpenAI/HF or registered
+    return _cached("mock")
+
+def _router() -> BaseProvider:
+    # Aliases resolve to one backend, so "hf,huggingface" does not route to the same one twice
+    names = list(dict.fromkeys(_provider_name(name) for name in settings.router_backends.split(",") if name.strip()))
+    if not names:
+        raise RuntimeError("ROUTER_BACKENDS is not configured but PROVIDER=router is set.")
+    key = ("router", ",".join(names))
+    provider = _providers.get(key)
+    if provider is None:
+        from app.providers.routing import RoutingProvider
+
+        for name in names:
+            # Unlike PROVIDER, a typo here must not quietly route calls to Mock
+            if load_provider_class(name) is None:
+                raise RuntimeError(f"Unknown provider '{name}' in ROUTER_BACKENDS.")
+        # Backends are metered individually, so the ledger shows which one served each call
+        provider = RoutingProvider([(name, _backend(name)) for name in names])
+        _providers[key] = provider
+    return provider
+
+def _cached(name: str, credential: str = "") -> BaseProvider:
+    key = (name, credential)
+    provider = _providers.get(key)
+    if provider is None:
+        # Imported here: the ledger it writes to reads these settings
+        from app.providers.metered import MeteredProvider
 
-    # Default to Mock only when provider is not explicitly OpenAI/HF
-    return MockProvider()
+        cls = load_provider_class(name)
+        provider = MeteredProvider(cls(credential) if credential else cls(), name)
+        _providers[key] = provider
+    return provider
 
 def get_settings() -> Settings:
     return settings
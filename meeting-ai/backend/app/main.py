@@ -1,19 +1,28 @@
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.db import create_all
-from app.routers import meetings, transcribe, summarize, actions
+from app.services.action_rollups import ensure_rollups
+from app.services.deadline import ClientDisconnected, DeadlineExceeded, InvalidTimeout
+from app.services.profiling import install_profiling, profiles
+from app.services.changes import changes
+from app.services.usage import ledger
+from app.routers import meetings, transcribe, summarize, actions, analytics, export, search, usage, changes as changes_router
 from app.deps import get_provider, get_settings
 from app.providers.base import BaseProvider
+from typing import Optional
 import os
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     create_all()
+    ensure_rollups()
     yield
-    # Shutdown
-    pass
+    # Shutdown: write usage rows still waiting for the next flush
+    await changes.stop()
+    await ledger.stop()
 
 app = FastAPI(
     title="Meeting Summarizer API",
@@ -31,12 +40,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Only added when PROFILE_SAMPLE_RATE or PROFILE_ADMIN_TOKEN is set
+install_profiling(app)
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+    return JSONResponse(status_code=504, content={"detail": "Deadline exceeded"})
+
+@app.exception_handler(ClientDisconnected)
+async def client_disconnected_handler(request: Request, exc: ClientDisconnected):
+    # Nobody reads this; 499 (client closed request) marks the cancellation in access logs
+    return JSONResponse(status_code=499, content={"detail": "Client disconnected"})
+
+@app.exception_handler(InvalidTimeout)
+async def invalid_timeout_handler(request: Request, exc: InvalidTimeout):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
 
 # Include routers
 app.include_router(meetings.router, prefix="/api", tags=["meetings"])
 app.include_router(transcribe.router, prefix="/api", tags=["transcribe"])
 app.include_router(summarize.router, prefix="/api", tags=["summarize"])
 app.include_router(actions.router, prefix="/api", tags=["actions"])
+app.include_router(analytics.router, prefix="/api", tags=["analytics"])
+app.include_router(export.router, prefix="/api", tags=["export"])
+app.include_router(search.router, prefix="/api", tags=["search"])
+app.include_router(usage.router, prefix="/api", tags=["usage"])
+app.include_router(changes_router.router, prefix="/api", tags=["changes"])
 
 @app.get("/health")
 async def health_check():
@@ -46,6 +75,34 @@ async def health_check():
 async def debug_provider_root(provider: BaseProvider = Depends(get_provider)):
     return {"provider": provider.get_provider_name()}
 
+@app.get("/api/debug/routing")
+async def debug_routing(
+    limit: int = Query(50, ge=0, le=200, description="Most recent routing decisions to include"),
+    provider: BaseProvider = Depends(get_provider)
+):
+    """Backend health and recent decisions when PROVIDER=router"""
+    from app.providers.routing import RoutingProvider
+
+    if not isinstance(provider, RoutingProvider):
+        return {"provider": provider.get_provider_name(), "routing": False}
+    return {"routing": True, **provider.snapshot(limit)}
+
+@app.get("/api/debug/profiles")
+async def debug_profiles(
+    path: Optional[str] = Query(None, description="Only requests whose path starts with this"),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """Recently profiled requests in this process, newest first"""
+    return [profile.summary() for profile in profiles.list(path, limit)]
+
+@app.get("/api/debug/profiles/{profile_id}")
+async def debug_profile(profile_id: str):
+    """Span timeline and sampled call stacks of one profiled request"""
+    profile = profiles.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile.detail()
+
 @app.get("/api/debug/settings")
 async def debug_settings():
     settings = get_settings()
@@ -58,4 +115,6 @@ async def debug_settings():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    settings = get_settings()
+    # Multiple workers need an import string so each process builds its own app and engine
+    uvicorn.run("app.main:app", host=settings.host, port=settings.port, workers=settings.workers)
@@ -0,0 +1,170 @@
+"""In-place upgrades for SQLite databases created by earlier versions.
+
+``create_all`` adds missing tables and indexes but never changes a table that
+already exists. The steps here bring older tables up to the current models.
+Each step checks the live schema first, so running them again does nothing:
+
+- ``transcript.text`` is compressed into ``TranscriptBody`` (with synthesized
+  segments), and the table is rebuilt without the column;
+- ``transcript.meeting_id`` and ``summary.meeting_id`` become unique; when a
+  meeting has several rows, the newest one is kept and the others are moved,
+  unchanged, to ``transcript_duplicate`` and ``summary_duplicate`` (with the
+  bodies and segments of moved transcripts in ``transcriptbody_duplicate``
+  and ``transcriptsegment_duplicate``), so nothing is lost;
+- ``actionitem.source`` is added, as ``manual`` for existing items, so
+  re-summarization never deletes items it did not seed.
+
+Everything runs in one ``BEGIN IMMEDIATE`` transaction. Workers starting
+together therefore wait for each other, and the later ones find nothing to
+do. Other databases are expected to be created from the current models.
+"""
+
+import logging
+from typing import List, Set
+
+from sqlalchemy import MetaData
+from sqlalchemy.schema import CreateTable
+from sqlmodel import SQLModel
+
+from app.models import Transcript, Summary
+
+logger = logging.getLogger("uvicorn.error")
+
+# Tables whose meeting_id must be unique, and whose older rows are set aside for the newest
+_ONE_PER_MEETING = (Transcript.__table__, Summary.__table__)
+# Rows that belong to a transcript and are set aside with it
+_TRANSCRIPT_CHILDREN = ("transcriptbody", "transcriptsegment")
+
+
+def _columns(cursor, table: str) -> List[str]:
+    return [row[1] for row in cursor.execute(f'PRAGMA table_info("{table}")').fetchall()]
+
+
+def _has_unique(cursor, table: str, column: str) -> bool:
+    for _, name, unique, *_ in cursor.execute(f'PRAGMA index_list("{table}")').fetchall():
+        if unique and [row[2] for row in cursor.execute(f'PRAGMA index_info("{name}")').fetchall()] == [column]:
+            return True
+    return False
+
+
+def _set_aside(cursor, table: str, where: str) -> int:
+    """Move the rows of ``table`` matching ``where`` to ``<table>_duplicate``, columns as they are"""
+    aside = f"{table}_duplicate"
+    cursor.execute(f'CREATE TABLE IF NOT EXISTS "{aside}" AS SELECT * FROM "{table}" WHERE 0')
+    cursor.execute(f'INSERT INTO "{aside}" SELECT * FROM "{table}" WHERE {where}')
+    return cursor.execute(f'DELETE FROM "{table}" WHERE {where}').rowcount
+
+
+def _set_aside_older(cursor, table) -> int:
+    """Set aside every row but the newest of meetings with several; returns rows moved"""
+    older = f'id NOT IN (SELECT MAX(id) FROM "{table.name}" GROUP BY meeting_id)'
+    if table.name == "transcript":
+        moved = f"transcript_id IN (SELECT id FROM transcript WHERE {older})"
+        for child in _TRANSCRIPT_CHILDREN:
+            _set_aside(cursor, child, moved)
+    return _set_aside(cursor, table.name, older)
+
+
+def _rebuild(cursor, dialect, table) -> None:
+    """Recreate ``table`` from its model, copying the columns both versions share.
+
+    Follows SQLite's documented procedure (create new, copy, drop old, rename
+    new), so foreign keys in other tables keep pointing at the table name.
+    Indexes are recreated afterwards by ``create_all``.
+    """
+    # The copy lives in its own metadata so it can refer to the other tables without joining the app's
+    metadata = MetaData()
+    for t in SQLModel.metadata.sorted_tables:
+        t.to_metadata(metadata)
+    staged = table.to_metadata(metadata, name=f"{table.name}_new")
+    staged.indexes.clear()
+
+    existing = set(_columns(cursor, table.name))
+    shared = ", ".join(f'"{c.name}"' for c in table.columns if c.name in existing)
+    cursor.execute(str(CreateTable(staged).compile(dialect=dialect)))
+    cursor.execute(f'INSERT INTO "{staged.name}" ({shared}) SELECT {shared} FROM "{table.name}"')
+    cursor.execute(f'DROP TABLE "{table.name}"')
+    cursor.execute(f'ALTER TABLE "{staged.name}" RENAME TO "{table.name}"')
+
+
+def _move_transcript_text(cursor) -> int:
+    """Compress ``transcript.text`` into bodies and segments for transcripts that have none"""
+    from app.services.segments import segment_spans
+    from app.services.transcript_store import compress
+
+    rows = cursor.execute(
+        "SELECT id, text, duration_sec FROM transcript "
+        "WHERE id NOT IN (SELECT transcript_id FROM transcriptbody)"
+    ).fetchall()
+    for transcript_id, text, duration_sec in rows:
+        text = text or ""
+        codec, data = compress(text)
+        cursor.execute(
+            "INSERT INTO transcriptbody (transcript_id, codec, size, data) VALUES (?, ?, ?, ?)",
+            (transcript_id, codec, len(text.encode("utf-8")), data),
+        )
+        if cursor.execute("SELECT 1 FROM transcriptsegment WHERE transcript_id = ? LIMIT 1",
+                          (transcript_id,)).fetchone() is None:
+            cursor.executemany(
+                "INSERT INTO transcriptsegment (transcript_id, idx, start_sec, end_sec, char_start, char_end) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(transcript_id, *span) for span in segment_spans(text, [], duration_sec)],
+            )
+    return len(rows)
+
+
+def _pending(cursor) -> Set[str]:
+    pending = set()
+    if "text" in _columns(cursor, "transcript"):
+        pending.add("transcript_text")
+    for table in _ONE_PER_MEETING:
+        if not _has_unique(cursor, table.name, "meeting_id"):
+            pending.add(f"{table.name}_unique")
+    if "source" not in _columns(cursor, "actionitem"):
+        pending.add("actionitem_source")
+    return pending
+
+
+def upgrade(engine) -> None:
+    """Apply the steps the database still needs; called by ``create_all`` once the tables exist"""
+    if engine.dialect.name != "sqlite":
+        return
+    raw = engine.raw_connection()
+    try:
+        connection = raw.driver_connection
+        cursor = connection.cursor()
+        if not _pending(cursor):
+            return
+        # Manual transaction control, so the DDL below is part of it too
+        isolation_level = connection.isolation_level
+        connection.isolation_level = None
+        try:
+            cursor.execute("PRAGMA foreign_keys=OFF")
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                pending = _pending(cursor)  # another worker may have finished while we waited
+                if "transcript_text" in pending:
+                    moved = _move_transcript_text(cursor)
+                    logger.info("Moved the text of %d transcripts into compressed bodies", moved)
+                    pending.add("transcript_unique")  # the rebuild that drops the column adds the constraint
+                for table in _ONE_PER_MEETING:
+                    if f"{table.name}_unique" in pending:
+                        moved = _set_aside_older(cursor, table)
+                        if moved:
+                            logger.warning(
+                                "Moved %d older %s rows of meetings that had several to %s_duplicate; "
+                                "review them there", moved, table.name, table.name,
+                            )
+                        _rebuild(cursor, engine.dialect, table)
+                if "actionitem_source" in pending:
+                    cursor.execute("ALTER TABLE actionitem ADD COLUMN source VARCHAR(20) NOT NULL DEFAULT 'manual'")
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            if pending:
+                logger.info("Upgraded database schema: %s", ", ".join(sorted(pending)))
+        finally:
+            connection.isolation_level = isolation_level
+    finally:
+        raw.close()
@@ -1,5 +1,5 @@
 from sqlmodel import SQLModel, Field
-from sqlalchemy import Column, JSON
+from sqlalchemy import Column, JSON, LargeBinary, Index, UniqueConstraint
 from datetime import datetime, date
 from typing import Optional, List
 
@@ -10,25 +10,154 @@ class Meeting(SQLModel, table=True):
 
 class Transcript(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    meeting_id: int = Field(foreign_key="meeting.id")
-    text: str
+    meeting_id: int = Field(foreign_key="meeting.id", unique=True)
     duration_sec: Optional[int] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+class TranscriptBody(SQLModel, table=True):
+    """Compressed transcript text, kept apart so metadata scans never load it.
+
+    ``data`` holds the compressed bytes while the transcript is hot; once
+    offloaded to the cold tier it is cleared and ``segment``/``offset``/``length``
+    locate the bytes in an append-only segment file instead.
+    """
+    transcript_id: int = Field(foreign_key="transcript.id", primary_key=True)
+    codec: str = Field(default="zlib", max_length=10)
+    size: int = 0  # uncompressed length in bytes
+    data: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary))
+    segment: Optional[str] = Field(default=None, max_length=64)
+    offset: Optional[int] = None
+    length: Optional[int] = None
+
+class TranscriptSegment(SQLModel, table=True):
+    """A timed span of a transcript; text is sliced from the body by character offsets"""
+    __table_args__ = (
+        UniqueConstraint("transcript_id", "idx"),
+        Index("ix_transcriptsegment_transcript_start", "transcript_id", "start_sec"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    transcript_id: int = Field(foreign_key="transcript.id")
+    idx: int
+    start_sec: float
+    end_sec: float
+    char_start: int
+    char_end: int
+
 class Summary(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    meeting_id: int = Field(foreign_key="meeting.id")
+    meeting_id: int = Field(foreign_key="meeting.id", unique=True)
     bullets: List[str] = Field(default_factory=list, sa_column=Column(JSON))
     decisions: List[str] = Field(default_factory=list, sa_column=Column(JSON))
     risks: List[str] = Field(default_factory=list, sa_column=Column(JSON))
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class ActionItem(SQLModel, table=True):
+    # Overdue lists range-scan by status and due date, per assignee with the second index
+    __table_args__ = (
+        Index("ix_actionitem_status_due_date", "status", "due_date"),
+        Index("ix_actionitem_assignee_status", "assignee", "status", "due_date"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    meeting_id: int = Field(foreign_key="meeting.id")
+    meeting_id: int = Field(foreign_key="meeting.id", index=True)
     text: str = Field(max_length=500)
     assignee: Optional[str] = Field(default=None, max_length=100)
     due_date: Optional[date] = None
     status: str = Field(default="open", max_length=20)  # open, in_progress, completed, cancelled
+    source: str = Field(default="manual", max_length=20)  # manual, summary (seeded by summarization)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class SummaryState(SQLModel, table=True):
+    """How much of a meeting's transcript the rolling summary already covers"""
+    meeting_id: int = Field(foreign_key="meeting.id", primary_key=True)
+    chars_covered: int = 0  # characters of transcript text folded into the summary
+    updates: int = 0
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class ActionBand(SQLModel, table=True):
+    """One MinHash LSH band of an action item's text; items sharing a bucket are likely near duplicates"""
+    __table_args__ = (Index("ix_actionband_bucket", "bucket"),)
+
+    action_id: int = Field(foreign_key="actionitem.id", primary_key=True)
+    band: int = Field(primary_key=True)
+    bucket: int  # hash of the band's signature values, salted with the band number
+
+class ActionMention(SQLModel, table=True):
+    """A meeting whose summary repeated an action item that already exists in another meeting"""
+    __table_args__ = (UniqueConstraint("action_id", "meeting_id"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    action_id: int = Field(foreign_key="actionitem.id", index=True)
+    meeting_id: int = Field(foreign_key="meeting.id", index=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class ActionCount(SQLModel, table=True):
+    """Rollup: number of action items per assignee and status, updated on every action write"""
+    assignee: str = Field(default="", primary_key=True, max_length=100)  # "" for unassigned
+    status: str = Field(primary_key=True, max_length=20)
+    count: int = 0
+
+class ActionDueCount(SQLModel, table=True):
+    """Rollup: number of action items per status and due date (``date.min`` when there is none)"""
+    status: str = Field(primary_key=True, max_length=20)
+    due_date: date = Field(primary_key=True)
+    count: int = 0
+
+class ActionWeek(SQLModel, table=True):
+    """Rollup: action items opened and closed per week (keyed by the Monday), for burn-down charts.
+
+    Summing ``created - closed + reopened - removed`` up to a week gives the
+    number of items still open at its end.
+    """
+    week: date = Field(primary_key=True)
+    created: int = 0
+    closed: int = 0  # moved to completed or cancelled
+    reopened: int = 0  # moved back out of completed or cancelled
+    removed: int = 0  # deleted while still open
+
+class ProviderUsage(SQLModel, table=True):
+    """Ledger row for one provider call, or for a request answered from cache without one.
+
+    ``meeting_id`` is not a foreign key so cost history outlives deleted meetings.
+    """
+    __table_args__ = (
+        Index("ix_providerusage_created_at", "created_at"),
+        Index("ix_providerusage_meeting_created_at", "meeting_id", "created_at"),
+        Index("ix_providerusage_model_created_at", "model", "created_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    meeting_id: Optional[int] = None
+    operation: str = Field(max_length=40)  # transcribe, summarize, summarize_update
+    source: Optional[str] = Field(default=None, max_length=20)  # api, batch, live
+    provider: str = Field(max_length=50)  # registry name, or "cache"
+    model: Optional[str] = Field(default=None, max_length=100)
+    status: str = Field(default="ok", max_length=20)  # ok, error, timeout, cancelled, cached
+    cache_hit: bool = False
+    retries: int = 0
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    total_tokens: Optional[int] = None
+    audio_seconds: Optional[float] = None
+    latency_ms: float = 0.0
+    error: Optional[str] = Field(default=None, max_length=300)
+
+class ChangeEvent(SQLModel, table=True):
+    """Append-only log of writes behind the change feed.
+
+    ``seq`` is never reused, so clients can resume from the last one they saw.
+    ``data`` is the entity as the API returns it (transcripts without text);
+    deletes carry no data.
+    """
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq: Optional[int] = Field(default=None, primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    entity: str = Field(max_length=20)  # meeting, transcript, summary, action
+    entity_id: int
+    meeting_id: Optional[int] = None
+    op: str = Field(max_length=10)  # upsert, delete
+    data: Optional[dict] = Field(default=None, sa_column=Column(JSON))
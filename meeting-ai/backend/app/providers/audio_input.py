@@ -0,0 +1,118 @@
+"""Audio handed to providers as a stream rather than a path.
+
+``AudioInput`` wraps a binary file object, usually a
+``SpooledTemporaryFile``, so small recordings stay in memory and large ones
+spill to an anonymous temporary file that is removed when closed. Providers
+can read it, pass the file object to an HTTP client, or iterate ``chunks()``
+to stream it upstream. ``as_path()`` is the adapter for providers that still
+need a filename on disk.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, BinaryIO, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+# Default in-memory limit before a spooled buffer moves to disk
+DEFAULT_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+CHUNK_BYTES = 64 * 1024
+
+
+class AudioInput:
+    def __init__(self, file: BinaryIO, filename: str, content_type: str, size: Optional[int] = None):
+        self.file = file
+        # Hex SHA-256 of the content, when it was computed while copying
+        self.sha256: Optional[str] = None
+        self.filename = os.path.basename(filename or "audio") or "audio"
+        self.content_type = content_type or "application/octet-stream"
+        if size is None:
+            file.seek(0, os.SEEK_END)
+            size = file.tell()
+        self.size = size
+
+    @classmethod
+    def from_bytes(
+        cls, data: bytes, filename: str, content_type: str, spool_max_bytes: int = DEFAULT_SPOOL_MAX_BYTES
+    ) -> "AudioInput":
+        spool = tempfile.SpooledTemporaryFile(max_size=spool_max_bytes)
+        spool.write(data)
+        return cls(spool, filename, content_type, size=len(data))
+
+    @classmethod
+    async def from_file(
+        cls, file: BinaryIO, filename: str, content_type: str, spool_max_bytes: int = DEFAULT_SPOOL_MAX_BYTES
+    ) -> "AudioInput":
+        """A private copy of ``file``, for audio that must outlive whoever owns ``file``.
+
+        The content is hashed during the copy, into ``sha256``.
+        """
+        spool = tempfile.SpooledTemporaryFile(max_size=spool_max_bytes)
+        file.seek(0)
+        digest = await run_in_threadpool(_copy_hashing, file, spool)
+        audio = cls(spool, filename, content_type)
+        audio.sha256 = digest
+        return audio
+
+    @classmethod
+    def from_path(cls, path: str, content_type: str = "application/octet-stream") -> "AudioInput":
+        return cls(open(path, "rb"), path, content_type)
+
+    def open(self) -> BinaryIO:
+        """The underlying file, rewound; callers must not close it"""
+        self.file.seek(0)
+        return self.file
+
+    def peek(self, size: int) -> bytes:
+        """The first ``size`` bytes, leaving the stream rewound"""
+        head = self.open().read(size)
+        self.file.seek(0)
+        return head
+
+    async def read(self) -> bytes:
+        return await run_in_threadpool(self.open().read)
+
+    async def chunks(self, size: int = CHUNK_BYTES) -> AsyncIterator[bytes]:
+        """Stream the audio in ``size`` byte chunks; disk reads run off the event loop"""
+        self.open()
+        while True:
+            chunk = await run_in_threadpool(self.file.read, size)
+            if not chunk:
+                break
+            yield chunk
+
+    @asynccontextmanager
+    async def as_path(self) -> AsyncIterator[str]:
+        """A filesystem path holding the audio, for path-based providers.
+
+        Files already on disk are used in place; spooled buffers are copied to
+        a uniquely named temporary file that is deleted afterwards.
+        """
+        name = getattr(self.file, "name", None)
+        if isinstance(name, str) and os.path.isfile(name):
+            yield name
+            return
+        suffix = os.path.splitext(self.filename)[1]
+        fd, path = tempfile.mkstemp(prefix="audio_", suffix=suffix)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                await run_in_threadpool(shutil.copyfileobj, self.open(), out)
+            yield path
+        finally:
+            os.remove(path)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def _copy_hashing(source: BinaryIO, target: BinaryIO) -> str:
+    digest = hashlib.sha256()
+    while True:
+        chunk = source.read(CHUNK_BYTES)
+        if not chunk:
+            return digest.hexdigest()
+        digest.update(chunk)
+        target.write(chunk)
@@ -1,6 +1,25 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
-from app.schemas import SummaryData
+from typing import Dict, Any, List, Optional, Tuple
+from app.schemas import SummaryData, ActionItemCreate, TranscriptionResult
+from app.providers.audio_input import AudioInput
+
+def action_prompt(known_actions: Optional[List[ActionItemCreate]]) -> Tuple[str, str]:
+    """The numbered request line and JSON schema fragment that ask a model for action items.
+
+    Both are empty when ``known_actions`` is given, so the model is not asked
+    for items that were already extracted locally.
+    """
+    if known_actions is not None:
+        return "", ""
+    return "4. Action items with assignees if mentioned", """,
+                "actions": [
+                    {
+                        "text": "action description",
+                        "assignee": "person name or null",
+                        "due_date": "YYYY-MM-DD or null",
+                        "status": "open"
+                    }
+                ]"""
 
 class BaseProvider(ABC):
     """Base interface for AI providers"""
@@ -9,11 +28,62 @@ class BaseProvider(ABC):
     async def transcribe(self, audio_path: str) -> str:
         """Transcribe audio file to text"""
         pass
+
+    async def transcribe_segments(self, audio_path: str) -> TranscriptionResult:
+        """Transcribe audio file, with segment timings when the backend reports them.
+
+        The default wraps ``transcribe`` and returns no segments.
+        """
+        return TranscriptionResult(text=await self.transcribe(audio_path))
+
+    async def transcribe_audio(self, audio: AudioInput) -> TranscriptionResult:
+        """Transcribe an in-memory or spooled upload.
+
+        This is what the API calls. The default adapts path-based providers by
+        handing ``transcribe_segments`` a temporary file; providers that can
+        send a file object or byte stream upstream should override it.
+        """
+        async with audio.as_path() as path:
+            return await self.transcribe_segments(path)
     
     @abstractmethod
-    async def summarize(self, transcript: str) -> SummaryData:
-        """Summarize transcript and extract key information"""
+    async def summarize(
+        self, transcript: str, known_actions: Optional[List[ActionItemCreate]] = None
+    ) -> SummaryData:
+        """Summarize transcript and extract key information.
+
+        When ``known_actions`` is given, action items were already extracted
+        locally; providers should not ask the model for them and return these.
+        """
         pass
+
+    async def summarize_update(
+        self,
+        previous: Optional[SummaryData],
+        new_text: str,
+        known_actions: Optional[List[ActionItemCreate]] = None,
+    ) -> SummaryData:
+        """Fold newly transcribed text into an existing summary.
+
+        Returns the updated bullets, decisions and risks, and action items
+        found in ``new_text`` only. The default prefixes the new text with the
+        previous summary and calls ``summarize``, so the prompt grows with the
+        new text rather than with the whole meeting. The model would also
+        pick actions out of the previous summary, so once there is one it is
+        not asked for any: callers pass ``known_actions`` extracted from
+        ``new_text`` locally, and no actions are returned without them.
+        """
+        if not previous:
+            return await self.summarize(new_text, known_actions=known_actions)
+        sections = [
+            ("Summary so far", previous.bullets),
+            ("Decisions so far", previous.decisions),
+            ("Risks so far", previous.risks),
+        ]
+        context = "\n".join(
+            f"{title}:\n" + "\n".join(f"- {item}" for item in items) for title, items in sections if items
+        )
+        return await self.summarize(f"{context}\n\nNew discussion:\n{new_text}", known_actions=known_actions or [])
     
     def get_provider_name(self) -> str:
         """Get the name of the provider"""
@@ -1,10 +1,11 @@
-import asyncio
-import aiofiles
-import os
 import json
 import httpx
-from app.providers.base import BaseProvider
-from app.schemas import SummaryData, ActionItemCreate
+from typing import List, Optional
+from app.providers.base import BaseProvider, AudioInput, action_prompt
+from app.schemas import SummaryData, ActionItemCreate, SegmentData, TranscriptionResult
+from app.deps import settings
+from app.services.deadline import timeout_for
+from app.services.usage import note_usage
 
 class HFProvider(BaseProvider):
     """Hugging Face provider using open-source models for transcription and summarization"""
@@ -16,35 +17,56 @@ class HFProvider(BaseProvider):
     
     async def transcribe(self, audio_path: str) -> str:
         """Transcribe audio using Hugging Face Whisper model"""
+        return (await self.transcribe_segments(audio_path)).text
+
+    async def transcribe_segments(self, audio_path: str) -> TranscriptionResult:
+        audio = AudioInput.from_path(audio_path)
         try:
-            async with httpx.AsyncClient() as client:
-                with open(audio_path, "rb") as audio_file:
-                    files = {"file": audio_file}
-                    response = await client.post(
-                        f"{self.base_url}/models/openai/whisper-large-v3",
-                        headers=self.headers,
-                        files=files
-                    )
-                    
+            return await self.transcribe_audio(audio)
+        finally:
+            audio.close()
+
+    async def transcribe_audio(self, audio: AudioInput) -> TranscriptionResult:
+        """Transcribe audio, keeping timestamped chunks when the endpoint returns them"""
+        try:
+            note_usage(model="openai/whisper-large-v3")
+            async with httpx.AsyncClient(timeout=httpx.Timeout(timeout_for(settings.provider_timeout_sec), connect=10.0)) as client:
+                # httpx reads the file object in chunks while sending the multipart body
+                files = {"file": (audio.filename, audio.open(), audio.content_type)}
+                response = await client.post(
+                    f"{self.base_url}/models/openai/whisper-large-v3",
+                    headers=self.headers,
+                    files=files
+                )
+                
                 if response.status_code == 200:
                     result = response.json()
-                    return result.get("text", "")
+                    segments = [
+                        SegmentData(start=chunk["timestamp"][0], end=chunk["timestamp"][1], text=chunk.get("text", ""))
+                        for chunk in result.get("chunks") or []
+                        if chunk.get("timestamp") and None not in chunk["timestamp"]
+                    ]
+                    return TranscriptionResult(text=result.get("text", ""), segments=segments)
                 else:
                     raise Exception(f"HF transcription failed: {response.status_code}")
                     
         except Exception as e:
             raise Exception(f"HF transcription failed: {str(e)}")
     
-    async def summarize(self, transcript: str) -> SummaryData:
+    async def summarize(
+        self, transcript: str, known_actions: Optional[List[ActionItemCreate]] = None
+    ) -> SummaryData:
         """Summarize transcript using Hugging Face summarization model"""
         try:
+            want_actions = known_actions is None
+            action_request, action_schema = action_prompt(known_actions)
             # Use a summarization model
             summary_prompt = f"""
             Summarize this meeting transcript and extract:
             1. Key bullet points (3-5 main topics)
             2. Decisions made (2-4 specific decisions)
             3. Potential risks (1-3 items)
-            4. Action items with assignees if mentioned
+            {action_request}
             
             Transcript: {transcript}
             
@@ -52,19 +74,12 @@ class HFProvider(BaseProvider):
             {{
                 "bullets": ["point 1", "point 2"],
                 "decisions": ["decision 1", "decision 2"],
-                "risks": ["risk 1", "risk 2"],
-                "actions": [
-                    {{
-                        "text": "action description",
-                        "assignee": "person name or null",
-                        "due_date": "YYYY-MM-DD or null",
-                        "status": "open"
-                    }}
-                ]
+                "risks": ["risk 1", "risk 2"]{action_schema}
             }}
             """
             
-            async with httpx.AsyncClient() as client:
+            note_usage(model="microsoft/DialoGPT-medium")
+            async with httpx.AsyncClient(timeout=httpx.Timeout(timeout_for(settings.provider_timeout_sec), connect=10.0)) as client:
                 response = await client.post(
                     f"{self.base_url}/models/microsoft/DialoGPT-medium",
                     headers=self.headers,
@@ -89,7 +104,7 @@ class HFProvider(BaseProvider):
                         data = self._get_fallback_data()
                     
                     # Convert to SummaryData
-                    actions = [
+                    actions = list(known_actions) if not want_actions else [
                         ActionItemCreate(
                             text=action["text"],
                             assignee=action.get("assignee"),
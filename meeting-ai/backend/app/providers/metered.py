@@ -0,0 +1,56 @@
+"""Usage metering around any provider"""
+
+from typing import List, Optional
+
+from app.providers.base import BaseProvider, AudioInput
+from app.schemas import SummaryData, ActionItemCreate, TranscriptionResult
+from app.services.deadline import within_deadline
+from app.services.usage import provider_call
+
+
+class MeteredProvider(BaseProvider):
+    """Delegates to ``inner`` and records each call in the usage ledger under ``name``.
+
+    Calls are cut off at the current request deadline, if there is one.
+
+    Only the outermost method is metered, so a provider whose ``transcribe``
+    calls its own ``transcribe_audio`` is counted once.
+    """
+
+    def __init__(self, inner: BaseProvider, name: str) -> None:
+        self.inner = inner
+        self.name = name
+
+    def __getattr__(self, attr):
+        # Provider-specific attributes (clients, tokens) stay reachable through the wrapper
+        return getattr(self.inner, attr)
+
+    async def transcribe(self, audio_path: str) -> str:
+        with provider_call("transcribe", self.name):
+            return await within_deadline(self.inner.transcribe(audio_path))
+
+    async def transcribe_segments(self, audio_path: str) -> TranscriptionResult:
+        with provider_call("transcribe", self.name):
+            return await within_deadline(self.inner.transcribe_segments(audio_path))
+
+    async def transcribe_audio(self, audio: AudioInput) -> TranscriptionResult:
+        with provider_call("transcribe", self.name):
+            return await within_deadline(self.inner.transcribe_audio(audio))
+
+    async def summarize(
+        self, transcript: str, known_actions: Optional[List[ActionItemCreate]] = None
+    ) -> SummaryData:
+        with provider_call("summarize", self.name):
+            return await within_deadline(self.inner.summarize(transcript, known_actions=known_actions))
+
+    async def summarize_update(
+        self,
+        previous: Optional[SummaryData],
+        new_text: str,
+        known_actions: Optional[List[ActionItemCreate]] = None,
+    ) -> SummaryData:
+        with provider_call("summarize_update", self.name):
+            return await within_deadline(self.inner.summarize_update(previous, new_text, known_actions=known_actions))
+
+    def get_provider_name(self) -> str:
+        return self.inner.get_provider_name()
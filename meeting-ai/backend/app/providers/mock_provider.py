@@ -1,6 +1,7 @@
 import asyncio
-from app.providers.base import BaseProvider
-from app.schemas import SummaryData, ActionItemCreate
+from typing import List, Optional
+from app.providers.base import BaseProvider, AudioInput
+from app.schemas import SummaryData, ActionItemCreate, TranscriptionResult
 
 class MockProvider(BaseProvider):
     """Mock provider for development/testing when no API keys are available"""
@@ -27,11 +28,17 @@ class MockProvider(BaseProvider):
         The meeting concluded with a reminder about the company holiday party next month.
         """
     
-    async def summarize(self, transcript: str) -> SummaryData:
+    async def transcribe_audio(self, audio: AudioInput) -> TranscriptionResult:
+        """The mock ignores the audio, so skip writing it to a temporary file"""
+        return TranscriptionResult(text=await self.transcribe(audio.filename))
+
+    async def summarize(
+        self, transcript: str, known_actions: Optional[List[ActionItemCreate]] = None
+    ) -> SummaryData:
         """Return a mock summary with extracted information"""
         await asyncio.sleep(2)  # Simulate processing time
         
-        return SummaryData(
+        summary = SummaryData(
             bullets=[
                 "Q3 sales exceeded targets by 15%",
                 "New marketing campaign was successful",
@@ -75,3 +82,6 @@ class MockProvider(BaseProvider):
                 )
             ]
         )
+        if known_actions is not None:
+            summary.actions = list(known_actions)
+        return summary
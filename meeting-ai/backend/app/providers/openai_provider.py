@@ -1,53 +1,130 @@
 import asyncio
-import aiofiles
 import os
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, APIConnectionError, InternalServerError, RateLimitError
 import logging
-from app.providers.base import BaseProvider
-from app.schemas import SummaryData, ActionItemCreate
+from typing import Awaitable, Callable, List, Optional, TypeVar
+from app.providers.base import BaseProvider, AudioInput, action_prompt
+from app.schemas import SummaryData, ActionItemCreate, SegmentData, TranscriptionResult
+from app.deps import settings
+from app.services.deadline import remaining, timeout_for
+from app.services.usage import note_usage
+
+T = TypeVar("T")
+
+# Upstream errors worth another attempt (APITimeoutError is an APIConnectionError)
+RETRYABLE_ERRORS = (APIConnectionError, RateLimitError, InternalServerError)
+RETRY_BASE_DELAY_SEC = 0.5
+RETRY_MAX_DELAY_SEC = 8.0
 
 class OpenAIProvider(BaseProvider):
     """OpenAI provider using GPT-4 for transcription and summarization"""
     
     def __init__(self, api_key: str):
-        self.client = AsyncOpenAI(api_key=api_key)
+        # The SDK's own retries are invisible to the usage ledger, so they are done in _request
+        self.client = AsyncOpenAI(api_key=api_key, timeout=settings.provider_timeout_sec, max_retries=0)
+
+    async def _request(self, send: Callable[[float], Awaitable[T]]) -> T:
+        """Call ``send(timeout)``, retrying what the SDK would retry and counting each retry.
+
+        Backs off exponentially, and gives up early rather than sleep past the
+        request deadline.
+        """
+        for attempt in range(settings.provider_max_retries + 1):
+            if attempt:
+                note_usage(retries=1)
+            try:
+                return await send(timeout_for(settings.provider_timeout_sec))
+            except RETRYABLE_ERRORS:
+                delay = min(RETRY_BASE_DELAY_SEC * 2 ** attempt, RETRY_MAX_DELAY_SEC)
+                left = remaining()
+                if attempt == settings.provider_max_retries or (left is not None and left <= delay):
+                    raise
+                await asyncio.sleep(delay)
     
     async def transcribe(self, audio_path: str) -> str:
         """Transcribe audio using OpenAI Speech-to-Text.
 
-        Tries whisper-1 first; if unavailable, falls back to gpt-4o-mini-transcribe.
+        Tries gpt-4o-transcribe first; if unavailable, falls back to whisper-1.
         """
-        async def _run(model_name: str) -> str:
-            with open(audio_path, "rb") as audio_file:
-                result = await self.client.audio.transcriptions.create(
-                    model=model_name,
-                    file=audio_file
-                )
+        return (await self.transcribe_segments(audio_path)).text
+
+    async def transcribe_segments(self, audio_path: str) -> TranscriptionResult:
+        audio = AudioInput.from_path(audio_path)
+        try:
+            return await self.transcribe_audio(audio)
+        finally:
+            audio.close()
+
+    async def transcribe_audio(self, audio: AudioInput) -> TranscriptionResult:
+        """Transcribe audio, keeping segment timings when the model returns them.
+
+        The file object is passed to the SDK as is, so the upload is streamed
+        from memory or the spool file without another copy on disk.
+        Only whisper-1 supports verbose_json; gpt-4o-transcribe returns text only.
+        """
+        async def _run(model_name: str) -> TranscriptionResult:
+            verbose = model_name == "whisper-1"
+            # Each attempt rewinds the upload
+            result = await self._request(lambda timeout: self.client.audio.transcriptions.create(
+                model=model_name,
+                file=(audio.filename, audio.open(), audio.content_type),
+                timeout=timeout,
+                **({"response_format": "verbose_json"} if verbose else {})
+            ))
             # openai>=1.x returns object with .text; guard for dict
-            return getattr(result, "text", None) or (result.get("text") if isinstance(result, dict) else "")
+            text = getattr(result, "text", None) or (result.get("text") if isinstance(result, dict) else "")
+            raw_segments = getattr(result, "segments", None) or (result.get("segments") if isinstance(result, dict) else None) or []
+            segments = [
+                SegmentData(
+                    start=float(seg["start"] if isinstance(seg, dict) else seg.start),
+                    end=float(seg["end"] if isinstance(seg, dict) else seg.end),
+                    text=seg["text"] if isinstance(seg, dict) else seg.text,
+                )
+                for seg in raw_segments
+            ]
+            # gpt-4o-transcribe bills tokens, whisper-1 reports the audio duration
+            usage = getattr(result, "usage", None)
+            duration = getattr(result, "duration", None) or getattr(usage, "seconds", None)
+            note_usage(
+                model=model_name,
+                prompt_tokens=getattr(usage, "input_tokens", None),
+                completion_tokens=getattr(usage, "output_tokens", None),
+                audio_seconds=float(duration) if duration is not None else None,
+            )
+            return TranscriptionResult(text=text or "", segments=segments)
 
         last_err: Exception | None = None
-        for model in ("gpt-4o-transcribe", "whisper-1"):
+        for attempt, model in enumerate(("gpt-4o-transcribe", "whisper-1")):
+            if attempt:
+                note_usage(retries=1)
             try:
-                text = await _run(model)
-                if not text:
+                result = await _run(model)
+                if not result.text:
                     raise Exception("Empty transcription text")
-                return text
+                return result
             except Exception as e:
                 # Surface which model failed for easier debugging
                 last_err = Exception(f"model={model}: {e}")
                 continue
         raise Exception(f"OpenAI transcription failed: {last_err}")
     
-    async def summarize(self, transcript: str) -> SummaryData:
-        """Summarize transcript using GPT-4"""
+    async def summarize(
+        self, transcript: str, known_actions: Optional[List[ActionItemCreate]] = None
+    ) -> SummaryData:
+        """Summarize transcript using GPT-4.
+
+        Action items are only requested from the model when ``known_actions``
+        is not supplied, which keeps the completion short.
+        """
         try:
+            want_actions = known_actions is None
+            action_request, action_schema = action_prompt(known_actions)
             prompt = f"""
             Please analyze the following meeting transcript and provide:
             1. Key bullet points (3-5 main topics discussed)
             2. Decisions made (2-4 specific decisions)
             3. Potential risks or concerns (1-3 items)
-            4. Action items with assignees if mentioned
+            {action_request}
             
             Transcript:
             {transcript}
@@ -56,27 +133,27 @@ class OpenAIProvider(BaseProvider):
             {{
                 "bullets": ["point 1", "point 2"],
                 "decisions": ["decision 1", "decision 2"],
-                "risks": ["risk 1", "risk 2"],
-                "actions": [
-                    {{
-                        "text": "action description",
-                        "assignee": "person name or null",
-                        "due_date": "YYYY-MM-DD or null",
-                        "status": "open"
-                    }}
-                ]
+                "risks": ["risk 1", "risk 2"]{action_schema}
             }}
             """
             
-            response = await self.client.chat.completions.create(
+            response = await self._request(lambda timeout: self.client.chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant that analyzes meeting transcripts and returns ONLY valid JSON with no prose or code fences."},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.3,
-                max_tokens=1000,
-                response_format={"type": "json_object"}
+                max_tokens=1000 if want_actions else 600,
+                response_format={"type": "json_object"},
+                timeout=timeout
+            ))
+
+            usage = getattr(response, "usage", None)
+            note_usage(
+                model=getattr(response, "model", None) or "gpt-4o-mini",
+                prompt_tokens=getattr(usage, "prompt_tokens", None),
+                completion_tokens=getattr(usage, "completion_tokens", None),
             )
 
             import json
@@ -111,7 +188,7 @@ class OpenAIProvider(BaseProvider):
                     raise Exception("Model did not return valid JSON")
             
             # Convert to SummaryData
-            actions = [
+            actions = list(known_actions) if not want_actions else [
                 ActionItemCreate(
                     text=action["text"],
                     assignee=action.get("assignee"),
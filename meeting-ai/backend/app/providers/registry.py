@@ -0,0 +1,72 @@
+"""Provider lookup by name without importing every backend up front.
+
+Built-in providers are referenced as ``"module:Class"`` strings and imported
+on first use, so ``PROVIDER=mock`` never loads ``openai`` or ``httpx``.
+Installed packages can add providers through the ``meeting_ai.providers``
+entry point group, e.g. in their ``pyproject.toml``::
+
+    [project.entry-points."meeting_ai.providers"]
+    azure = "my_package.azure:AzureProvider"
+"""
+
+import importlib
+import logging
+from importlib.metadata import entry_points
+from typing import Dict, Optional, Type
+
+from app.providers.base import BaseProvider
+
+logger = logging.getLogger("uvicorn.error")
+
+ENTRY_POINT_GROUP = "meeting_ai.providers"
+
+BUILTIN_PROVIDERS: Dict[str, str] = {
+    "openai": "app.providers.openai_provider:OpenAIProvider",
+    "hf": "app.providers.hf_provider:HFProvider",
+    "huggingface": "app.providers.hf_provider:HFProvider",
+    "hugging_face": "app.providers.hf_provider:HFProvider",
+    "mock": "app.providers.mock_provider:MockProvider",
+}
+
+_classes: Dict[str, Type[BaseProvider]] = {}
+
+
+def _import_target(target: str) -> Type[BaseProvider]:
+    module_name, _, attr = target.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _find_entry_point(name: str):
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        if ep.name.lower() == name:
+            return ep
+    return None
+
+
+def available_providers() -> Dict[str, str]:
+    """Names that ``load_provider_class`` can resolve, mapped to their import target"""
+    names = dict(BUILTIN_PROVIDERS)
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        names.setdefault(ep.name.lower(), ep.value)
+    return names
+
+
+def load_provider_class(name: str) -> Optional[Type[BaseProvider]]:
+    """Import and return the provider class registered as ``name``, or None if unknown"""
+    name = name.lower().strip()
+    if name in _classes:
+        return _classes[name]
+
+    if name in BUILTIN_PROVIDERS:
+        cls = _import_target(BUILTIN_PROVIDERS[name])
+    else:
+        ep = _find_entry_point(name)
+        if ep is None:
+            return None
+        cls = ep.load()
+        if not (isinstance(cls, type) and issubclass(cls, BaseProvider)):
+            raise RuntimeError(f"Provider entry point '{name}' ({ep.value}) is not a BaseProvider subclass")
+        logger.info("Loaded provider '%s' from entry point %s", name, ep.value)
+
+    _classes[name] = cls
+    return cls
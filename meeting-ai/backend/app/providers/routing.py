@@ -0,0 +1,287 @@
+"""Latency-aware routing across several provider backends.
+
+``PROVIDER=router`` makes ``get_provider`` return a ``RoutingProvider`` over
+the backends named in ``ROUTER_BACKENDS``. Each backend is metered on its
+own, so the usage ledger shows which one served a call.
+
+For every backend and operation the router keeps moving averages of
+latency and failure rate. It ranks backends by expected time to a
+successful answer, i.e. latency divided by success rate. A backend that
+fails ``ROUTER_FAILURE_THRESHOLD`` times in a row is skipped for
+``ROUTER_COOLDOWN_SEC``. After the cooldown it gets one trial call, and
+another failure trips it again straight away.
+
+When a call fails, the next backend in the ranking is tried. With
+``ROUTER_HEDGE_AFTER_MS`` set, a call still running after that long is also
+sent to the next backend, and the first answer wins. Uploads are not
+hedged, because both backends would read the same file object. Exceeding
+the request deadline is not a backend fault: it neither fails over nor
+counts against the backend.
+
+Each routed call leaves a decision record (ranking, attempts, winner),
+served at ``/api/debug/routing``.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from app.deps import get_settings
+from app.providers.base import BaseProvider, AudioInput
+from app.schemas import SummaryData, ActionItemCreate, TranscriptionResult
+from app.services.deadline import DeadlineExceeded
+
+logger = logging.getLogger("uvicorn.error")
+
+T = TypeVar("T")
+
+# Weight of the newest call in the latency and failure-rate averages
+LATENCY_ALPHA = 0.2
+ERROR_ALPHA = 0.1
+# Caps the penalty for a failing backend that is not (yet) in cooldown
+MIN_SUCCESS_RATE = 0.05
+# A healthy backend left unused this long is tried first once, so its latency stays current
+STALE_AFTER_SEC = 60.0
+DECISION_HISTORY = 200
+
+
+@dataclass
+class BackendStats:
+    """Moving averages for one backend and operation"""
+
+    latency_ms: Optional[float] = None
+    error_rate: float = 0.0
+    calls: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    unhealthy_until: float = 0.0
+    last_call: Optional[float] = None
+    last_error: Optional[str] = None
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.unhealthy_until
+
+    def expected_ms(self, now: float) -> float:
+        """Expected latency of a successful answer; 0 for backends that need (re)measuring"""
+        if self.latency_ms is None or self.last_call is None or now - self.last_call > STALE_AFTER_SEC:
+            return 0.0
+        return self.latency_ms / max(1.0 - self.error_rate, MIN_SUCCESS_RATE)
+
+    def succeeded(self, latency_ms: float, now: float) -> None:
+        self.calls += 1
+        self.last_call = now
+        self.consecutive_failures = 0
+        self.error_rate *= 1 - ERROR_ALPHA
+        if self.latency_ms is None:
+            self.latency_ms = latency_ms
+        else:
+            self.latency_ms += LATENCY_ALPHA * (latency_ms - self.latency_ms)
+
+    def outlasted(self, latency_ms: float) -> None:
+        """A call cancelled after ``latency_ms`` would have taken at least that long"""
+        if self.latency_ms is not None and latency_ms > self.latency_ms:
+            self.latency_ms += LATENCY_ALPHA * (latency_ms - self.latency_ms)
+
+    def failed(self, error: str, now: float, threshold: int, cooldown_sec: float) -> bool:
+        """Count a failure; returns True when it takes the backend out of rotation"""
+        self.calls += 1
+        self.failures += 1
+        self.last_call = now
+        self.last_error = error
+        self.consecutive_failures += 1
+        self.error_rate += ERROR_ALPHA * (1.0 - self.error_rate)
+        if self.consecutive_failures >= threshold:
+            self.unhealthy_until = now + cooldown_sec
+            return True
+        return False
+
+
+class RoutingProvider(BaseProvider):
+    """Sends each call to the backend expected to answer fastest, failing over and hedging as configured"""
+
+    def __init__(self, backends: Sequence[Tuple[str, BaseProvider]]) -> None:
+        if not backends:
+            raise ValueError("RoutingProvider needs at least one backend")
+        self.backends = list(backends)
+        self.stats: Dict[Tuple[str, str], BackendStats] = {}
+        self.decisions: Deque[Dict[str, Any]] = deque(maxlen=DECISION_HISTORY)
+
+    def _stats(self, name: str, operation: str) -> BackendStats:
+        stats = self.stats.get((name, operation))
+        if stats is None:
+            stats = self.stats[(name, operation)] = BackendStats()
+        return stats
+
+    def rank(self, operation: str) -> List[Tuple[str, BaseProvider]]:
+        """Backends in the order they would be tried: healthy ones fastest first, then by recovery time.
+
+        Ties keep the ``ROUTER_BACKENDS`` order.
+        """
+        now = time.monotonic()
+
+        def key(item: Tuple[int, Tuple[str, BaseProvider]]):
+            index, (name, _) = item
+            stats = self._stats(name, operation)
+            if stats.healthy(now):
+                return (0, stats.expected_ms(now), index)
+            return (1, stats.unhealthy_until, index)
+
+        return [backend for _, backend in sorted(enumerate(self.backends), key=key)]
+
+    async def _attempt(
+        self, name: str, backend: BaseProvider, operation: str,
+        call: Callable[[BaseProvider], Awaitable[T]], decision: Dict[str, Any],
+    ) -> T:
+        settings = get_settings()
+        stats = self._stats(name, operation)
+        attempt: Dict[str, Any] = {"backend": name, "outcome": "pending", "latency_ms": None}
+        decision["attempts"].append(attempt)
+        started = time.perf_counter()
+        try:
+            result = await call(backend)
+        except asyncio.CancelledError:
+            # Usually the slower side of a hedge; without this it would keep its old latency
+            attempt["outcome"] = "cancelled"
+            stats.outlasted((time.perf_counter() - started) * 1000)
+            raise
+        except DeadlineExceeded:
+            attempt["outcome"] = "timeout"
+            stats.outlasted((time.perf_counter() - started) * 1000)
+            raise
+        except Exception as e:
+            attempt["outcome"], attempt["error"] = "error", str(e)[:300]
+            if stats.failed(str(e)[:300], time.monotonic(), settings.router_failure_threshold,
+                            settings.router_cooldown_sec):
+                logger.warning("Provider %s taken out of rotation for %s for %.0fs after %d failures",
+                               name, operation, settings.router_cooldown_sec, stats.consecutive_failures)
+            raise
+        finally:
+            attempt["latency_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        stats.succeeded(attempt["latency_ms"], time.monotonic())
+        attempt["outcome"] = "ok"
+        return result
+
+    async def _route(self, operation: str, call: Callable[[BaseProvider], Awaitable[T]], hedge: bool = True) -> T:
+        ranked = self.rank(operation)
+        hedge_after = get_settings().router_hedge_after_ms / 1000 if hedge else 0
+        decision: Dict[str, Any] = {
+            "at": datetime.utcnow().isoformat(),
+            "operation": operation,
+            "ranking": [name for name, _ in ranked],
+            "attempts": [],
+            "hedged": False,
+            "backend": None,
+            "outcome": "pending",
+        }
+        self.decisions.append(decision)
+        started = time.perf_counter()
+
+        queue = list(ranked)
+        now = time.monotonic()
+        healthy = {name for name, _ in ranked if self._stats(name, operation).healthy(now)}
+        pending: Dict[asyncio.Future, str] = {}
+        error: Optional[BaseException] = None
+
+        def start() -> None:
+            name, backend = queue.pop(0)
+            pending[asyncio.ensure_future(self._attempt(name, backend, operation, call, decision))] = name
+
+        try:
+            while pending or queue:
+                if not pending:
+                    if error is not None:
+                        logger.warning("Provider %s failed for %s, trying %s", decision["attempts"][-1]["backend"],
+                                       operation, queue[0][0])
+                    start()
+                # At most one hedge per call, so a slow call costs two upstream requests at worst;
+                # backends out of rotation are only tried once the healthy ones have failed
+                can_hedge = queue and queue[0][0] in healthy and len(pending) == 1 and not decision["hedged"]
+                wait = hedge_after if hedge_after and can_hedge else None
+                done, _ = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    decision["hedged"] = True
+                    start()
+                    continue
+                for task in done:
+                    name = pending.pop(task)
+                    if task.exception() is None:
+                        decision["backend"], decision["outcome"] = name, "ok"
+                        return task.result()
+                    error = task.exception()
+                    if isinstance(error, DeadlineExceeded):
+                        raise error
+            decision["outcome"] = "error"
+            raise error
+        except DeadlineExceeded:
+            decision["outcome"] = "timeout"
+            raise
+        except asyncio.CancelledError:
+            decision["outcome"] = "cancelled"
+            raise
+        finally:
+            decision["latency_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            # The losing side of a hedge, or attempts abandoned by a cancelled caller
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def transcribe(self, audio_path: str) -> str:
+        return await self._route("transcribe", lambda backend: backend.transcribe(audio_path))
+
+    async def transcribe_segments(self, audio_path: str) -> TranscriptionResult:
+        return await self._route("transcribe", lambda backend: backend.transcribe_segments(audio_path))
+
+    async def transcribe_audio(self, audio: AudioInput) -> TranscriptionResult:
+        # Failover rewinds the upload; hedging would read it from two requests at once
+        return await self._route("transcribe", lambda backend: backend.transcribe_audio(audio), hedge=False)
+
+    async def summarize(
+        self, transcript: str, known_actions: Optional[List[ActionItemCreate]] = None
+    ) -> SummaryData:
+        return await self._route(
+            "summarize", lambda backend: backend.summarize(transcript, known_actions=known_actions)
+        )
+
+    async def summarize_update(
+        self,
+        previous: Optional[SummaryData],
+        new_text: str,
+        known_actions: Optional[List[ActionItemCreate]] = None,
+    ) -> SummaryData:
+        return await self._route(
+            "summarize_update",
+            lambda backend: backend.summarize_update(previous, new_text, known_actions=known_actions),
+        )
+
+    def get_provider_name(self) -> str:
+        return "router(" + ",".join(name for name, _ in self.backends) + ")"
+
+    def snapshot(self, limit: int = 50) -> Dict[str, Any]:
+        """Per-backend health and the most recent decisions, newest first"""
+        now = time.monotonic()
+        backends = []
+        for (name, operation), stats in sorted(self.stats.items()):
+            backends.append({
+                "backend": name,
+                "operation": operation,
+                "healthy": stats.healthy(now),
+                "unhealthy_for_sec": round(max(0.0, stats.unhealthy_until - now), 3),
+                "latency_ms": round(stats.latency_ms, 3) if stats.latency_ms is not None else None,
+                "error_rate": round(stats.error_rate, 4),
+                "expected_ms": round(stats.expected_ms(now), 3),
+                "calls": stats.calls,
+                "failures": stats.failures,
+                "consecutive_failures": stats.consecutive_failures,
+                "last_error": stats.last_error,
+            })
+        decisions = list(self.decisions)[-limit:] if limit > 0 else []
+        return {
+            "provider": self.get_provider_name(),
+            "backends": backends,
+            "decisions": decisions[::-1],
+        }
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import Session, select, delete
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
 from datetime import datetime
 from app.db import get_session
-from app.models import Meeting, ActionItem
-from app.schemas import ActionItemCreate, ActionItemUpdate, ActionItemResponse
+from app.deps import get_settings
+from app.models import Meeting, ActionItem, ActionMention
+from app.schemas import ActionItemCreate, ActionItemUpdate, ActionItemResponse, SimilarActionResponse
+from app.services.action_index import OPEN_STATUSES, find_similar, index_action, meeting_actions, unindex_actions
+from app.services.action_rollups import record_delete, record_insert, record_update, rollup_key
+from app.services.changes import record_action, record_action_deletes
+from app.services import search
 
 router = APIRouter()
 
@@ -13,17 +19,13 @@ async def list_actions(
     meeting_id: int,
     session: Session = Depends(get_session)
 ):
-    """List all action items for a meeting"""
+    """List all action items for a meeting, including items from other meetings it repeated"""
     # Verify meeting exists
     meeting = session.get(Meeting, meeting_id)
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
     
-    actions = session.exec(
-        select(ActionItem).where(ActionItem.meeting_id == meeting_id)
-    ).all()
-    
-    return actions
+    return meeting_actions(session, meeting_id)
 
 @router.post("/meetings/{meeting_id}/actions", response_model=ActionItemResponse)
 async def create_action(
@@ -46,11 +48,47 @@ async def create_action(
     )
     
     session.add(db_action)
+    session.flush()
+    index_action(session, db_action)
+    record_insert(session, db_action)
+    record_action(session, db_action)
     session.commit()
     session.refresh(db_action)
+    await run_in_threadpool(search.index_meeting, session, meeting_id)
     
     return db_action
 
+@router.get("/actions/similar", response_model=List[SimilarActionResponse])
+async def similar_actions(
+    text: str = Query(..., min_length=1, description="Action text to match"),
+    assignee: Optional[str] = Query(None, description="Only this person's (or unassigned) items"),
+    include_closed: bool = Query(False, description="Also match completed and cancelled items"),
+    threshold: Optional[float] = Query(None, ge=0.0, le=1.0, description="Minimum trigram similarity"),
+    limit: int = Query(10, ge=1, le=100),
+    session: Session = Depends(get_session)
+):
+    """Open action items similar to ``text``, found through the LSH index"""
+    if threshold is None:
+        threshold = get_settings().action_merge_threshold
+    matches = find_similar(
+        session, text, assignee,
+        statuses=None if include_closed else OPEN_STATUSES, threshold=threshold, limit=limit,
+    )
+    return [
+        SimilarActionResponse(
+            id=item.id,
+            meeting_id=item.meeting_id,
+            text=item.text,
+            assignee=item.assignee,
+            due_date=item.due_date,
+            status=item.status,
+            created_at=item.created_at,
+            updated_at=item.updated_at,
+            similarity=round(score, 3),
+        )
+        for item, score in matches
+    ]
+
 @router.patch("/actions/{action_id}", response_model=ActionItemResponse)
 async def update_action(
     action_id: int,
@@ -62,9 +100,11 @@ async def update_action(
     if not db_action:
         raise HTTPException(status_code=404, detail="Action item not found")
     
+    before = rollup_key(db_action)
     # Update fields if provided
     if action_update.text is not None:
         db_action.text = action_update.text
+        index_action(session, db_action)
     if action_update.assignee is not None:
         db_action.assignee = action_update.assignee
     if action_update.due_date is not None:
@@ -73,10 +113,14 @@ async def update_action(
         db_action.status = action_update.status
     
     db_action.updated_at = datetime.utcnow()
+    record_update(session, before, db_action)
+    record_action(session, db_action)
     
     session.add(db_action)
     session.commit()
     session.refresh(db_action)
+    if action_update.text is not None:
+        await run_in_threadpool(search.index_meeting, session, db_action.meeting_id)
     
     return db_action
 
@@ -90,8 +134,13 @@ async def delete_action(
     if not db_action:
         raise HTTPException(status_code=404, detail="Action item not found")
     
+    unindex_actions(session, [action_id])
+    record_delete(session, db_action)
+    record_action_deletes(session, [(action_id, db_action.meeting_id)])
+    session.exec(delete(ActionMention).where(ActionMention.action_id == action_id))
     session.delete(db_action)
     session.commit()
+    await run_in_threadpool(search.unindex_actions, [action_id])
     
     return {"message": "Action item deleted successfully"}
 
@@ -0,0 +1,136 @@
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session, select, func
+from sqlalchemy import case
+from typing import Dict, List, Optional
+from datetime import date, timedelta
+from app.db import get_session
+from app.models import ActionItem, ActionCount, ActionDueCount, ActionWeek
+from app.schemas import (
+    AssigneeActionStats,
+    StatusActionStats,
+    DueActionStats,
+    OverdueActionResponse,
+    BurndownWeek,
+)
+from app.services.action_rollups import CLOSED_STATUSES, NO_DUE_DATE, is_open, week_of
+
+router = APIRouter()
+
+@router.get("/analytics/actions/by-assignee", response_model=List[AssigneeActionStats])
+async def actions_by_assignee(session: Session = Depends(get_session)):
+    """Action item counts per assignee and status, most open items first"""
+    stats: Dict[str, AssigneeActionStats] = {}
+    for assignee, status, count in session.exec(
+        select(ActionCount.assignee, ActionCount.status, ActionCount.count).where(ActionCount.count != 0)
+    ):
+        entry = stats.setdefault(assignee, AssigneeActionStats(assignee=assignee or None, total=0, open=0, by_status={}))
+        entry.by_status[status] = count
+        entry.total += count
+        if is_open(status):
+            entry.open += count
+    return sorted(stats.values(), key=lambda s: (-s.open, -s.total, s.assignee or ""))
+
+@router.get("/analytics/actions/by-status", response_model=List[StatusActionStats])
+async def actions_by_status(session: Session = Depends(get_session)):
+    """Action item counts per status"""
+    total = func.sum(ActionCount.count)
+    rows = session.exec(
+        select(ActionCount.status, total).group_by(ActionCount.status).having(total != 0).order_by(ActionCount.status)
+    )
+    return [StatusActionStats(status=status, count=count) for status, count in rows]
+
+@router.get("/analytics/actions/due", response_model=DueActionStats)
+async def actions_by_due_date(
+    as_of: Optional[date] = Query(None, description="Reference day (default today, UTC)"),
+    session: Session = Depends(get_session)
+):
+    """Open action items bucketed by due date: overdue, today, the next 7 days, later or none"""
+    today = as_of or date.today()
+    week_end = today + timedelta(days=7)
+    due = ActionDueCount.due_date
+
+    def bucket(condition):
+        return func.coalesce(func.sum(case((condition, ActionDueCount.count), else_=0)), 0)
+
+    row = session.exec(
+        select(
+            bucket((due != NO_DUE_DATE) & (due < today)),
+            bucket(due == today),
+            bucket((due > today) & (due <= week_end)),
+            bucket(due > week_end),
+            bucket(due == NO_DUE_DATE),
+        ).where(ActionDueCount.status.not_in(CLOSED_STATUSES))
+    ).one()
+    return DueActionStats(
+        as_of=today,
+        overdue=row[0],
+        due_today=row[1],
+        due_next_7_days=row[2],
+        due_later=row[3],
+        no_due_date=row[4],
+    )
+
+@router.get("/analytics/actions/overdue", response_model=List[OverdueActionResponse])
+async def overdue_actions(
+    assignee: Optional[str] = Query(None, description="Only this person's items"),
+    as_of: Optional[date] = Query(None, description="Reference day (default today, UTC)"),
+    limit: int = Query(100, ge=1, le=1000),
+    session: Session = Depends(get_session)
+):
+    """Open action items past their due date, longest overdue first"""
+    today = as_of or date.today()
+    # Naming the open statuses (rather than NOT IN the closed ones) lets SQLite range-scan the (status, due_date) index
+    open_statuses = [
+        status for status in session.exec(select(ActionCount.status).where(ActionCount.count > 0).distinct())
+        if is_open(status)
+    ]
+    if not open_statuses:
+        return []
+    query = select(ActionItem).where(
+        ActionItem.status.in_(open_statuses),
+        ActionItem.due_date.is_not(None),
+        ActionItem.due_date < today,
+    )
+    if assignee:
+        query = query.where(ActionItem.assignee == assignee)
+    items = session.exec(query.order_by(ActionItem.due_date, ActionItem.id).limit(limit)).all()
+    return [
+        OverdueActionResponse(
+            id=item.id,
+            meeting_id=item.meeting_id,
+            text=item.text,
+            assignee=item.assignee,
+            due_date=item.due_date,
+            status=item.status,
+            created_at=item.created_at,
+            updated_at=item.updated_at,
+            days_overdue=(today - item.due_date).days,
+        )
+        for item in items
+    ]
+
+@router.get("/analytics/actions/burndown", response_model=List[BurndownWeek])
+async def actions_burndown(
+    weeks: int = Query(12, ge=1, le=520, description="Number of weeks up to and including the current one"),
+    session: Session = Depends(get_session)
+):
+    """Items created and closed per week and the number still open at the end of each week"""
+    net = ActionWeek.created - ActionWeek.closed + ActionWeek.reopened - ActionWeek.removed
+    first = week_of(date.today()) - timedelta(weeks=weeks - 1)
+    open_count = session.exec(select(func.coalesce(func.sum(net), 0)).where(ActionWeek.week < first)).one()
+    rows = {row.week: row for row in session.exec(select(ActionWeek).where(ActionWeek.week >= first))}
+
+    result = []
+    for offset in range(weeks):
+        week = first + timedelta(weeks=offset)
+        row = rows.get(week) or ActionWeek(week=week)
+        open_count += row.created - row.closed + row.reopened - row.removed
+        result.append(BurndownWeek(
+            week=week,
+            created=row.created,
+            closed=row.closed,
+            reopened=row.reopened,
+            removed=row.removed,
+            open=open_count,
+        ))
+    return result
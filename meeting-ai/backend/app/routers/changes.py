@@ -0,0 +1,65 @@
+import json
+from typing import Optional
+from fastapi import APIRouter, Header, Query, Request
+from fastapi.responses import StreamingResponse
+from app.schemas import ChangesResponse
+from app.services.changes import changes
+
+router = APIRouter()
+
+# Idle SSE connections get a comment this often so proxies keep them open
+HEARTBEAT_SEC = 15.0
+
+@router.get("/changes", response_model=ChangesResponse)
+async def get_changes(
+    since: Optional[int] = Query(None, ge=0, description="Last seq seen; omit to get the current position"),
+    timeout: float = Query(25.0, ge=0, le=60, description="Seconds to wait when there are no changes yet"),
+    limit: int = Query(500, ge=1, le=1000)
+):
+    """Long-poll for changes to meetings, transcripts, summaries and action items.
+
+    Load the lists once, call without ``since`` (or use the seq returned with
+    nothing to wait for), then keep calling with the returned ``seq``. Each
+    call answers as soon as there are changes, or with none after
+    ``timeout``. Changes are compacted to the last state per entity; a
+    meeting delete covers its transcript, summary and actions. With
+    ``reset`` the client must reload.
+    """
+    batch = await changes.wait(since, limit, timeout)
+    return ChangesResponse(seq=batch.seq, reset=batch.reset, changes=batch.changes)
+
+@router.get("/changes/stream")
+async def stream_changes(
+    request: Request,
+    since: Optional[int] = Query(None, ge=0, description="Last seq seen; omit to start from now"),
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID")
+):
+    """The change feed as Server-Sent Events.
+
+    Each change is a ``change`` event whose id is its seq, so a reconnecting
+    EventSource resumes where it stopped. A ``reset`` event means the client
+    must reload and continue from the seq it carries.
+    """
+    position = last_event_id if last_event_id is not None else since
+    if position is None:
+        position = (await changes.read(None, 1)).seq
+
+    async def events():
+        nonlocal position
+        # Tells EventSource to wait 3s before reconnecting
+        yield "retry: 3000\n\n"
+        while not await request.is_disconnected():
+            batch = await changes.wait(position, 500, HEARTBEAT_SEC)
+            if batch.reset:
+                yield f"event: reset\ndata: {json.dumps({'seq': batch.seq})}\n\n"
+            elif not batch.changes:
+                yield ": keep-alive\n\n"
+            for change in batch.changes:
+                yield f"id: {change['seq']}\nevent: change\ndata: {json.dumps(change)}\n\n"
+            position = batch.seq
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Iterator, Optional
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+from app.db import get_engine
+from app.services.export import iter_meeting_records, stream_export
+
+router = APIRouter()
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+@router.get("/export")
+def export_meetings(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    gzip: bool = Query(False, description="Compress the stream with gzip"),
+    created_after: Optional[datetime] = Query(None, description="Only meetings created at or after this time"),
+    created_before: Optional[datetime] = Query(None, description="Only meetings created before this time"),
+):
+    """Stream every meeting with its transcript, summary and actions.
+
+    Rows are read and written in partitions, so memory stays flat regardless
+    of how many meetings are exported.
+    """
+    def body() -> Iterator[bytes]:
+        # The request-scoped session is closed before streaming starts, so the generator owns its own
+        with Session(get_engine()) as session:
+            records = iter_meeting_records(session, created_after, created_before)
+            yield from stream_export(records, format, compress=gzip)
+
+    filename = f"meetings_export.{format}" + (".gz" if gzip else "")
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    media_type = "application/gzip" if gzip else MEDIA_TYPES[format]
+    return StreamingResponse(body(), media_type=media_type, headers=headers)
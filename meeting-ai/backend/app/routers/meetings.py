@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select, delete
+from sqlmodel import Session, select, delete, func
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 from app.db import get_session
-from app.models import Meeting, Transcript, Summary, ActionItem
+from app.models import (
+    Meeting, Transcript, TranscriptBody, TranscriptSegment, Summary, SummaryState, ActionItem, ActionMention,
+)
 from app.schemas import (
     MeetingCreate,
     MeetingResponse,
@@ -12,6 +15,12 @@ from app.schemas import (
     ActionItemResponse,
     StatsResponse,
 )
+from app.services.action_index import meeting_actions, unindex_actions
+from app.services.action_rollups import record_deletes
+from app.services.changes import record_action_deletes, record_meeting, record_meeting_delete
+from app.services.search import index_meeting, unindex_meeting
+from app.services.summarization import hand_over_actions
+from app.services.transcript_store import load_text
 
 router = APIRouter()
 
@@ -23,6 +32,8 @@ async def create_meeting(
     """Create a new meeting"""
     db_meeting = Meeting(title=meeting.title)
     session.add(db_meeting)
+    session.flush()
+    record_meeting(session, db_meeting)
     session.commit()
     session.refresh(db_meeting)
     return db_meeting
@@ -53,16 +64,14 @@ async def get_meeting(
         select(Summary).where(Summary.meeting_id == meeting_id)
     ).first()
 
-    # Get action items
-    db_actions: List[ActionItem] = session.exec(
-        select(ActionItem).where(ActionItem.meeting_id == meeting_id)
-    ).all()
+    # Get action items, with open items from earlier meetings this one repeated
+    db_actions: List[ActionItem] = meeting_actions(session, meeting_id)
 
     transcript: Optional[TranscriptResponse] = None
     if db_transcript:
         transcript = TranscriptResponse(
             id=db_transcript.id,
-            text=db_transcript.text,
+            text=load_text(session, db_transcript),
             duration_sec=db_transcript.duration_sec,
             created_at=db_transcript.created_at,
         )
@@ -102,20 +111,17 @@ async def get_meeting(
 @router.get("/stats", response_model=StatsResponse)
 async def get_stats(session: Session = Depends(get_session)):
     """Aggregate stats for dashboard counters."""
-    total_meetings = session.exec(select(Meeting)).all()
-    all_transcripts = session.exec(select(Transcript)).all()
-    all_summaries = session.exec(select(Summary)).all()
-    all_actions = session.exec(select(ActionItem)).all()
-
-    # Compute counts
-    transcribed_meeting_ids = {t.meeting_id for t in all_transcripts}
-    summarized_meeting_ids = {s.meeting_id for s in all_summaries}
+    # Count in SQL; transcript bodies live in a separate table and are never touched here
+    total_meetings = session.exec(select(func.count()).select_from(Meeting)).one()
+    transcribed_count = session.exec(select(func.count(func.distinct(Transcript.meeting_id)))).one()
+    summarized_count = session.exec(select(func.count(func.distinct(Summary.meeting_id)))).one()
+    action_items_count = session.exec(select(func.count()).select_from(ActionItem)).one()
 
     return StatsResponse(
-        total_meetings=len(total_meetings),
-        transcribed_count=len(transcribed_meeting_ids),
-        summarized_count=len(summarized_meeting_ids),
-        action_items_count=len(all_actions),
+        total_meetings=total_meetings,
+        transcribed_count=transcribed_count,
+        summarized_count=summarized_count,
+        action_items_count=action_items_count,
     )
 
 @router.delete("/meetings/{meeting_id}")
@@ -129,11 +135,30 @@ async def delete_meeting(
         raise HTTPException(status_code=404, detail="Meeting not found")
     
     # Delete associated records using bulk delete
+    transcript_ids = select(Transcript.id).where(Transcript.meeting_id == meeting_id)
+    session.exec(delete(TranscriptBody).where(TranscriptBody.transcript_id.in_(transcript_ids)))
+    session.exec(delete(TranscriptSegment).where(TranscriptSegment.transcript_id.in_(transcript_ids)))
     session.exec(delete(Transcript).where(Transcript.meeting_id == meeting_id))
     session.exec(delete(Summary).where(Summary.meeting_id == meeting_id))
+    session.exec(delete(SummaryState).where(SummaryState.meeting_id == meeting_id))
+    # Items other meetings repeated move to one of them; the rest go with the meeting
+    new_owners = hand_over_actions(session, meeting_id)
+    action_ids = select(ActionItem.id).where(ActionItem.meeting_id == meeting_id)
+    unindex_actions(session, action_ids)
+    record_deletes(session, ActionItem.meeting_id == meeting_id)
+    record_action_deletes(session, session.exec(
+        select(ActionItem.id, ActionItem.meeting_id).where(ActionItem.meeting_id == meeting_id)
+    ).all())
+    session.exec(delete(ActionMention).where(
+        (ActionMention.meeting_id == meeting_id) | (ActionMention.action_id.in_(action_ids))
+    ))
     session.exec(delete(ActionItem).where(ActionItem.meeting_id == meeting_id))
     
     session.delete(meeting)
+    record_meeting_delete(session, meeting_id)
     session.commit()
+    await run_in_threadpool(unindex_meeting, meeting_id)
+    for owner_id in new_owners:
+        await run_in_threadpool(index_meeting, session, owner_id)
     
     return {"message": "Meeting deleted successfully"}
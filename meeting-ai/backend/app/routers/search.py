@@ -0,0 +1,70 @@
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
+from app.db import get_session
+from app.models import Meeting, Summary, ActionItem
+from app.schemas import SemanticMatch, SemanticSearchResult
+
+router = APIRouter()
+
+@router.get("/search/semantic", response_model=List[SemanticSearchResult])
+async def semantic_search(
+    q: str = Query(..., min_length=1, description="Free-text query"),
+    k: int = Query(10, ge=1, le=100, description="Number of meetings to return"),
+    kind: Optional[str] = Query(None, pattern="^(summary|action)$", description="Only match summaries or action items"),
+    # Unrelated lines score below 0.2 about 99% of the time
+    min_score: float = Query(0.2, ge=0, le=1, description="Drop matches less similar than this"),
+    session: Session = Depends(get_session)
+):
+    """Meetings whose summary or action items are closest in meaning to ``q``, best first"""
+    # NumPy and the vector index load on the first search
+    from app.services.semantic_index import KINDS, best_line, get_index, summary_lines
+
+    index = await run_in_threadpool(get_index)
+    # A meeting can match through several summary lines and actions, so ask for more hits than meetings
+    hits = await run_in_threadpool(index.search, q, k * 4, KINDS.get(kind))
+
+    grouped: Dict[int, List] = {}
+    seen = set()
+    for hit in hits:
+        if hit.score < min_score or (hit.kind, hit.ref_id) in seen:
+            continue  # a summary is shown once, with its best line
+        seen.add((hit.kind, hit.ref_id))
+        if hit.meeting_id in grouped or len(grouped) < k:
+            grouped.setdefault(hit.meeting_id, []).append(hit)
+    if not grouped:
+        return []
+
+    meetings = {m.id: m for m in session.exec(select(Meeting).where(Meeting.id.in_(list(grouped))))}
+    summary_ids = [h.ref_id for group in grouped.values() for h in group if h.kind == "summary"]
+    action_ids = [h.ref_id for group in grouped.values() for h in group if h.kind == "action"]
+    summaries = {s.id: s for s in session.exec(select(Summary).where(Summary.id.in_(summary_ids)))} if summary_ids else {}
+    actions = dict(session.exec(select(ActionItem.id, ActionItem.text).where(ActionItem.id.in_(action_ids))).all()) if action_ids else {}
+
+    results = []
+    for meeting_id, group in grouped.items():
+        meeting = meetings.get(meeting_id)
+        if not meeting:
+            continue  # deleted since it was indexed
+        matches = []
+        for hit in group:
+            if hit.kind == "summary" and hit.ref_id in summaries:
+                summary = summaries[hit.ref_id]
+                lines = summary_lines(summary.bullets, summary.decisions, summary.risks)
+                # The summary may have changed since it was indexed
+                text = lines[hit.line] if hit.line < len(lines) else best_line(q, lines)
+            elif hit.kind == "action" and hit.ref_id in actions:
+                text = actions[hit.ref_id]
+            else:
+                continue
+            matches.append(SemanticMatch(kind=hit.kind, id=hit.ref_id, text=text, score=round(hit.score, 4)))
+        if matches:
+            results.append(SemanticSearchResult(
+                meeting_id=meeting.id,
+                title=meeting.title,
+                created_at=meeting.created_at,
+                score=matches[0].score,
+                matches=matches,
+            ))
+    return results
@@ -1,73 +1,160 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+from typing import Dict, Optional, Set
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Request
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
-from app.db import get_session
-from app.deps import get_provider
-from app.models import Meeting, Transcript, Summary, ActionItem
-from app.schemas import SummaryResponse, SummaryCreate
+from starlette.concurrency import run_in_threadpool
+from app.db import get_session, get_engine
+from app.deps import get_provider, get_settings
+from app.models import Meeting, Transcript, Summary
+from app.schemas import SummaryResponse, BatchSummarizeRequest, BatchJobResponse
 from app.providers.base import BaseProvider
+from app.services.summarization import generate_summary, store_summary
+from app.services.rolling_summary import NothingToSummarize, summarize_tail
+from app.services.search import index_meeting
+from app.services.deadline import DeadlineExceeded, request_timeout, run_request
+from app.services.batch import (
+    BatchJob, BatchJobRunning, acquire_lease, create_job, load_job, run_job, select_meeting_ids
+)
+from app.services.singleflight import inflight, idempotency
+from app.services.usage import record_cache_hit, usage_scope
 
 router = APIRouter()
 
+# Batch jobs started by this process; others are read from their checkpoints and leases
+_batch_jobs: Dict[str, BatchJob] = {}
+_batch_tasks: Set[asyncio.Task] = set()
+
 @router.post("/summarize", response_model=SummaryResponse)
 async def summarize_meeting(
+    request: Request,
     meeting_id: int = Query(..., description="Meeting ID to summarize"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     session: Session = Depends(get_session),
     provider: BaseProvider = Depends(get_provider)
 ):
-    """Generate meeting summary and seed action items"""
+    """Generate meeting summary and seed action items.
+
+    Concurrent requests for the same meeting share one provider call; a retry
+    with the same Idempotency-Key gets the original response. The call is
+    cancelled when every waiting client has disconnected, and answered with
+    504 after SUMMARIZE_TIMEOUT_SEC or a shorter X-Request-Timeout.
+    """
     # Verify meeting exists
     meeting = session.get(Meeting, meeting_id)
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
-    
-    # Check if transcript exists
-    transcript = session.exec(
-        select(Transcript).where(Transcript.meeting_id == meeting_id)
-    ).first()
-    
-    if not transcript:
-        raise HTTPException(status_code=400, detail="No transcript found for this meeting")
-    
-    # Check if summary already exists
-    existing_summary = session.exec(
-        select(Summary).where(Summary.meeting_id == meeting_id)
-    ).first()
-    
-    if existing_summary:
-        raise HTTPException(status_code=400, detail="Summary already exists for this meeting")
-    
-    try:
-        # Generate summary using provider
-        summary_data = await provider.summarize(transcript.text)
-        
-        # Save summary to database
-        summary = Summary(
-            meeting_id=meeting_id,
-            bullets=summary_data.bullets,
-            decisions=summary_data.decisions,
-            risks=summary_data.risks
+
+    cache_key = ("summarize", meeting_id, idempotency_key)
+    if idempotency_key:
+        cached = idempotency.get(cache_key)
+        if cached is not None:
+            record_cache_hit("summarize", meeting_id)
+            return cached
+
+    timeout = request_timeout(request, get_settings().summarize_timeout_sec)
+    if ("summarize", meeting_id) in inflight:
+        record_cache_hit("summarize", meeting_id)
+    with usage_scope(meeting_id=meeting_id, source="api"):
+        response = await run_request(
+            request, timeout, lambda: inflight.do(("summarize", meeting_id), lambda: _summarize(meeting_id, provider))
         )
-        session.add(summary)
-        session.commit()
-        session.refresh(summary)
+    if idempotency_key:
+        idempotency.put(cache_key, response)
+    return response
+
+async def _summarize(meeting_id: int, provider: BaseProvider) -> SummaryResponse:
+    """Run one summarization for a meeting; shared by every coalesced request"""
+    with Session(get_engine()) as session:
+        meeting = session.get(Meeting, meeting_id)
+
+        # Check if transcript exists
+        transcript = session.exec(
+            select(Transcript).where(Transcript.meeting_id == meeting_id)
+        ).first()
         
-        # Seed action items
-        for action_data in summary_data.actions:
-            action_item = ActionItem(
-                meeting_id=meeting_id,
-                text=action_data.text,
-                assignee=action_data.assignee,
-                due_date=action_data.due_date,
-                status=action_data.status
-            )
-            session.add(action_item)
+        if not transcript:
+            raise HTTPException(status_code=400, detail="No transcript found for this meeting")
         
-        session.commit()
+        # Check if summary already exists
+        existing_summary = session.exec(
+            select(Summary).where(Summary.meeting_id == meeting_id)
+        ).first()
         
-        return summary
+        if existing_summary:
+            raise HTTPException(status_code=400, detail="Summary already exists for this meeting")
         
+        try:
+            # Generate summary using provider
+            summary_data = await generate_summary(session, meeting, transcript, provider)
+            
+            # Save summary and seed action items in one transaction
+            summary = store_summary(session, meeting_id, summary_data)
+            session.commit()
+            session.refresh(summary)
+            await run_in_threadpool(index_meeting, session, meeting_id)
+            
+            return SummaryResponse.model_validate(summary, from_attributes=True)
+
+        except IntegrityError:
+            # Another worker stored a summary for this meeting first
+            session.rollback()
+            raise HTTPException(status_code=400, detail="Summary already exists for this meeting")
+
+        except DeadlineExceeded:
+            raise
+            
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Summarization failed: {str(e)}")
+
+@router.post("/summarize/incremental", response_model=SummaryResponse)
+async def summarize_meeting_incremental(
+    request: Request,
+    meeting_id: int = Query(..., description="Meeting ID to summarize"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    session: Session = Depends(get_session),
+    provider: BaseProvider = Depends(get_provider)
+):
+    """Fold transcript text added since the last update into the meeting summary.
+
+    Unlike /summarize this can be called repeatedly as a transcript grows,
+    through /meetings/{id}/transcript/append or a live session. The summary
+    and the action items it seeded are updated in place, and only the new
+    text is sent to the provider. With no new text the current summary is
+    returned as is. Timeouts and disconnects are handled as for /summarize.
+    """
+    meeting = session.get(Meeting, meeting_id)
+    if not meeting:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+
+    cache_key = ("summarize_update", meeting_id, idempotency_key)
+    if idempotency_key:
+        cached = idempotency.get(cache_key)
+        if cached is not None:
+            record_cache_hit("summarize_update", meeting_id)
+            return cached
+
+    timeout = request_timeout(request, get_settings().summarize_timeout_sec)
+    if ("summarize_update", meeting_id) in inflight:
+        record_cache_hit("summarize_update", meeting_id)
+    with usage_scope(meeting_id=meeting_id, source="api"):
+        response = await run_request(request, timeout, lambda: inflight.do(
+            ("summarize_update", meeting_id), lambda: _summarize_incremental(meeting_id, provider)
+        ))
+    if idempotency_key:
+        idempotency.put(cache_key, response)
+    return response
+
+async def _summarize_incremental(meeting_id: int, provider: BaseProvider) -> SummaryResponse:
+    try:
+        summary = await summarize_tail(meeting_id, provider)
+    except NothingToSummarize:
+        raise HTTPException(status_code=400, detail="No transcript found for this meeting")
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Summarization failed: {str(e)}")
+    return SummaryResponse.model_validate(summary, from_attributes=True)
 
 @router.get("/meetings/{meeting_id}/summary", response_model=SummaryResponse)
 async def get_meeting_summary(
@@ -83,3 +170,83 @@ async def get_meeting_summary(
         raise HTTPException(status_code=404, detail="Summary not found")
     
     return summary
+
+def _batch_response(job: BatchJob) -> BatchJobResponse:
+    return BatchJobResponse(
+        job_id=job.job_id,
+        status=job.status,
+        total=job.total,
+        completed=job.completed,
+        failed=job.failed,
+        skipped=job.skipped,
+        remaining=job.remaining,
+        elapsed_sec=round(job.elapsed_sec, 3),
+        meetings_per_sec=round(job.meetings_per_sec, 3),
+        errors=job.errors,
+    )
+
+def _start_batch(job: BatchJob, provider: BaseProvider) -> None:
+    """Take the job's lease and run it in the background; raises ``BatchJobRunning``"""
+    owner = acquire_lease(job)
+    job.status = "running"
+    _batch_jobs[job.job_id] = job
+    task = asyncio.create_task(run_job(job, provider, get_engine(), owner))
+    _batch_tasks.add(task)
+    task.add_done_callback(lambda task: _batch_finished(job, task))
+
+def _batch_finished(job: BatchJob, task: asyncio.Task) -> None:
+    _batch_tasks.discard(task)
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        job.status = "failed"
+
+@router.post("/summarize/batch", response_model=BatchJobResponse, status_code=202)
+async def start_batch_summarize(
+    request: BatchSummarizeRequest,
+    session: Session = Depends(get_session),
+    provider: BaseProvider = Depends(get_provider)
+):
+    """Regenerate summaries for many meetings in the background, replacing existing ones"""
+    meeting_ids = select_meeting_ids(
+        session,
+        meeting_ids=request.meeting_ids,
+        created_after=request.created_after,
+        created_before=request.created_before,
+        only_missing=request.only_missing,
+    )
+    if not meeting_ids:
+        raise HTTPException(status_code=400, detail="No transcribed meetings match the filter")
+
+    job = create_job(meeting_ids, request.concurrency)
+    _start_batch(job, provider)
+    return _batch_response(job)
+
+@router.get("/summarize/batch/{job_id}", response_model=BatchJobResponse)
+async def get_batch_summarize(job_id: str):
+    """Progress and throughput of a batch summarization job, from whichever process runs it"""
+    job = _batch_jobs.get(job_id)
+    if job is None or job.status != "running":
+        # Jobs started elsewhere (or since resumed elsewhere) are read from their checkpoint and lease
+        job = load_job(job_id) or job
+    if not job:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    return _batch_response(job)
+
+@router.post("/summarize/batch/{job_id}/resume", response_model=BatchJobResponse, status_code=202)
+async def resume_batch_summarize(
+    job_id: str,
+    provider: BaseProvider = Depends(get_provider)
+):
+    """Continue an interrupted or partially failed job from its checkpoint"""
+    job = load_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    if job.status != "completed":
+        # Taking the lease fails while this or another worker, or the CLI, runs the job
+        try:
+            _start_batch(job, provider)
+        except BatchJobRunning:
+            raise HTTPException(status_code=409, detail="Batch job is already running")
+    return _batch_response(job)
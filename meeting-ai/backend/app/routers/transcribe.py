@@ -1,14 +1,25 @@
+import asyncio
+import json
 import os
 import logging
 import traceback
-import aiofiles
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Header, Request, WebSocket
+from starlette.websockets import WebSocketState
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
-from app.db import get_session
+from app.db import get_session, get_engine
 from app.deps import get_provider, get_settings
-from app.models import Meeting, Transcript
-from app.schemas import TranscriptionResponse
-from app.providers.base import BaseProvider
+from app.models import Meeting, Summary, Transcript
+from app.schemas import TranscriptAppend, TranscriptionResponse, TranscriptRangeResponse, TranscriptSegmentResponse
+from app.providers.base import BaseProvider, AudioInput
+from app.services.transcript_store import ConcurrentAppend, append_transcript, save_transcript, load_text_cached
+from app.services.segments import build_segments, count_segments, segments_in_range, segment_at
+from app.services.deadline import DeadlineExceeded, request_timeout, run_request
+from app.services.singleflight import ConflictingCall, inflight, idempotency
+from app.services.usage import record_cache_hit, usage_scope
+from app.services.live import LiveResult, LiveTranscriber, active_meetings, has_transcript
 
 router = APIRouter()
 
@@ -28,70 +39,325 @@ async def debug_config():
 
 @router.post("/transcribe", response_model=TranscriptionResponse)
 async def transcribe_audio(
+    request: Request,
     meeting_id: int = Query(..., description="Meeting ID to associate transcript with"),
     audio: UploadFile = File(..., description="Audio file to transcribe"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     session: Session = Depends(get_session),
     provider: BaseProvider = Depends(get_provider)
 ):
-    """Upload and transcribe audio file"""
+    """Upload and transcribe audio file.
+
+    Concurrent requests uploading the same audio for a meeting share one
+    provider call, and a different upload while one is in flight gets 409; a
+    retry with the same Idempotency-Key gets the original response. The call
+    is cancelled when every waiting client has disconnected or timed out, and
+    each client is answered with 504 after TRANSCRIBE_TIMEOUT_SEC or its
+    shorter X-Request-Timeout.
+    """
     # Verify meeting exists
     meeting = session.get(Meeting, meeting_id)
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
     
-    # Check if transcript already exists
-    existing_transcript = session.exec(
-        select(Transcript).where(Transcript.meeting_id == meeting_id)
-    ).first()
-    
-    if existing_transcript:
-        raise HTTPException(status_code=400, detail="Transcript already exists for this meeting")
-    
     # Validate file type (accept common fallbacks like application/octet-stream from some browsers/tools)
     content_type = (audio.content_type or "").lower()
     if not (content_type.startswith("audio/") or content_type == "application/octet-stream"):
         raise HTTPException(status_code=400, detail=f"Unsupported content-type: {audio.content_type}")
-    
-    # Save audio file temporarily
-    temp_dir = "temp_audio"
-    os.makedirs(temp_dir, exist_ok=True)
-    
-    temp_path = os.path.join(temp_dir, f"meeting_{meeting_id}_{audio.filename}")
-    
+
+    cache_key = ("transcribe", meeting_id, idempotency_key)
+    if idempotency_key:
+        cached = idempotency.get(cache_key)
+        if cached is not None:
+            record_cache_hit("transcribe", meeting_id)
+            return cached
+
+    settings = get_settings()
+    timeout = request_timeout(request, settings.transcribe_timeout_sec)
+    # The framework closes the upload when this request ends, which may be before a
+    # call other requests share has finished; the call works on its own copy instead
+    upload = await AudioInput.from_file(
+        audio.file, audio.filename or "audio", content_type, settings.audio_spool_max_bytes
+    )
+    if inflight.joins(("transcribe", meeting_id), upload.sha256):
+        record_cache_hit("transcribe", meeting_id)
+    started = False
+
+    def start():
+        nonlocal started
+        started = True
+        return _transcribe(meeting_id, upload, provider)
+
     try:
-        # Save uploaded file
-        async with aiofiles.open(temp_path, "wb") as f:
-            content = await audio.read()
-            await f.write(content)
-        
-        # Transcribe using provider
-        text = await provider.transcribe(temp_path)
-        
-        # Calculate duration (very rough: bytes / 32000 approximates seconds for ~32kbps)
-        file_size = len(content)
-        duration_sec = max(1, int(file_size / 32000))
+        with usage_scope(meeting_id=meeting_id, source="api"):
+            response = await run_request(
+                request, timeout, lambda: inflight.do(("transcribe", meeting_id), start, fingerprint=upload.sha256)
+            )
+    except ConflictingCall:
+        raise HTTPException(status_code=409, detail="A different recording is already being transcribed for this meeting")
+    finally:
+        if not started:
+            upload.close()  # joined a call that was already in flight
+    if idempotency_key:
+        idempotency.put(cache_key, response)
+    return response
+
+async def _transcribe(meeting_id: int, upload: AudioInput, provider: BaseProvider) -> TranscriptionResponse:
+    """Run one transcription for a meeting; shared by every coalesced request, and closes ``upload``"""
+    content_type = upload.content_type
+    with Session(get_engine()) as session:
+        # Check if transcript already exists
+        existing_transcript = session.exec(
+            select(Transcript).where(Transcript.meeting_id == meeting_id)
+        ).first()
         
-        # Save transcript to database
-        transcript = Transcript(
-            meeting_id=meeting_id,
-            text=text,
-            duration_sec=duration_sec
-        )
-        session.add(transcript)
-        session.commit()
-        session.refresh(transcript)
+        if existing_transcript:
+            upload.close()
+            raise HTTPException(status_code=400, detail="Transcript already exists for this meeting")
         
-        return TranscriptionResponse(
-            text=text,
-            duration_sec=duration_sec
-        )
+        processed_input = None
+
+        try:
+            settings = get_settings()
+            prepared = None
+
+            # Downmix, resample and silence-trim WAV uploads off the event loop; other
+            # formats are handed to the provider without being read into memory here
+            head = upload.peek(12)
+            if settings.audio_preprocess and head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+                # numpy is imported with the first upload rather than at startup
+                from app.services.audio import prepare_audio
+                prepared = await run_in_threadpool(
+                    prepare_audio, await upload.read(), upload.filename, content_type,
+                    settings.audio_min_silence_ms,
+                )
+            if prepared and prepared.processed:
+                logging.info(
+                    "Audio pre-processing for meeting %s: %d -> %d bytes, %.1fs -> %.1fs",
+                    meeting_id, prepared.original_bytes, len(prepared.data),
+                    prepared.duration_sec, prepared.processed_sec,
+                )
+                processed_input = AudioInput.from_bytes(
+                    prepared.data, prepared.filename, prepared.content_type, settings.audio_spool_max_bytes
+                )
+
+            # Transcribe using provider
+            result = await provider.transcribe_audio(processed_input or upload)
+            text = result.text
+            
+            if prepared and prepared.duration_sec is not None:
+                duration_sec = max(1, int(round(prepared.duration_sec)))
+            else:
+                # Undecodable container: very rough estimate, bytes / 32000 approximates seconds for ~32kbps
+                duration_sec = max(1, int(upload.size / 32000))
+            
+            # Save transcript to database (text is stored compressed in TranscriptBody)
+            transcript = save_transcript(session, meeting_id, text, duration_sec=duration_sec)
+            # Provider timings refer to the silence-trimmed audio; map them back onto the recording
+            session.add_all(build_segments(
+                transcript.id, text, result.segments,
+                duration_sec=prepared.duration_sec if prepared and prepared.duration_sec else duration_sec,
+                to_original_time=prepared.to_original_time if prepared and prepared.processed else None,
+            ))
+            session.commit()
+            
+            return TranscriptionResponse(
+                text=text,
+                duration_sec=duration_sec
+            )
+
+        except IntegrityError:
+            # Another worker stored a transcript for this meeting first
+            session.rollback()
+            raise HTTPException(status_code=400, detail="Transcript already exists for this meeting")
+
+        except DeadlineExceeded:
+            raise
+            
+        except Exception as e:
+            logging.error("Transcription error with provider %s: %s\n%s", getattr(provider, "get_provider_name", lambda: "unknown")(), str(e), traceback.format_exc())
+            prov = getattr(provider, "get_provider_name", lambda: "unknown")()
+            raise HTTPException(status_code=500, detail=f"Transcription failed ({prov}): {str(e)}")
         
-    except Exception as e:
-        logging.error("Transcription error with provider %s: %s\n%s", getattr(provider, "get_provider_name", lambda: "unknown")(), str(e), traceback.format_exc())
-        prov = getattr(provider, "get_provider_name", lambda: "unknown")()
-        raise HTTPException(status_code=500, detail=f"Transcription failed ({prov}): {str(e)}")
-    
+        finally:
+            upload.close()
+            if processed_input:
+                processed_input.close()
+
+@router.websocket("/transcribe/live")
+async def transcribe_live(
+    websocket: WebSocket,
+    meeting_id: int = Query(..., description="Meeting ID to associate transcript with"),
+    sample_rate: int = Query(16000, ge=8000, le=48000),
+    channels: int = Query(1, ge=1, le=2),
+    provider: BaseProvider = Depends(get_provider)
+):
+    """Transcribe a recording while it is in progress.
+
+    Binary messages carry 16-bit little-endian PCM at ``sample_rate``. The
+    server answers with ``{"type": "partial", ...}`` as windows are
+    transcribed, and ``{"type": "summary", ...}`` when the rolling summary is
+    updated (see LIVE_SUMMARY_EVERY_WINDOWS). Sending ``{"type": "stop"}`` (or disconnecting) ends the
+    session; the transcript is stored and reported as ``{"type": "final", ...}``.
+    """
+    await websocket.accept()
+
+    async def send(message: dict) -> None:
+        if websocket.client_state == WebSocketState.CONNECTED:
+            await websocket.send_json(message)
+
+    async def reject(code: int, detail: str) -> None:
+        await send({"type": "error", "detail": detail})
+        if websocket.client_state == WebSocketState.CONNECTED:
+            await websocket.close(code=code)
+
+    with Session(get_engine()) as session:
+        meeting = session.get(Meeting, meeting_id)
+    if not meeting:
+        return await reject(4404, "Meeting not found")
+    if has_transcript(meeting_id):
+        return await reject(4400, "Transcript already exists for this meeting")
+    if meeting_id in active_meetings:
+        return await reject(4409, "A live session is already running for this meeting")
+
+    async def on_result(result: LiveResult) -> None:
+        await send({
+            "type": "partial",
+            "index": result.index,
+            "start_sec": round(result.start_sec, 3),
+            "end_sec": round(result.end_sec, 3),
+            "text": result.text,
+        })
+
+    async def on_summary(summary: Summary) -> None:
+        await send({
+            "type": "summary",
+            "bullets": summary.bullets,
+            "decisions": summary.decisions,
+            "risks": summary.risks,
+        })
+
+    active_meetings.add(meeting_id)
+    transcriber = LiveTranscriber(
+        meeting_id, provider, sample_rate, channels, on_result=on_result, on_summary=on_summary
+    )
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes"):
+                await transcriber.feed(message["bytes"])
+            elif message.get("text"):
+                try:
+                    control = json.loads(message["text"])
+                except ValueError:
+                    control = {}
+                if control.get("type") == "stop":
+                    break
     finally:
-        # Clean up temporary file
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        # A disconnect without "stop", or this handler being cancelled, still stores what was
+        # recorded: finish() runs as its own task and the shield below keeps it alive
+        finishing = asyncio.ensure_future(transcriber.finish())
+        finishing.add_done_callback(lambda _: active_meetings.discard(meeting_id))
+
+    try:
+        transcript = await asyncio.shield(finishing)
+    except IntegrityError:
+        return await reject(4400, "Transcript already exists for this meeting")
+    except Exception as e:
+        logging.error("Storing the live transcript of meeting %s failed: %s\n%s", meeting_id, e, traceback.format_exc())
+        return await reject(1011, "Could not store the transcript")
+    await send({
+        "type": "final",
+        "transcript_id": transcript.id if transcript else None,
+        "duration_sec": transcript.duration_sec if transcript else 0,
+        "failed_windows": transcriber.errors,
+    })
+    if websocket.client_state == WebSocketState.CONNECTED:
+        await websocket.close()
+
+def _get_transcript(session: Session, meeting_id: int) -> Transcript:
+    transcript = session.exec(
+        select(Transcript).where(Transcript.meeting_id == meeting_id)
+    ).first()
+    if not transcript:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+    return transcript
+
+def _range_response(session: Session, meeting_id: int, transcript: Transcript, segments) -> TranscriptRangeResponse:
+    text = load_text_cached(session, transcript) if segments else ""
+    return TranscriptRangeResponse(
+        meeting_id=meeting_id,
+        transcript_id=transcript.id,
+        duration_sec=transcript.duration_sec,
+        total_segments=count_segments(session, transcript.id),
+        segments=[
+            TranscriptSegmentResponse(
+                index=seg.idx,
+                start_sec=seg.start_sec,
+                end_sec=seg.end_sec,
+                text=text[seg.char_start:seg.char_end],
+            )
+            for seg in segments
+        ],
+    )
+
+@router.post("/meetings/{meeting_id}/transcript/append", response_model=TranscriptRangeResponse)
+async def append_to_transcript(
+    meeting_id: int,
+    body: TranscriptAppend,
+    session: Session = Depends(get_session)
+):
+    """Add text to the end of a stored transcript and return its new segments.
+
+    For transcripts that keep growing, e.g. from a recorder that uploads
+    text as it goes; /summarize/incremental then folds only the added text
+    into the summary. Answers 409 when another append got there first.
+    """
+    transcript = _get_transcript(session, meeting_id)
+    try:
+        first_idx = append_transcript(session, transcript, body.text, duration_sec=body.duration_sec)
+        session.commit()
+    except ConcurrentAppend:
+        session.rollback()
+        raise HTTPException(status_code=409, detail="The transcript changed meanwhile; retry the append")
+    session.refresh(transcript)
+    segments = segments_in_range(session, transcript.id, from_index=first_idx, limit=1000)
+    return _range_response(session, meeting_id, transcript, segments)
+
+@router.get("/meetings/{meeting_id}/transcript/segments", response_model=TranscriptRangeResponse)
+async def get_transcript_segments(
+    meeting_id: int,
+    start_sec: Optional[float] = Query(None, ge=0, description="Only segments ending after this time"),
+    end_sec: Optional[float] = Query(None, ge=0, description="Only segments starting before this time"),
+    from_index: Optional[int] = Query(None, ge=0),
+    to_index: Optional[int] = Query(None, ge=0),
+    limit: int = Query(200, ge=1, le=1000),
+    session: Session = Depends(get_session)
+):
+    """Return a time or index range of the transcript instead of the whole text"""
+    transcript = _get_transcript(session, meeting_id)
+    segments = segments_in_range(
+        session, transcript.id, start_sec=start_sec, end_sec=end_sec,
+        from_index=from_index, to_index=to_index, limit=limit,
+    )
+    return _range_response(session, meeting_id, transcript, segments)
+
+@router.get("/meetings/{meeting_id}/transcript/segment_at", response_model=TranscriptSegmentResponse)
+async def get_segment_at(
+    meeting_id: int,
+    t: float = Query(..., ge=0, description="Offset into the recording in seconds"),
+    session: Session = Depends(get_session)
+):
+    """Look up the segment being spoken at a given time offset"""
+    transcript = _get_transcript(session, meeting_id)
+    seg = segment_at(session, transcript.id, t)
+    if not seg:
+        raise HTTPException(status_code=404, detail="No segment at this offset")
+
+    text = load_text_cached(session, transcript)
+    return TranscriptSegmentResponse(
+        index=seg.idx, start_sec=seg.start_sec, end_sec=seg.end_sec,
+        text=text[seg.char_start:seg.char_end],
+    )
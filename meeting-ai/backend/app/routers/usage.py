@@ -0,0 +1,119 @@
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session, select, func
+from sqlalchemy import case
+from typing import List, Optional
+from datetime import date, datetime
+from app.db import get_session
+from app.models import Meeting, ProviderUsage
+from app.schemas import UsageByDay, UsageByModel, UsageByMeeting, UsageRecord
+
+router = APIRouter()
+
+def _totals():
+    """Aggregate columns shared by every grouping; labels match ``UsageTotals``"""
+    provider_call = ProviderUsage.cache_hit.is_(False)
+    return [
+        func.count().filter(provider_call).label("calls"),
+        func.count().filter(ProviderUsage.status.in_(("error", "timeout"))).label("errors"),
+        func.count().filter(ProviderUsage.cache_hit.is_(True)).label("cache_hits"),
+        func.coalesce(func.sum(ProviderUsage.retries), 0).label("retries"),
+        func.coalesce(func.sum(ProviderUsage.prompt_tokens), 0).label("prompt_tokens"),
+        func.coalesce(func.sum(ProviderUsage.completion_tokens), 0).label("completion_tokens"),
+        func.coalesce(func.sum(ProviderUsage.total_tokens), 0).label("total_tokens"),
+        func.coalesce(func.sum(ProviderUsage.audio_seconds), 0.0).label("audio_seconds"),
+        func.avg(case((provider_call, ProviderUsage.latency_ms))).label("latency_ms_avg"),
+        func.max(case((provider_call, ProviderUsage.latency_ms))).label("latency_ms_max"),
+    ]
+
+def _filtered(query, since: Optional[datetime], until: Optional[datetime], operation: Optional[str], source: Optional[str]):
+    if since:
+        query = query.where(ProviderUsage.created_at >= since)
+    if until:
+        query = query.where(ProviderUsage.created_at < until)
+    if operation:
+        query = query.where(ProviderUsage.operation == operation)
+    if source:
+        query = query.where(ProviderUsage.source == source)
+    return query
+
+def _round(row) -> dict:
+    values = dict(row._mapping)
+    for name in ("audio_seconds", "latency_ms_avg", "latency_ms_max"):
+        if values.get(name) is not None:
+            values[name] = round(values[name], 3)
+    return values
+
+@router.get("/usage/by-day", response_model=List[UsageByDay])
+async def usage_by_day(
+    since: Optional[datetime] = Query(None, description="Only calls at or after this time (UTC)"),
+    until: Optional[datetime] = Query(None, description="Only calls before this time (UTC)"),
+    operation: Optional[str] = Query(None, description="transcribe, summarize or summarize_update"),
+    source: Optional[str] = Query(None, description="api, batch or live"),
+    session: Session = Depends(get_session)
+):
+    """Provider calls, tokens, audio and latency per day (UTC), newest first"""
+    day = func.date(ProviderUsage.created_at)
+    query = select(day.label("day"), *_totals()).group_by(day).order_by(day.desc())
+    rows = session.exec(_filtered(query, since, until, operation, source))
+    return [UsageByDay(**{**_round(row), "day": date.fromisoformat(str(row.day))}) for row in rows]
+
+@router.get("/usage/by-model", response_model=List[UsageByModel])
+async def usage_by_model(
+    since: Optional[datetime] = Query(None, description="Only calls at or after this time (UTC)"),
+    until: Optional[datetime] = Query(None, description="Only calls before this time (UTC)"),
+    operation: Optional[str] = Query(None, description="transcribe, summarize or summarize_update"),
+    source: Optional[str] = Query(None, description="api, batch or live"),
+    session: Session = Depends(get_session)
+):
+    """Provider calls, tokens, audio and latency per provider and model, most tokens first"""
+    query = (
+        select(ProviderUsage.provider, ProviderUsage.model, *_totals())
+        .group_by(ProviderUsage.provider, ProviderUsage.model)
+        .order_by(func.sum(ProviderUsage.total_tokens).desc(), func.count().desc())
+    )
+    rows = session.exec(_filtered(query, since, until, operation, source))
+    return [UsageByModel(**_round(row)) for row in rows]
+
+@router.get("/usage/by-meeting", response_model=List[UsageByMeeting])
+async def usage_by_meeting(
+    since: Optional[datetime] = Query(None, description="Only calls at or after this time (UTC)"),
+    until: Optional[datetime] = Query(None, description="Only calls before this time (UTC)"),
+    operation: Optional[str] = Query(None, description="transcribe, summarize or summarize_update"),
+    source: Optional[str] = Query(None, description="api, batch or live"),
+    order_by: str = Query("tokens", pattern="^(tokens|audio|latency|calls)$", description="Costliest or slowest first"),
+    limit: int = Query(20, ge=1, le=500),
+    session: Session = Depends(get_session)
+):
+    """The meetings that used the most tokens, audio, provider time or calls"""
+    order = {
+        "tokens": func.sum(ProviderUsage.total_tokens),
+        "audio": func.sum(ProviderUsage.audio_seconds),
+        "latency": func.sum(ProviderUsage.latency_ms),
+        "calls": func.count(),
+    }[order_by]
+    query = (
+        select(ProviderUsage.meeting_id, *_totals())
+        .where(ProviderUsage.meeting_id.is_not(None))
+        .group_by(ProviderUsage.meeting_id)
+        .order_by(func.coalesce(order, 0).desc(), ProviderUsage.meeting_id)
+        .limit(limit)
+    )
+    rows = session.exec(_filtered(query, since, until, operation, source)).all()
+    titles = dict(session.exec(
+        select(Meeting.id, Meeting.title).where(Meeting.id.in_([row.meeting_id for row in rows]))
+    ).all()) if rows else {}
+    return [UsageByMeeting(**_round(row), title=titles.get(row.meeting_id)) for row in rows]
+
+@router.get("/meetings/{meeting_id}/usage", response_model=List[UsageRecord])
+async def meeting_usage(
+    meeting_id: int,
+    limit: int = Query(200, ge=1, le=1000),
+    session: Session = Depends(get_session)
+):
+    """Ledger rows for one meeting, newest first (kept after the meeting is deleted)"""
+    return session.exec(
+        select(ProviderUsage)
+        .where(ProviderUsage.meeting_id == meeting_id)
+        .order_by(ProviderUsage.created_at.desc(), ProviderUsage.id.desc())
+        .limit(limit)
+    ).all()
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime, date
 from typing import Optional, List, Dict, Any
 
@@ -27,6 +27,23 @@ class TranscriptResponse(BaseModel):
     duration_sec: Optional[int]
     created_at: datetime
 
+class TranscriptAppend(BaseModel):
+    text: str = Field(..., min_length=1)
+    duration_sec: Optional[int] = Field(None, ge=0)  # length of the audio the text covers
+
+class TranscriptSegmentResponse(BaseModel):
+    index: int
+    start_sec: float
+    end_sec: float
+    text: str
+
+class TranscriptRangeResponse(BaseModel):
+    meeting_id: int
+    transcript_id: int
+    duration_sec: Optional[int]
+    total_segments: int
+    segments: List[TranscriptSegmentResponse]
+
 # Summary schemas
 class SummaryResponse(BaseModel):
     id: int
@@ -41,6 +58,26 @@ class SummaryCreate(BaseModel):
     risks: List[str]
     actions: List["ActionItemCreate"]
 
+class BatchSummarizeRequest(BaseModel):
+    meeting_ids: Optional[List[int]] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    # Skip meetings that already have a summary instead of replacing it
+    only_missing: bool = False
+    concurrency: int = Field(default=4, ge=1, le=32)
+
+class BatchJobResponse(BaseModel):
+    job_id: str
+    status: str
+    total: int
+    completed: int
+    failed: int
+    skipped: int
+    remaining: int
+    elapsed_sec: float
+    meetings_per_sec: float
+    errors: Dict[int, str] = {}
+
 # Action Item schemas
 class ActionItemCreate(BaseModel):
     text: str
@@ -63,12 +100,113 @@ class ActionItemResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+class SimilarActionResponse(ActionItemResponse):
+    meeting_id: int
+    similarity: float
+
+# Analytics schemas
+class AssigneeActionStats(BaseModel):
+    assignee: Optional[str]  # None for unassigned items
+    total: int
+    open: int  # any status other than completed or cancelled
+    by_status: Dict[str, int]
+
+class StatusActionStats(BaseModel):
+    status: str
+    count: int
+
+class DueActionStats(BaseModel):
+    """Open action items by due date, relative to ``as_of``"""
+    as_of: date
+    overdue: int
+    due_today: int
+    due_next_7_days: int
+    due_later: int
+    no_due_date: int
+
+class OverdueActionResponse(ActionItemResponse):
+    meeting_id: int
+    days_overdue: int
+
+class BurndownWeek(BaseModel):
+    week: date  # the Monday starting the week
+    created: int
+    closed: int
+    reopened: int
+    removed: int
+    open: int  # items still open at the end of the week
+
+# Usage ledger schemas
+class UsageTotals(BaseModel):
+    calls: int  # provider calls; cache hits are counted separately
+    errors: int  # failed or timed out
+    cache_hits: int
+    retries: int
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    audio_seconds: float
+    latency_ms_avg: Optional[float]
+    latency_ms_max: Optional[float]
+
+class UsageByDay(UsageTotals):
+    day: date
+
+class UsageByModel(UsageTotals):
+    provider: str
+    model: Optional[str]
+
+class UsageByMeeting(UsageTotals):
+    meeting_id: int
+    title: Optional[str]  # None once the meeting is deleted
+
+class UsageRecord(BaseModel):
+    id: int
+    created_at: datetime
+    operation: str
+    source: Optional[str]
+    provider: str
+    model: Optional[str]
+    status: str
+    cache_hit: bool
+    retries: int
+    prompt_tokens: Optional[int]
+    completion_tokens: Optional[int]
+    total_tokens: Optional[int]
+    audio_seconds: Optional[float]
+    latency_ms: float
+    error: Optional[str]
+
+# Search schemas
+class SemanticMatch(BaseModel):
+    kind: str  # summary or action
+    id: int
+    text: str
+    score: float
+
+class SemanticSearchResult(BaseModel):
+    meeting_id: int
+    title: str
+    created_at: datetime
+    score: float
+    matches: List[SemanticMatch]
+
 # Transcription schemas
 class TranscriptionResponse(BaseModel):
     text: str
     duration_sec: Optional[int]
 
 # Provider schemas
+class SegmentData(BaseModel):
+    start: float
+    end: float
+    text: str
+
+class TranscriptionResult(BaseModel):
+    text: str
+    # Empty when the provider has no timing information; segments are then synthesized
+    segments: List[SegmentData] = []
+
 class SummaryData(BaseModel):
     bullets: List[str]
     decisions: List[str]
@@ -80,4 +218,19 @@ class StatsResponse(BaseModel):
     total_meetings: int
     transcribed_count: int
     summarized_count: int
-    action_items_count: int
\ No newline at end of file
+    action_items_count: int
+
+# Change feed schemas
+class ChangeRecord(BaseModel):
+    seq: int
+    entity: str  # meeting, transcript, summary, action
+    id: int
+    meeting_id: Optional[int]
+    op: str  # upsert, delete
+    data: Optional[Dict[str, Any]]  # the entity as its endpoints return it; None for deletes
+    at: datetime
+
+class ChangesResponse(BaseModel):
+    seq: int  # pass as since= next time
+    reset: bool = False  # the log no longer reaches back to since=; reload and start over
+    changes: List[ChangeRecord] = []
@@ -0,0 +1,198 @@
+"""Rule-based action item extraction.
+
+Finds phrases like "John needs to prepare the Q4 forecast by Friday" in a
+transcript and turns them into ``ActionItemCreate`` objects, so providers can
+skip asking the LLM for action items when the rules already cover them.
+"""
+
+import calendar
+import re
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import List, Optional
+
+from app.schemas import ActionItemCreate
+
+_WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+_WEEKDAY = r"(?:mon|tues|wednes|thurs|fri|satur|sun)day"
+_NUMBERS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5}
+
+_DUE = rf"""
+    (?i:
+        (?:(?:by|before|on|until|due)\s+)?
+        (?:
+            (?:next|this|the\s+following|following)\s+(?:{_WEEKDAY}|week|month)
+          | (?:the\s+)?end\s+of\s+(?:the\s+)?(?:day|week|month|quarter|year)
+          | eod|eow|eom|tomorrow|today|tonight
+          | in\s+(?:\d+|a|an|one|two|three|four|five)\s+(?:days?|weeks?)
+          | \d{{4}}-\d{{2}}-\d{{2}}
+        )
+      | (?:by|before|on|until)\s+{_WEEKDAY}
+    )
+"""
+
+# A single pattern with two branches: ``item`` matches an assigned action at
+# the start of a clause, ``cue`` matches obligation words anywhere else. Stray
+# cues are actions the rules could not attribute, which lowers confidence.
+_PATTERN = re.compile(
+    rf"""
+    (?P<item>
+        (?:^|(?<=[.:;,!?]))[ \t\r\n]*
+        (?:(?i:and|then|also)\s+)?
+        (?P<assignee>(?:[Tt]he\s+)?[A-Za-z]+\s+(?i:team)|[A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)
+        \s+(?P<modal>(?i:(?:will\s+)?(?:needs?|has|have)\s+to|should|must|will|(?:is|are)\s+going\s+to))\s+
+        (?P<action>[a-z][^.;,!?]*?)
+        (?:\s+(?P<due>{_DUE}))?
+        [ \t\r\n]*(?=[.;,!?]|$)
+    )
+    |(?P<cue>\b(?i:needs?\s+to|should|must|has\s+to|have\s+to)\b)
+    """,
+    re.MULTILINE | re.VERBOSE,
+)
+
+# Clause openers that look like names to the pattern but never own an action.
+_NOT_ASSIGNEES = {
+    "we", "i", "you", "they", "it", "this", "that", "there", "he", "she",
+    "everyone", "someone", "somebody", "nobody", "welcome", "today", "also",
+    "then", "let", "please", "who", "what", "which", "next",
+    # "Monday will be busy", "March should be quieter"
+    *_WEEKDAYS, *(month.lower() for month in calendar.month_name[1:]),
+}
+# Words that open a clause ahead of the name ("Please Anna should ...", "So Mark will ...")
+_FILLERS = {"please", "so", "ok", "okay", "well", "now", "and", "then", "also", "maybe", "today", "next"}
+# Fewer items than this never count as confident, however few stray cues there are
+MIN_CONFIDENT_ACTIONS = 2
+_STRONG_MODALS = re.compile(r"(?i)needs?\s+to|should|must|has\s+to|have\s+to")
+
+
+@dataclass
+class ActionExtraction:
+    """Action items found by the rules plus how much of the transcript they cover"""
+
+    actions: List[ActionItemCreate] = field(default_factory=list)
+    matched: int = 0
+    unmatched_cues: int = 0
+
+    @property
+    def confidence(self) -> float:
+        total = self.matched + self.unmatched_cues
+        return self.matched / total if total else 0.0
+
+    def is_confident(self, threshold: float) -> bool:
+        return len(self.actions) >= MIN_CONFIDENT_ACTIONS and self.confidence >= threshold
+
+
+def extract_actions(transcript: str, reference: Optional[date] = None) -> ActionExtraction:
+    """Extract assigned action items in one pass over the transcript.
+
+    Relative due dates ("next Friday", "end of month") are resolved against
+    ``reference``, normally the meeting date.
+    """
+    reference = reference or date.today()
+    result = ActionExtraction()
+    seen = set()
+    last_due: Optional[date] = None
+
+    for match in _PATTERN.finditer(transcript):
+        if match.group("cue"):
+            result.unmatched_cues += 1
+            continue
+
+        words = match.group("assignee").split()
+        while len(words) > 1 and words[0].lower() in _FILLERS:
+            words = words[1:]
+        assignee = " ".join(words)
+        if assignee.lower().removeprefix("the ") in _NOT_ASSIGNEES:
+            if _STRONG_MODALS.fullmatch(" ".join(match.group("modal").split())):
+                result.unmatched_cues += 1
+            continue
+
+        text = " ".join(match.group("action").split())
+        due_date = None
+        if match.group("due"):
+            due_date = _resolve_due(match.group("due"), reference, last_due)
+            last_due = due_date or last_due
+
+        result.matched += 1
+        key = (assignee.lower(), text.lower())
+        if key in seen:
+            continue
+        seen.add(key)
+        result.actions.append(
+            ActionItemCreate(
+                text=text[0].upper() + text[1:],
+                assignee=_normalize_assignee(assignee),
+                due_date=due_date,
+                status="open",
+            )
+        )
+
+    return result
+
+
+def _normalize_assignee(assignee: str) -> str:
+    if assignee.lower().endswith(" team"):
+        return assignee.lower().removeprefix("the ").title()
+    return assignee
+
+
+def _resolve_due(phrase: str, reference: date, last_due: Optional[date]) -> Optional[date]:
+    """Turn a relative due-date phrase into a calendar date"""
+    words = phrase.lower().split()
+    while words and words[0] in ("by", "before", "on", "until", "due", "the"):
+        words = words[1:]
+    if not words:
+        return None
+    phrase = " ".join(words)
+
+    if re.fullmatch(r"\d{4}-\d{2}-\d{2}", phrase):
+        try:
+            return date.fromisoformat(phrase)
+        except ValueError:
+            return None
+    if phrase in ("today", "tonight", "eod", "end of day", "end of the day"):
+        return reference
+    if phrase == "tomorrow":
+        return reference + timedelta(days=1)
+    if phrase in ("eow", "end of week", "end of the week"):
+        return _upcoming(reference, 4, allow_same_day=True)
+    if phrase in ("eom", "end of month", "end of the month"):
+        return _month_end(reference.year, reference.month)
+    if phrase.startswith("end of") and phrase.endswith("quarter"):
+        last_month = ((reference.month - 1) // 3 + 1) * 3
+        return _month_end(reference.year, last_month)
+    if phrase.startswith("end of") and phrase.endswith("year"):
+        return date(reference.year, 12, 31)
+
+    if words[0] == "in" and len(words) == 3:
+        count = int(words[1]) if words[1].isdigit() else _NUMBERS.get(words[1], 1)
+        days = count * 7 if words[2].startswith("week") else count
+        return reference + timedelta(days=days)
+
+    unit = words[-1]
+    qualifier = words[0] if len(words) > 1 else ""
+    if unit in _WEEKDAYS:
+        weekday = _WEEKDAYS.index(unit)
+        if qualifier == "following" and last_due:
+            return _upcoming(last_due, weekday, allow_same_day=False)
+        return _upcoming(reference, weekday, allow_same_day=qualifier in ("", "this"))
+    if unit == "week":
+        monday = reference - timedelta(days=reference.weekday())
+        return monday + timedelta(days=7) if qualifier != "this" else reference
+    if unit == "month":
+        if qualifier == "this":
+            return _month_end(reference.year, reference.month)
+        year, month = divmod(reference.year * 12 + reference.month, 12)
+        return date(year, month + 1, 1)
+    return None
+
+
+def _upcoming(reference: date, weekday: int, allow_same_day: bool) -> date:
+    days = (weekday - reference.weekday()) % 7
+    if days == 0 and not allow_same_day:
+        days = 7
+    return reference + timedelta(days=days)
+
+
+def _month_end(year: int, month: int) -> date:
+    return date(year, month, calendar.monthrange(year, month)[1])
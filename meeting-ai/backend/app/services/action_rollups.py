@@ -0,0 +1,180 @@
+"""Rollup tables behind the action item analytics endpoints.
+
+``ActionCount``, ``ActionDueCount`` and ``ActionWeek`` hold pre-aggregated
+counts. They change together with ``ActionItem`` in the same transaction:
+the action routes, summary seeding, meeting deletion and the bulk loader all
+describe their writes as a ``RollupDelta``. Applying a delta costs one
+``UPDATE`` per touched key, plus an ``INSERT`` the first time a key appears.
+Analytics therefore read a few hundred rollup rows however many items exist.
+
+``rebuild_rollups`` recomputes everything from ``ActionItem``. It runs at
+startup when the rollups are empty but actions exist, e.g. on a database
+created before the rollups were added.
+"""
+
+import logging
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import and_, func, insert, update
+from sqlmodel import Session, select, delete
+
+from app.db import get_engine
+from app.models import ActionItem, ActionCount, ActionDueCount, ActionWeek
+
+logger = logging.getLogger("uvicorn.error")
+
+CLOSED_STATUSES = ("completed", "cancelled")
+# Stands in for a missing due date, which cannot be part of a primary key
+NO_DUE_DATE = date.min
+
+# (assignee, status, due_date) as stored on an item
+RollupKey = Tuple[Optional[str], str, Optional[date]]
+
+
+def is_open(status: str) -> bool:
+    return status not in CLOSED_STATUSES
+
+
+def week_of(value) -> date:
+    """The Monday starting the week of a date or datetime"""
+    day = value.date() if isinstance(value, datetime) else value
+    return day - timedelta(days=day.weekday())
+
+
+def rollup_key(item: ActionItem) -> RollupKey:
+    return (item.assignee, item.status, item.due_date)
+
+
+class RollupDelta:
+    """Changes to the rollups, gathered in memory and applied with one statement per key"""
+
+    def __init__(self) -> None:
+        self.counts: Counter = Counter()
+        self.due: Counter = Counter()
+        self.weeks: Dict[date, Counter] = defaultdict(Counter)
+
+    def _adjust(self, key: RollupKey, n: int) -> None:
+        assignee, status, due_date = key
+        self.counts[(assignee or "", status)] += n
+        self.due[(status, due_date or NO_DUE_DATE)] += n
+
+    def added(self, key: RollupKey, created_at: datetime, closed_at: Optional[datetime] = None, n: int = 1) -> None:
+        """``n`` new items; closed ones count as closed in the week of ``closed_at``"""
+        self._adjust(key, n)
+        self.weeks[week_of(created_at)]["created"] += n
+        if not is_open(key[1]):
+            self.weeks[week_of(closed_at or created_at)]["closed"] += n
+
+    def removed(self, key: RollupKey, when: datetime, n: int = 1) -> None:
+        self._adjust(key, -n)
+        if is_open(key[1]):
+            self.weeks[week_of(when)]["removed"] += n
+
+    def changed(self, before: RollupKey, after: RollupKey, when: datetime) -> None:
+        if before == after:
+            return
+        self._adjust(before, -1)
+        self._adjust(after, 1)
+        if is_open(before[1]) and not is_open(after[1]):
+            self.weeks[week_of(when)]["closed"] += 1
+        elif not is_open(before[1]) and is_open(after[1]):
+            self.weeks[week_of(when)]["reopened"] += 1
+
+    def apply(self, conn) -> None:
+        """Write the changes through a ``Session`` or ``Connection``; the caller commits"""
+        for (assignee, status), n in self.counts.items():
+            if n:
+                _bump(conn, ActionCount, {"assignee": assignee, "status": status}, {"count": n})
+        for (status, due_date), n in self.due.items():
+            if n:
+                _bump(conn, ActionDueCount, {"status": status, "due_date": due_date}, {"count": n})
+        for week, counters in self.weeks.items():
+            changes = {column: n for column, n in counters.items() if n}
+            if changes:
+                _bump(conn, ActionWeek, {"week": week}, changes)
+
+
+def _bump(conn, model, key: dict, changes: dict) -> None:
+    table = model.__table__
+    matches = and_(*(table.c[column] == value for column, value in key.items()))
+    result = conn.execute(
+        update(table).where(matches).values({column: table.c[column] + n for column, n in changes.items()})
+    )
+    if result.rowcount == 0:
+        counters = {c.name: 0 for c in table.columns if c.name not in key}
+        conn.execute(insert(table).values({**counters, **key, **changes}))
+
+
+def record_insert(session: Session, item: ActionItem) -> None:
+    delta = RollupDelta()
+    delta.added(rollup_key(item), item.created_at or datetime.utcnow())
+    delta.apply(session)
+
+
+def record_update(session: Session, before: RollupKey, item: ActionItem) -> None:
+    """Move ``item`` from the rollup buckets of ``before`` to its current ones"""
+    delta = RollupDelta()
+    delta.changed(before, rollup_key(item), datetime.utcnow())
+    delta.apply(session)
+
+
+def record_delete(session: Session, item: ActionItem) -> None:
+    delta = RollupDelta()
+    delta.removed(rollup_key(item), datetime.utcnow())
+    delta.apply(session)
+
+
+def record_deletes(session: Session, where) -> None:
+    """Account for the action items matching ``where`` before the caller bulk deletes them"""
+    delta = RollupDelta()
+    now = datetime.utcnow()
+    rows = session.exec(
+        select(ActionItem.assignee, ActionItem.status, ActionItem.due_date, func.count())
+        .where(where)
+        .group_by(ActionItem.assignee, ActionItem.status, ActionItem.due_date)
+    )
+    for assignee, status, due_date, n in rows:
+        delta.removed((assignee, status, due_date), now, n)
+    delta.apply(session)
+
+
+def rebuild_rollups(session: Session, batch_size: int = 20000) -> int:
+    """Recompute every rollup from ``ActionItem``; returns the number of items counted.
+
+    Past status changes are not recorded, so items that are closed now count
+    as closed in the week they were last updated.
+    """
+    for model in (ActionCount, ActionDueCount, ActionWeek):
+        session.exec(delete(model))
+    delta = RollupDelta()
+    count = 0
+    last_id = 0
+    while True:
+        rows = session.exec(
+            select(
+                ActionItem.id, ActionItem.assignee, ActionItem.status, ActionItem.due_date,
+                ActionItem.created_at, ActionItem.updated_at,
+            ).where(ActionItem.id > last_id).order_by(ActionItem.id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        for _, assignee, status, due_date, created_at, updated_at in rows:
+            delta.added((assignee, status, due_date), created_at, updated_at)
+        count += len(rows)
+        last_id = rows[-1][0]
+    delta.apply(session)
+    session.commit()
+    return count
+
+
+def ensure_rollups() -> None:
+    """Backfill the rollups once for a database that has actions but no rollup rows"""
+    with Session(get_engine()) as session:
+        if session.exec(select(ActionCount.status).limit(1)).first() is not None:
+            return
+        if session.exec(select(ActionItem.id).limit(1)).first() is None:
+            return
+        count = rebuild_rollups(session)
+        logger.info("Backfilled action rollups from %d action items", count)
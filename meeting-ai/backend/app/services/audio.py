@@ -0,0 +1,216 @@
+"""Audio pre-processing before uploads are handed to a provider.
+
+PCM WAV uploads are decoded, downmixed to mono, resampled to 16 kHz and have
+long silences cut with an energy-based voice activity detector. Speech models
+work at 16 kHz mono anyway, so this shrinks the payload without hurting
+accuracy. Other containers (webm, mp3, m4a) are passed through untouched.
+"""
+
+import io
+import os
+import wave
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+TARGET_SAMPLE_RATE = 16000
+FRAME_MS = 30
+# Speech frames are padded by this much on both sides so word edges survive
+HANGOVER_MS = 240
+# Silence left in place where a longer pause was cut
+KEEP_GAP_MS = 240
+# Frames this far above the noise floor (as a share of floor-to-peak range) count as speech
+VOICE_THRESHOLD = 0.3
+# Below this floor-to-peak spread the recording has no real silence to cut
+MIN_DYNAMIC_RANGE_DB = 10.0
+
+
+@dataclass
+class PreparedAudio:
+    data: bytes
+    filename: str
+    content_type: str
+    original_bytes: int
+    # Length of the original recording; None when the format could not be decoded
+    duration_sec: Optional[float] = None
+    # Length of the audio actually sent after silence trimming
+    processed_sec: Optional[float] = None
+    # (processed offset, original offset) at the start of every run of kept audio
+    time_map: List[Tuple[float, float]] = field(default_factory=list)
+
+    @property
+    def processed(self) -> bool:
+        return self.processed_sec is not None
+
+    def to_original_time(self, seconds: float) -> float:
+        """Map a timestamp in the trimmed audio back onto the original recording"""
+        if not self.time_map:
+            return seconds
+        i = max(0, bisect_right(self.time_map, (seconds, float("inf"))) - 1)
+        processed_start, original_start = self.time_map[i]
+        return original_start + (seconds - processed_start)
+
+
+def prepare_audio(
+    content: bytes,
+    filename: str,
+    content_type: str,
+    min_silence_ms: int = 700,
+) -> PreparedAudio:
+    """Downmix, resample and silence-trim a WAV upload; pass other formats through"""
+    passthrough = PreparedAudio(
+        data=content, filename=filename, content_type=content_type, original_bytes=len(content)
+    )
+    if content[:4] != b"RIFF" or content[8:12] != b"WAVE":
+        return passthrough
+    try:
+        samples, sample_rate = decode_wav(content)
+    except (wave.Error, EOFError, ValueError):
+        return passthrough
+    if samples.size == 0:
+        return passthrough
+
+    duration_sec = samples.shape[0] / sample_rate
+    mono = samples.mean(axis=1) if samples.shape[1] > 1 else samples[:, 0]
+    mono = resample(mono, sample_rate, TARGET_SAMPLE_RATE)
+    keep = silence_mask(mono, TARGET_SAMPLE_RATE, min_silence_ms=min_silence_ms)
+    trimmed = apply_mask(mono, keep, TARGET_SAMPLE_RATE)
+
+    stem = os.path.splitext(os.path.basename(filename or "audio"))[0] or "audio"
+    return PreparedAudio(
+        data=encode_wav(trimmed, TARGET_SAMPLE_RATE),
+        filename=f"{stem}.wav",
+        content_type="audio/wav",
+        original_bytes=len(content),
+        duration_sec=duration_sec,
+        processed_sec=trimmed.shape[0] / TARGET_SAMPLE_RATE,
+        time_map=_time_map(keep),
+    )
+
+
+def decode_wav(content: bytes) -> Tuple[np.ndarray, int]:
+    """Decode PCM WAV bytes into float32 samples shaped (frames, channels) in [-1, 1]"""
+    with wave.open(io.BytesIO(content), "rb") as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        sample_rate = wav.getframerate()
+        raw = wav.readframes(wav.getnframes())
+
+    if width == 1:
+        data = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        data = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        bytes3 = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = bytes3[:, 0] | (bytes3[:, 1] << 8) | (bytes3[:, 2] << 16)
+        ints = np.where(ints & 0x800000, ints - 0x1000000, ints)
+        data = ints.astype(np.float32) / 8388608.0
+    elif width == 4:
+        data = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported sample width: {width}")
+
+    usable = (data.shape[0] // channels) * channels
+    return data[:usable].reshape(-1, channels), sample_rate
+
+
+def encode_wav(samples: np.ndarray, sample_rate: int) -> bytes:
+    """Encode mono float samples as 16-bit PCM WAV"""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """Linear-interpolation resampler with a boxcar low-pass when downsampling"""
+    if source_rate == target_rate or samples.size == 0:
+        return samples.astype(np.float32, copy=False)
+    if source_rate > target_rate:
+        width = int(round(source_rate / target_rate))
+        if width > 1:
+            csum = np.cumsum(np.concatenate(([0.0], samples.astype(np.float64))))
+            smoothed = (csum[width:] - csum[:-width]) / width
+            samples = np.concatenate((smoothed, np.full(width - 1, smoothed[-1] if smoothed.size else 0.0)))
+    target_len = int(samples.shape[0] * target_rate / source_rate)
+    positions = np.arange(target_len) * (source_rate / target_rate)
+    return np.interp(positions, np.arange(samples.shape[0]), samples).astype(np.float32)
+
+
+def trim_silence(samples: np.ndarray, sample_rate: int, min_silence_ms: int = 700) -> np.ndarray:
+    """Cut pauses longer than ``min_silence_ms`` down to a short gap"""
+    return apply_mask(samples, silence_mask(samples, sample_rate, min_silence_ms), sample_rate)
+
+
+def silence_mask(samples: np.ndarray, sample_rate: int, min_silence_ms: int = 700) -> Optional[np.ndarray]:
+    """Per-frame keep mask for ``trim_silence``; None when nothing should be cut"""
+    frame = int(sample_rate * FRAME_MS / 1000)
+    n_frames = samples.shape[0] // frame
+    if n_frames < 2:
+        return None
+
+    energy = np.square(samples[: n_frames * frame].reshape(n_frames, frame)).mean(axis=1)
+    db = 10.0 * np.log10(energy + 1e-10)
+    floor, peak = np.percentile(db, [10, 95])
+    if peak - floor < MIN_DYNAMIC_RANGE_DB:
+        return None
+
+    voiced = db > floor + VOICE_THRESHOLD * (peak - floor)
+    pad = HANGOVER_MS // FRAME_MS
+    voiced = np.convolve(voiced.astype(np.int8), np.ones(2 * pad + 1, dtype=np.int8), mode="same") > 0
+    if not voiced.any():
+        return None
+
+    keep = voiced.copy()
+    min_run = max(1, min_silence_ms // FRAME_MS)
+    gap = KEEP_GAP_MS // FRAME_MS
+    # Run-length encode the silent stretches and keep a short gap from each long one
+    edges = np.flatnonzero(np.diff(np.concatenate(([1], voiced.astype(np.int8), [1]))))
+    for start, end in zip(edges[::2], edges[1::2]):
+        keep[start:end] = (end - start) < min_run
+        if (end - start) >= min_run:
+            keep[start:start + gap] = True
+    return keep
+
+
+def quietest_split(pcm: bytes, sample_rate: int, channels: int, search_sec: float) -> int:
+    """Byte offset of the quietest frame within the last ``search_sec`` of 16-bit PCM.
+
+    Live audio is cut here rather than at a fixed length so words are not split
+    between two transcription requests.
+    """
+    frame_bytes = int(sample_rate * FRAME_MS / 1000) * channels * 2
+    search_bytes = int(search_sec * sample_rate) * channels * 2
+    start = max(0, len(pcm) - search_bytes)
+    start -= start % frame_bytes
+    n_frames = (len(pcm) - start) // frame_bytes
+    if n_frames < 2:
+        return len(pcm)
+    tail = np.frombuffer(pcm[start:start + n_frames * frame_bytes], dtype="<i2").astype(np.float32)
+    energy = np.square(tail.reshape(n_frames, -1)).mean(axis=1)
+    return start + int(np.argmin(energy)) * frame_bytes + frame_bytes // 2 // (channels * 2) * (channels * 2)
+
+
+def apply_mask(samples: np.ndarray, keep: Optional[np.ndarray], sample_rate: int) -> np.ndarray:
+    if keep is None:
+        return samples
+    frame = int(sample_rate * FRAME_MS / 1000)
+    n_frames = keep.shape[0]
+    mask = np.repeat(keep, frame)
+    tail = samples[n_frames * frame:]
+    return np.concatenate((samples[: n_frames * frame][mask], tail if keep[-1] else tail[:0]))
+
+
+def _time_map(keep: Optional[np.ndarray]) -> List[Tuple[float, float]]:
+    if keep is None:
+        return []
+    frame_sec = FRAME_MS / 1000
+    starts = np.flatnonzero(np.diff(np.concatenate(([0], keep.astype(np.int8)))) == 1)
+    kept_before = np.cumsum(keep) - keep
+    return [(float(kept_before[i]) * frame_sec, float(i) * frame_sec) for i in starts]
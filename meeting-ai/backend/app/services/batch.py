@@ -0,0 +1,343 @@
+"""Batch (re)summarization with bounded concurrency and resumable checkpoints.
+
+Each job writes two files to ``BATCH_CHECKPOINT_DIR``: ``<job_id>.json`` with
+the resolved meeting ids and settings, and ``<job_id>.jsonl`` with one line per
+finished meeting. Resuming a job skips every meeting already recorded as done.
+
+While a job runs, its owner (an API worker or the CLI) refreshes
+``<job_id>.lease`` every ``HEARTBEAT_INTERVAL_SEC``. Other processes read the
+lease to report the job as running, and refuse to start it a second time. The
+lease is created exclusively, so concurrent starts cannot both win. A lease
+not refreshed for ``LEASE_TIMEOUT_SEC`` belongs to a process that died, and
+the job can be resumed.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
+
+from app.deps import get_settings
+from app.models import Meeting, Transcript, Summary
+from app.providers.base import BaseProvider
+from app.services.search import index_meeting
+from app.services.summarization import generate_summary, store_summary, get_transcript
+from app.services.usage import usage_scope
+
+logger = logging.getLogger("uvicorn.error")
+
+# Only the first failures are kept on the job to bound its size
+MAX_REPORTED_ERRORS = 50
+HEARTBEAT_INTERVAL_SEC = 5.0
+LEASE_TIMEOUT_SEC = 30.0
+
+
+class BatchJobRunning(RuntimeError):
+    """The job is being run by another process (or another task in this one)"""
+
+
+@dataclass
+class BatchJob:
+    job_id: str
+    meeting_ids: List[int]
+    concurrency: int = 4
+    status: str = "pending"  # pending, running, completed, failed
+    completed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    # Meetings already done before this run started (excluded from throughput)
+    resumed_from: int = 0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    errors: Dict[int, str] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return len(self.meeting_ids)
+
+    @property
+    def remaining(self) -> int:
+        return self.total - self.completed - self.failed - self.skipped
+
+    @property
+    def elapsed_sec(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def meetings_per_sec(self) -> float:
+        elapsed = self.elapsed_sec
+        return (self.completed - self.resumed_from) / elapsed if elapsed > 0 else 0.0
+
+
+def select_meeting_ids(
+    session: Session,
+    meeting_ids: Optional[List[int]] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    only_missing: bool = False,
+) -> List[int]:
+    """Meetings with a transcript matching the filter, in id order"""
+    query = select(Meeting.id).join(Transcript, Transcript.meeting_id == Meeting.id)
+    if meeting_ids:
+        query = query.where(Meeting.id.in_(meeting_ids))
+    if created_after:
+        query = query.where(Meeting.created_at >= created_after)
+    if created_before:
+        query = query.where(Meeting.created_at < created_before)
+    if only_missing:
+        query = query.where(~select(Summary.id).where(Summary.meeting_id == Meeting.id).exists())
+    return list(session.exec(query.distinct().order_by(Meeting.id)).all())
+
+
+def _paths(job_id: str):
+    directory = get_settings().batch_checkpoint_dir
+    return os.path.join(directory, f"{job_id}.json"), os.path.join(directory, f"{job_id}.jsonl")
+
+
+def _lease_path(job_id: str) -> str:
+    return os.path.join(get_settings().batch_checkpoint_dir, f"{job_id}.lease")
+
+
+def _read_lease_file(path: str) -> Optional[dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except json.JSONDecodeError:
+        # Created but not yet written by its owner; its age stands in for the heartbeat
+        try:
+            created = os.path.getmtime(path)
+        except OSError:
+            return None
+        return {"owner": None, "started_at": created, "heartbeat": created, "resumed_from": 0}
+    except OSError:
+        return None
+
+
+def _is_live(lease: Optional[dict]) -> bool:
+    return lease is not None and time.time() - lease.get("heartbeat", 0) <= LEASE_TIMEOUT_SEC
+
+
+def read_lease(job_id: str) -> Optional[dict]:
+    """The lease of a job whose owner has heartbeated within ``LEASE_TIMEOUT_SEC``"""
+    lease = _read_lease_file(_lease_path(job_id))
+    return lease if _is_live(lease) else None
+
+
+def _lease_body(job: BatchJob, owner: str, started_at: float) -> str:
+    return json.dumps({"owner": owner, "started_at": started_at, "heartbeat": time.time(),
+                       "resumed_from": job.resumed_from})
+
+
+def acquire_lease(job: BatchJob) -> str:
+    """Take the job's lease, or raise ``BatchJobRunning`` when a live one exists.
+
+    The lease file is created with ``O_EXCL``, so of two processes starting
+    the job at once exactly one succeeds. A stale lease is first renamed to a
+    name private to this process; whoever renames it wins the takeover, and a
+    lease that turns out to have been refreshed in the meantime is put back.
+    Returns the owner token the heartbeat and release check against.
+    """
+    path = _lease_path(job.job_id)
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    while True:
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            pass
+        else:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(_lease_body(job, owner, time.time()))
+            return owner
+
+        if _is_live(_read_lease_file(path)):
+            raise BatchJobRunning(job.job_id)
+        stale = f"{path}.{owner.replace(':', '-')}.stale"
+        try:
+            os.rename(path, stale)
+        except FileNotFoundError:
+            continue  # another process took it over or released it first
+        if _is_live(_read_lease_file(stale)):
+            # Renamed a lease its owner had just refreshed or created; put it back
+            try:
+                os.link(stale, path)
+            except FileExistsError:
+                pass
+            os.remove(stale)
+            raise BatchJobRunning(job.job_id)
+        os.remove(stale)
+
+
+def _write_lease(job: BatchJob, owner: str, started_at: float) -> None:
+    path = _lease_path(job.job_id)
+    current = _read_lease_file(path)
+    if current is None or current.get("owner") != owner:
+        raise BatchJobRunning(job.job_id)
+    tmp = f"{path}.{owner.replace(':', '-')}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(_lease_body(job, owner, started_at))
+    os.replace(tmp, path)
+
+
+def _release_lease(job_id: str, owner: str) -> None:
+    path = _lease_path(job_id)
+    lease = _read_lease_file(path)
+    if lease is not None and lease.get("owner") == owner:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+async def _heartbeat(job: BatchJob, owner: str, started_at: float) -> None:
+    while True:
+        await asyncio.sleep(HEARTBEAT_INTERVAL_SEC)
+        try:
+            _write_lease(job, owner, started_at)
+        except BatchJobRunning:
+            logger.warning("Batch %s: lease was taken over by another process", job.job_id)
+            return
+        except OSError as e:
+            logger.warning("Batch %s: could not refresh lease: %s", job.job_id, e)
+
+
+def create_job(meeting_ids: List[int], concurrency: int) -> BatchJob:
+    job = BatchJob(job_id=uuid.uuid4().hex[:12], meeting_ids=meeting_ids, concurrency=concurrency)
+    spec_path, _ = _paths(job.job_id)
+    os.makedirs(os.path.dirname(spec_path) or ".", exist_ok=True)
+    with open(spec_path, "w", encoding="utf-8") as f:
+        json.dump({"job_id": job.job_id, "meeting_ids": meeting_ids, "concurrency": concurrency}, f)
+    return job
+
+
+def load_job(job_id: str) -> Optional[BatchJob]:
+    """Rebuild a job and its progress from its checkpoint files"""
+    spec_path, log_path = _paths(job_id)
+    if not os.path.exists(spec_path):
+        return None
+    with open(spec_path, encoding="utf-8") as f:
+        spec = json.load(f)
+    job = BatchJob(job_id=job_id, meeting_ids=spec["meeting_ids"], concurrency=spec["concurrency"])
+    for meeting_id, entry in _read_checkpoint(log_path).items():
+        if entry["status"] == "done":
+            job.completed += 1
+        elif entry["status"] == "skipped":
+            job.skipped += 1
+        else:
+            job.failed += 1
+            job.errors[meeting_id] = entry.get("error", "")
+    lease = read_lease(job_id) if job.remaining else None
+    if lease:
+        # Elapsed time and throughput as seen by the process running the job
+        job.status = "running"
+        job.resumed_from = lease.get("resumed_from", 0)
+        job.started_at = time.monotonic() - (time.time() - lease["started_at"])
+    elif job.remaining:
+        job.status = "pending"
+    else:
+        job.status = "completed" if not job.failed else "failed"
+    return job
+
+
+def _read_checkpoint(log_path: str) -> Dict[int, dict]:
+    entries: Dict[int, dict] = {}
+    if os.path.exists(log_path):
+        with open(log_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line after a crash
+                entries[entry["meeting_id"]] = entry
+    return entries
+
+
+async def run_job(job: BatchJob, provider: BaseProvider, engine, owner: Optional[str] = None) -> BatchJob:
+    """Summarize every pending meeting in the job, replacing existing summaries.
+
+    ``job.concurrency`` workers pull meetings from a shared iterator, so at
+    most that many provider calls are in flight and memory does not grow with
+    the job size. Each meeting's summary and seeded actions are swapped in a
+    single transaction, and the meeting is checkpointed once that commit
+    succeeds. Raises ``BatchJobRunning`` when another process holds the
+    job's lease; a caller that already took it with ``acquire_lease`` passes
+    its ``owner``.
+    """
+    if owner is None:
+        owner = acquire_lease(job)
+    _, log_path = _paths(job.job_id)
+    done = {mid for mid, entry in _read_checkpoint(log_path).items() if entry["status"] == "done"}
+    pending = [mid for mid in job.meeting_ids if mid not in done]
+    job.completed, job.failed, job.skipped, job.errors = len(done), 0, 0, {}
+    job.resumed_from = len(done)
+    job.status = "running"
+    job.started_at, job.finished_at = time.monotonic(), None
+    queue = iter(pending)
+
+    started_at = time.time()
+    try:
+        _write_lease(job, owner, started_at)
+        heartbeat = asyncio.create_task(_heartbeat(job, owner, started_at))
+        try:
+            await _run_pending(job, queue, log_path, provider, engine)
+        finally:
+            heartbeat.cancel()
+    finally:
+        _release_lease(job.job_id, owner)
+
+    job.finished_at = time.monotonic()
+    job.status = "completed" if not job.failed else "failed"
+    logger.info(
+        "Batch %s finished: %d done, %d failed, %d skipped in %.1fs (%.2f meetings/s)",
+        job.job_id, job.completed, job.failed, job.skipped, job.elapsed_sec, job.meetings_per_sec,
+    )
+    return job
+
+
+async def _run_pending(job: BatchJob, queue, log_path: str, provider: BaseProvider, engine) -> None:
+    with open(log_path, "a", encoding="utf-8") as checkpoint:
+        def record(meeting_id: int, status: str, error: str = "") -> None:
+            checkpoint.write(json.dumps({"meeting_id": meeting_id, "status": status, "error": error}) + "\n")
+            checkpoint.flush()
+
+        async def process(meeting_id: int) -> None:
+            with Session(engine) as session:
+                meeting = session.get(Meeting, meeting_id)
+                transcript = get_transcript(session, meeting_id) if meeting else None
+                if not transcript:
+                    job.skipped += 1
+                    record(meeting_id, "skipped")
+                    return
+                try:
+                    with usage_scope(meeting_id=meeting_id, source="batch"):
+                        summary_data = await generate_summary(session, meeting, transcript, provider)
+                    store_summary(session, meeting_id, summary_data, replace=True)
+                    session.commit()
+                    await run_in_threadpool(index_meeting, session, meeting_id)
+                except Exception as e:
+                    session.rollback()
+                    job.failed += 1
+                    if len(job.errors) < MAX_REPORTED_ERRORS:
+                        job.errors[meeting_id] = str(e)
+                    record(meeting_id, "failed", str(e))
+                    logger.warning("Batch %s: meeting %s failed: %s", job.job_id, meeting_id, e)
+                    return
+            job.completed += 1
+            record(meeting_id, "done")
+
+        async def worker() -> None:
+            for meeting_id in queue:
+                await process(meeting_id)
+
+        await asyncio.gather(*(worker() for _ in range(max(1, job.concurrency))))
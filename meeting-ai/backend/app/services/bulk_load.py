@@ -0,0 +1,201 @@
+"""Bulk loading of meetings in the export record format.
+
+``BulkLoader`` takes the same records ``app.services.export`` produces (one
+dict per meeting with nested transcript, summary and actions), assigns ids
+up front and writes each table with one ``executemany`` per batch inside
+large transactions. This bypasses ORM unit-of-work bookkeeping, which is
+what made row-by-row seeding slow.
+"""
+
+import gzip
+import json
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import func, select
+
+from app.models import Meeting, Transcript, TranscriptBody, TranscriptSegment, Summary, ActionItem, ActionBand
+from app.services.action_index import BANDS, band_rows
+from app.services.action_rollups import RollupDelta
+from app.services.segments import segment_spans
+from app.services.transcript_store import compress
+
+_TABLES = [Meeting, Transcript, TranscriptBody, TranscriptSegment, Summary, ActionItem, ActionBand]
+
+
+class BulkLoader:
+    """Buffers rows per table and inserts them in batches; use as a context manager.
+
+    ``batch_size`` is the number of buffered rows (across all tables) that
+    triggers a flush, and ``commit_every`` the number of rows per transaction.
+    """
+
+    def __init__(self, engine, batch_size: int = 20000, commit_every: int = 500000, segments: bool = True):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.commit_every = commit_every
+        self.segments = segments
+        self.counts: Dict[str, int] = {model.__tablename__: 0 for model in _TABLES}
+        self._rows: Dict[type, List[dict]] = {model: [] for model in _TABLES}
+        self._buffered = 0
+        self._since_commit = 0
+        self._conn = None
+        self._tx = None
+        self._next_id: Dict[type, int] = {}
+        self._rollups = RollupDelta()
+
+    def __enter__(self) -> "BulkLoader":
+        self._conn = self.engine.connect()
+        self._tx = self._conn.begin()
+        # Ids are allocated here rather than by the database so child rows can reference them
+        for model in (Meeting, Transcript, TranscriptSegment, Summary, ActionItem):
+            current = self._conn.execute(select(func.max(model.id))).scalar()
+            self._next_id[model] = (current or 0) + 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                self.flush()
+                self._tx.commit()
+            else:
+                self._tx.rollback()
+        finally:
+            self._conn.close()
+
+    def _allocate(self, model: type) -> int:
+        value = self._next_id[model]
+        self._next_id[model] = value + 1
+        return value
+
+    def add(self, record: dict) -> int:
+        """Queue one meeting record; returns the id assigned to the meeting"""
+        meeting_id = self._allocate(Meeting)
+        created_at = _as_datetime(record.get("created_at")) or datetime.utcnow()
+        self._rows[Meeting].append({"id": meeting_id, "title": record["title"], "created_at": created_at})
+
+        transcript = record.get("transcript")
+        if transcript:
+            self._add_transcript(meeting_id, transcript, created_at)
+
+        summary = record.get("summary")
+        if summary:
+            self._rows[Summary].append({
+                "id": self._allocate(Summary),
+                "meeting_id": meeting_id,
+                "bullets": summary.get("bullets") or [],
+                "decisions": summary.get("decisions") or [],
+                "risks": summary.get("risks") or [],
+                "created_at": _as_datetime(summary.get("created_at")) or created_at,
+            })
+
+        for action in record.get("actions") or []:
+            action_created = _as_datetime(action.get("created_at")) or created_at
+            action_id = self._allocate(ActionItem)
+            status = action.get("status") or "open"
+            due_date = _as_date(action.get("due_date"))
+            action_updated = _as_datetime(action.get("updated_at")) or action_created
+            self._rollups.added((action.get("assignee"), status, due_date), action_created, action_updated)
+            # Loaded as is, without merging repeats, but indexed so later summaries can match them
+            self._rows[ActionBand].extend(band_rows(action_id, action["text"]))
+            self._rows[ActionItem].append({
+                "id": action_id,
+                "meeting_id": meeting_id,
+                "text": action["text"],
+                "assignee": action.get("assignee"),
+                "due_date": due_date,
+                "status": status,
+                "source": action.get("source") or "manual",
+                "created_at": action_created,
+                "updated_at": action_updated,
+            })
+
+        self._buffered += 1 + len(record.get("actions") or []) * (1 + BANDS) + (1 if summary else 0)
+        if self._buffered >= self.batch_size:
+            self.flush()
+        return meeting_id
+
+    def _add_transcript(self, meeting_id: int, transcript: dict, created_at: datetime) -> None:
+        transcript_id = self._allocate(Transcript)
+        text = transcript.get("text") or ""
+        duration = transcript.get("duration_sec")
+        self._rows[Transcript].append({
+            "id": transcript_id,
+            "meeting_id": meeting_id,
+            "duration_sec": duration,
+            "created_at": _as_datetime(transcript.get("created_at")) or created_at,
+        })
+        codec, data = compress(text)
+        self._rows[TranscriptBody].append({
+            "transcript_id": transcript_id,
+            "codec": codec,
+            "size": len(text.encode("utf-8")),
+            "data": data,
+            "segment": None,
+            "offset": None,
+            "length": None,
+        })
+        self._buffered += 2
+        if self.segments:
+            spans = segment_spans(text, [], duration)
+            self._buffered += len(spans)
+            for idx, start_sec, end_sec, char_start, char_end in spans:
+                self._rows[TranscriptSegment].append({
+                    "id": self._allocate(TranscriptSegment),
+                    "transcript_id": transcript_id,
+                    "idx": idx,
+                    "start_sec": start_sec,
+                    "end_sec": end_sec,
+                    "char_start": char_start,
+                    "char_end": char_end,
+                })
+
+    def flush(self) -> None:
+        """Insert buffered rows, parents first, committing once ``commit_every`` rows are written"""
+        for model in _TABLES:
+            rows = self._rows[model]
+            if rows:
+                self._conn.execute(model.__table__.insert(), rows)
+                self.counts[model.__tablename__] += len(rows)
+                self._rows[model] = []
+        self._rollups.apply(self._conn)
+        self._rollups = RollupDelta()
+        self._since_commit += self._buffered
+        self._buffered = 0
+        if self._since_commit >= self.commit_every:
+            self._tx.commit()
+            self._tx = self._conn.begin()
+            self._since_commit = 0
+
+
+def _as_datetime(value) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def _as_date(value) -> Optional[date]:
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(value[:10])
+
+
+def read_ndjson(path: str) -> Iterator[dict]:
+    """Records from an NDJSON file (``.gz`` is decompressed), skipping blank lines"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_no}: invalid JSON: {e}") from e
+
+
+def load_records(engine, records: Iterable[dict], **options) -> Dict[str, int]:
+    """Load all ``records`` and return row counts per table"""
+    with BulkLoader(engine, **options) as loader:
+        for record in records:
+            loader.add(record)
+    return loader.counts
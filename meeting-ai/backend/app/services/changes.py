@@ -0,0 +1,290 @@
+"""Change log and the feed that serves it to clients.
+
+Writes to meetings, transcripts, summaries and action items add a
+``ChangeEvent`` in the same transaction, so the log never disagrees with the
+data. Meeting and action routes record their own writes. Summary storage,
+action seeding and transcript storage record theirs in the services that
+perform them, so the API, batch jobs and live sessions are all covered.
+
+``ChangeFeed`` reads new events once per process and keeps the recent ones in
+memory. Every long-poll and SSE client is served from that tail, so database
+reads follow the write rate rather than the number of clients. A commit
+that recorded changes wakes the feed at once. Polling every
+``CHANGE_POLL_SEC`` picks up writes from other workers and scripts. A client
+whose last seq came from a worker further ahead is served from the database
+until this one catches up. Events are ordered by ``seq``; SQLite serializes
+writers, so commit order and ``seq`` order agree.
+
+Clients load the lists once, then ask for changes since the last ``seq`` they
+saw. Each batch is compacted: only the last event per entity is kept, and
+upserts for children of a meeting deleted in the same batch are dropped. A
+batch with ``reset`` means the client fell behind the retained log
+(``CHANGE_LOG_MAX_ROWS``) and must reload.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from sqlalchemy import event, func
+from sqlmodel import Session, select, delete
+
+from app.deps import get_settings
+from app.models import ChangeEvent, Meeting, Transcript, Summary, ActionItem
+from app.schemas import MeetingResponse, SummaryResponse, ActionItemResponse
+
+logger = logging.getLogger("uvicorn.error")
+
+# Recent events kept in memory; clients further behind are served from the database
+TAIL_SIZE = 2000
+READ_BATCH = 1000
+
+
+def _record(session: Session, entity: str, entity_id: int, meeting_id: Optional[int], op: str,
+            data: Optional[dict] = None) -> None:
+    session.add(ChangeEvent(entity=entity, entity_id=entity_id, meeting_id=meeting_id, op=op, data=data))
+    session.info["changes_recorded"] = True
+
+
+def record_meeting(session: Session, meeting: Meeting) -> None:
+    _record(session, "meeting", meeting.id, meeting.id, "upsert",
+            MeetingResponse.model_validate(meeting, from_attributes=True).model_dump(mode="json"))
+
+
+def record_meeting_delete(session: Session, meeting_id: int) -> None:
+    _record(session, "meeting", meeting_id, meeting_id, "delete")
+
+
+def record_transcript(session: Session, transcript: Transcript) -> None:
+    """The transcript without its text, which clients fetch when they need it"""
+    if transcript.id is None:
+        session.flush()
+    _record(session, "transcript", transcript.id, transcript.meeting_id, "upsert", {
+        "id": transcript.id,
+        "duration_sec": transcript.duration_sec,
+        "created_at": transcript.created_at.isoformat(),
+    })
+
+
+def record_summary(session: Session, summary: Summary) -> None:
+    if summary.id is None:
+        session.flush()
+    _record(session, "summary", summary.id, summary.meeting_id, "upsert",
+            SummaryResponse.model_validate(summary, from_attributes=True).model_dump(mode="json"))
+
+
+def record_summary_delete(session: Session, summary_id: int, meeting_id: int) -> None:
+    _record(session, "summary", summary_id, meeting_id, "delete")
+
+
+def record_action(session: Session, item: ActionItem) -> None:
+    if item.id is None:
+        session.flush()
+    _record(session, "action", item.id, item.meeting_id, "upsert",
+            ActionItemResponse.model_validate(item, from_attributes=True).model_dump(mode="json"))
+
+
+def record_action_deletes(session: Session, items: Iterable[tuple]) -> None:
+    """Deletes for ``(action_id, meeting_id)`` pairs, e.g. before a bulk delete"""
+    for action_id, meeting_id in items:
+        _record(session, "action", action_id, meeting_id, "delete")
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session) -> None:
+    if session.info.pop("changes_recorded", False):
+        changes.notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session) -> None:
+    session.info.pop("changes_recorded", None)
+
+
+def _as_dict(row: ChangeEvent) -> Dict[str, Any]:
+    return {
+        "seq": row.seq,
+        "entity": row.entity,
+        "id": row.entity_id,
+        "meeting_id": row.meeting_id,
+        "op": row.op,
+        "data": row.data,
+        "at": row.created_at.isoformat(),
+    }
+
+
+def compact(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep the last event per entity, in ``seq`` order, minus upserts under meetings deleted meanwhile"""
+    latest: Dict[tuple, Dict[str, Any]] = {}
+    for e in events:
+        key = (e["entity"], e["id"])
+        latest.pop(key, None)
+        latest[key] = e
+    deleted = {e["id"] for e in latest.values() if e["entity"] == "meeting" and e["op"] == "delete"}
+    return [
+        e for e in latest.values()
+        if not (e["entity"] != "meeting" and e["op"] == "upsert" and e["meeting_id"] in deleted)
+    ]
+
+
+@dataclass
+class ChangeBatch:
+    seq: int  # resume from here
+    changes: List[Dict[str, Any]] = field(default_factory=list)
+    reset: bool = False
+
+
+class ChangeFeed:
+    """Per-process reader of the change log that wakes waiting clients"""
+
+    def __init__(self) -> None:
+        self._tail: Deque[Dict[str, Any]] = deque(maxlen=TAIL_SIZE)
+        self._latest = 0
+        self._oldest = 1  # lowest seq still in the log
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._poke: Optional[asyncio.Event] = None
+        self._arrived: Optional[asyncio.Event] = None
+        self._started: Optional[asyncio.Future] = None
+
+    def notify(self) -> None:
+        """Something was committed; safe to call from any thread"""
+        loop, poke = self._loop, self._poke
+        if loop is None or poke is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(poke.set)
+        except RuntimeError:
+            pass  # loop shutting down
+
+    async def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._poke = asyncio.Event()
+            self._arrived = asyncio.Event()
+            self._started = loop.create_future()
+            self._task = loop.create_task(self._run())
+        await asyncio.shield(self._started)
+
+    def _bounds(self) -> tuple:
+        from app.db import get_engine
+
+        with Session(get_engine()) as session:
+            oldest, latest = session.exec(select(func.min(ChangeEvent.seq), func.max(ChangeEvent.seq))).one()
+        return oldest, latest
+
+    def _read(self, since: int, limit: int = READ_BATCH) -> List[Dict[str, Any]]:
+        from app.db import get_engine
+
+        with Session(get_engine()) as session:
+            rows = session.exec(
+                select(ChangeEvent).where(ChangeEvent.seq > since).order_by(ChangeEvent.seq).limit(limit)
+            ).all()
+            return [_as_dict(row) for row in rows]
+
+    def _prune(self, below: int) -> None:
+        from app.db import get_engine
+
+        with Session(get_engine()) as session:
+            session.exec(delete(ChangeEvent).where(ChangeEvent.seq < below))
+            session.commit()
+
+    async def _run(self) -> None:
+        from starlette.concurrency import run_in_threadpool
+
+        settings = get_settings()
+        try:
+            oldest, latest = await run_in_threadpool(self._bounds)
+            self._latest = latest or 0
+            self._oldest = oldest or self._latest + 1
+            self._tail.clear()
+        finally:
+            if not self._started.done():
+                self._started.set_result(None)
+        while True:
+            try:
+                await asyncio.wait_for(self._poke.wait(), timeout=settings.change_poll_sec)
+            except asyncio.TimeoutError:
+                pass
+            self._poke.clear()
+            try:
+                rows = await run_in_threadpool(self._read, self._latest)
+                while rows:
+                    self._tail.extend(rows)
+                    self._latest = rows[-1]["seq"]
+                    rows = await run_in_threadpool(self._read, self._latest) if len(rows) == READ_BATCH else []
+                keep_from = self._latest - settings.change_log_max_rows + 1
+                # Pruned in chunks, so the delete runs now and then rather than after every write
+                if keep_from - self._oldest >= READ_BATCH:
+                    await run_in_threadpool(self._prune, keep_from)
+                    self._oldest = keep_from
+            except Exception as e:
+                logger.warning("Change feed could not read the change log: %s", e)
+                continue
+            if self._tail and self._tail[-1]["seq"] == self._latest:
+                arrived, self._arrived = self._arrived, asyncio.Event()
+                arrived.set()
+
+    async def read(self, since: Optional[int], limit: int) -> ChangeBatch:
+        """Changes after ``since``; with no ``since`` just the current position"""
+        await self._ensure_started()
+        latest = self._latest
+        if since is None:
+            return ChangeBatch(seq=latest)
+        from starlette.concurrency import run_in_threadpool
+
+        if since > latest:
+            # The seq may come from another worker that has seen commits this one has not polled yet
+            _, stored = await run_in_threadpool(self._bounds)
+            if since > (stored or 0):
+                return ChangeBatch(seq=latest, reset=True)  # from another database
+            self._poke.set()
+            events = await run_in_threadpool(self._read, since, limit)
+            if not events:
+                return ChangeBatch(seq=since)
+            return ChangeBatch(seq=events[-1]["seq"], changes=compact(events))
+        if since < self._oldest - 1:
+            # Older than the retained log
+            return ChangeBatch(seq=latest, reset=True)
+        if since == latest:
+            return ChangeBatch(seq=latest)
+        if self._tail and since >= self._tail[0]["seq"] - 1:
+            events = [e for e in self._tail if e["seq"] > since][:limit]
+        else:
+            events = await run_in_threadpool(self._read, since, limit)
+        if not events:
+            return ChangeBatch(seq=latest)
+        return ChangeBatch(seq=events[-1]["seq"], changes=compact(events))
+
+    async def wait(self, since: Optional[int], limit: int, timeout: float) -> ChangeBatch:
+        """Like ``read``, but waits up to ``timeout`` seconds for changes when there are none yet"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            arrived = self._arrived
+            batch = await self.read(since, limit)
+            remaining = deadline - loop.time()
+            if since is None or batch.changes or batch.reset or remaining <= 0:
+                return batch
+            if arrived is not self._arrived:
+                continue  # events came in while reading
+            try:
+                await asyncio.wait_for(arrived.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return batch
+
+    async def stop(self) -> None:
+        """Stop the reader (application shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+
+changes = ChangeFeed()
@@ -0,0 +1,184 @@
+"""Transcript compaction ahead of summarization.
+
+ASR output carries indentation, filler words, false starts and repeated
+sentences that cost prompt tokens without adding meaning. ``compact_transcript``
+strips those and, when a token budget is given, keeps the most informative
+sentences in their original order.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# Roughly four characters per token for English text with the GPT tokenizers
+CHARS_PER_TOKEN = 4
+NEAR_DUPLICATE_JACCARD = 0.8
+
+_DISFLUENCY = re.compile(
+    r"""
+    \b(?:u+h+m*|u+m+|e+r+m*|a+h+|h+m+|m+h*m+|uh-huh)\b[,.]?[ \t]*   # fillers: um, uh, erm, hmm
+  | ,?[ \t]*\b(?:you\ know|i\ mean|like|basically|literally)\b,[ \t]*  # parenthetical discourse markers
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+# A word cut off by a hyphen, with the word before it and the two after it; only
+# dropped when the speaker restarts it ("we wa- want", "we wa- we want"), so
+# suspended hyphens ("pre- and post-processing") and wrapped words stay intact
+_FALSE_START = re.compile(r"\b(?:(\w+)[ \t]+)?(\w+)-[ \t]+(?=(\w+)(?:[ \t]+(\w+))?)")
+_REPEATED = re.compile(r"\b(\w+(?:\s+\w+)?)(?:\s+\1\b)+", re.IGNORECASE)
+# Repeats that are words in their own right rather than stutters
+_REDUPLICATIVES = frozenset({"bye", "no", "yes", "very", "hear", "ha", "knock"})
+_SPACES = re.compile(r"\s+")
+_SPEAKER = re.compile(r"^[A-Z][\w .'-]{0,40}:\s")
+_SPACE_BEFORE_PUNCT = re.compile(r"\s+([,.;:!?])")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"[a-z0-9']+")
+_CUE = re.compile(
+    r"\b(?:decid|agree|action|need|should|must|risk|deadline|due|by|assign|will|plan)", re.IGNORECASE
+)
+_STOPWORDS = frozenset(
+    "the a an and or but so of to in on at for with from this that these those is are was "
+    "were be been it its we our you your they their he she i me my us them there here then "
+    "also just very really about into over than have has had do does did can could would".split()
+)
+
+
+@dataclass
+class CompactionResult:
+    text: str
+    original_tokens: int
+    compacted_tokens: int
+    dropped_sentences: int = 0
+
+    @property
+    def compression_ratio(self) -> float:
+        """Original size divided by compacted size (2.0 means half the tokens)"""
+        return self.original_tokens / max(1, self.compacted_tokens)
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, -(-len(text) // CHARS_PER_TOKEN)) if text else 0
+
+
+def compact_transcript(text: str, max_tokens: Optional[int] = None) -> CompactionResult:
+    """Normalize and shrink a transcript, optionally to at most ``max_tokens``"""
+    original_tokens = estimate_tokens(text)
+
+    # (turn index, sentence) pairs so speaker turns survive as separate lines
+    sentences: List[Tuple[int, str]] = []
+    previous_words: frozenset = frozenset()
+    dropped = 0
+    for turn_no, raw_turn in enumerate(_turns(text)):
+        turn = _clean(raw_turn)
+        if not turn:
+            continue
+        for sentence in _SENTENCE_END.split(turn):
+            words = frozenset(_WORD.findall(sentence.lower()))
+            if not words:
+                continue
+            if _jaccard(words, previous_words) >= NEAR_DUPLICATE_JACCARD:
+                dropped += 1
+                continue
+            previous_words = words
+            sentences.append((turn_no, sentence[0].upper() + sentence[1:]))
+
+    if max_tokens and estimate_tokens(_join(sentences)) > max_tokens:
+        kept = _fit_budget(sentences, max_tokens)
+        dropped += len(sentences) - len(kept)
+        sentences = kept
+
+    compacted = _join(sentences)
+    return CompactionResult(
+        text=compacted,
+        original_tokens=original_tokens,
+        compacted_tokens=estimate_tokens(compacted),
+        dropped_sentences=dropped,
+    )
+
+
+def _turns(text: str) -> List[str]:
+    """Rejoin hard-wrapped lines into paragraphs, splitting on blank lines and speaker tags"""
+    turns: List[str] = []
+    current: List[str] = []
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line or _SPEAKER.match(line):
+            if current:
+                turns.append(" ".join(current))
+            current = [line] if line else []
+        elif current and current[-1][-1:] == "-" and current[-1][-2:-1].isalpha():
+            # A word hyphenated across the break ("follow-" / "up")
+            current[-1] += line
+        else:
+            current.append(line)
+    if current:
+        turns.append(" ".join(current))
+    return turns
+
+
+def _clean(line: str) -> str:
+    line = _DISFLUENCY.sub(" ", line)
+    line = _FALSE_START.sub(_drop_false_start, line)
+    line = _REPEATED.sub(_collapse_repeat, line)
+    line = _SPACES.sub(" ", line)
+    line = _SPACE_BEFORE_PUNCT.sub(r"\1", line)
+    return line.strip(" ,")
+
+
+def _drop_false_start(match: re.Match) -> str:
+    before, fragment, following, after = match.groups()
+    fragment = fragment.lower()
+    if following.lower().startswith(fragment):
+        return f"{before} " if before else ""
+    if before and after and following.lower() == before.lower() and after.lower().startswith(fragment):
+        return ""
+    return match.group(0)
+
+
+def _collapse_repeat(match: re.Match) -> str:
+    repeated = match.group(1)
+    # Counts and quantities ("4 4 4 units") are data, not stutters
+    if any(ch.isdigit() for ch in repeated) or repeated.lower() in _REDUPLICATIVES:
+        return match.group(0)
+    return repeated
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _score(sentence: str) -> float:
+    content = {w for w in _WORD.findall(sentence.lower()) if len(w) > 2 and w not in _STOPWORDS}
+    bonus = 3.0 if _CUE.search(sentence) else 0.0
+    if any(ch.isdigit() for ch in sentence):
+        bonus += 1.0
+    return len(content) + bonus
+
+
+def _fit_budget(sentences: List[Tuple[int, str]], max_tokens: int) -> List[Tuple[int, str]]:
+    """Keep the highest-scoring sentences that fit, in transcript order"""
+    ranked = sorted(range(len(sentences)), key=lambda i: (-_score(sentences[i][1]), i))
+    budget_chars = max_tokens * CHARS_PER_TOKEN
+    keep = set()
+    used = 0
+    for i in ranked:
+        cost = len(sentences[i][1]) + 1
+        if used + cost > budget_chars:
+            continue
+        keep.add(i)
+        used += cost
+    return [sentences[i] for i in sorted(keep)]
+
+
+def _join(sentences: List[Tuple[int, str]]) -> str:
+    lines: List[str] = []
+    current_turn = None
+    for turn_no, sentence in sentences:
+        if turn_no == current_turn:
+            lines[-1] += " " + sentence
+        else:
+            lines.append(sentence)
+            current_turn = turn_no
+    return "\n".join(lines)
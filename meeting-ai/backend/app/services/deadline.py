@@ -0,0 +1,144 @@
+"""Request deadlines, and cancellation of provider work nobody is waiting for.
+
+A deadline is an absolute ``time.monotonic()`` value kept in a context
+variable, and tasks started under it inherit it. The exception is a
+``SingleFlight`` call shared by coalesced requests: it runs without one, so
+a caller with a short timeout cannot cut short the work a later caller with
+a longer one joined. Each caller still gives up at its own deadline, and the
+call is cancelled when the last of them leaves. ``run_request`` starts a
+route's work under the route's timeout, or the shorter one from an
+``X-Request-Timeout`` header. It cancels the work when the client
+disconnects or the deadline passes.
+
+Providers see the deadline in two ways. ``MeteredProvider`` wraps each call
+in ``within_deadline``. Provider HTTP clients ask ``timeout_for`` for their
+per-request timeout, so an upstream call does not outlive the request it
+serves. Cancellation unwinds through the normal ``finally`` blocks and
+context managers, which closes temp files and DB sessions and releases
+SingleFlight and rolling-summary locks.
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Iterator, Optional, TypeVar
+
+from app.deps import get_settings
+
+T = TypeVar("T")
+
+TIMEOUT_HEADER = "X-Request-Timeout"
+# How often a waiting handler checks whether its client is still connected
+DISCONNECT_POLL_SEC = 0.5
+# Lets provider calls hit the deadline themselves (and be recorded as timeouts) before the work is cancelled
+DEADLINE_GRACE_SEC = 0.1
+
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """The request's deadline passed before its work finished"""
+
+
+class ClientDisconnected(Exception):
+    """The client went away while its request was being processed"""
+
+
+class InvalidTimeout(ValueError):
+    """An ``X-Request-Timeout`` header that is not a positive number of seconds"""
+
+
+@contextmanager
+def deadline_scope(seconds: float) -> Iterator[None]:
+    """Run the block under a deadline ``seconds`` from now, or an earlier one already set"""
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None when there is none"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def timeout_for(default: float) -> float:
+    """A timeout for one upstream request: ``default``, shortened to the time left"""
+    left = remaining()
+    return default if left is None else min(default, left)
+
+
+@contextmanager
+def without_deadline() -> Iterator[None]:
+    """Run the block, and tasks started in it, without the current deadline"""
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+async def within_deadline(awaitable: Awaitable[T]) -> T:
+    """Await ``awaitable``, cancelling it and raising ``DeadlineExceeded`` once the deadline passes"""
+    left = remaining()
+    if left is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, max(left, 0.001))
+    except asyncio.TimeoutError as e:
+        raise DeadlineExceeded() from e
+
+
+def request_timeout(request, default: float) -> float:
+    """The route's ``default`` timeout, or a valid ``X-Request-Timeout`` value capped at the maximum"""
+    value = request.headers.get(TIMEOUT_HEADER)
+    if not value:
+        return default
+    try:
+        seconds = float(value)
+    except ValueError:
+        seconds = 0.0
+    if not seconds > 0:
+        raise InvalidTimeout(f"{TIMEOUT_HEADER} must be a positive number of seconds")
+    return min(seconds, get_settings().max_request_timeout_sec)
+
+
+async def _disconnected(request) -> None:
+    while not await request.is_disconnected():
+        await asyncio.sleep(DISCONNECT_POLL_SEC)
+
+
+async def run_request(request, timeout: float, fn: Callable[[], Awaitable[T]]) -> T:
+    """Run ``fn()`` under a ``timeout`` second deadline for as long as the client stays connected.
+
+    Raises ``DeadlineExceeded`` or ``ClientDisconnected`` after cancelling
+    the work and waiting for it to unwind.
+    """
+    with deadline_scope(timeout):
+        work = asyncio.ensure_future(fn())
+    watcher = asyncio.ensure_future(_disconnected(request))
+    try:
+        done, _ = await asyncio.wait(
+            {work, watcher}, timeout=timeout + DEADLINE_GRACE_SEC, return_when=asyncio.FIRST_COMPLETED
+        )
+    except asyncio.CancelledError:
+        work.cancel()
+        raise
+    finally:
+        watcher.cancel()
+    if work in done:
+        return work.result()
+    work.cancel()
+    await asyncio.wait({work})
+    if watcher in done and not watcher.cancelled():
+        raise ClientDisconnected()
+    raise DeadlineExceeded()
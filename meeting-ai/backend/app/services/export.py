@@ -0,0 +1,175 @@
+"""Streaming export of meetings with their transcript, summary and actions.
+
+Meetings are read through a server-side cursor (``yield_per``) and processed
+one partition at a time: transcripts, summaries and actions for the
+partition are fetched with one query each, serialized, and dropped before the
+next partition is read. Output is produced in chunks of roughly
+``CHUNK_BYTES``, optionally gzip-compressed on the fly, so memory use does not
+depend on the number of meetings exported.
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional
+
+from sqlmodel import Session, select
+
+from app.models import Meeting, Transcript, Summary, ActionItem
+from app.services.transcript_store import load_texts
+
+EXPORT_FORMATS = ("ndjson", "csv")
+CSV_COLUMNS = [
+    "meeting_id", "title", "created_at", "duration_sec", "transcript",
+    "bullets", "decisions", "risks", "actions",
+]
+CHUNK_BYTES = 64 * 1024
+
+
+def iter_meeting_records(
+    session: Session,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    batch_size: int = 500,
+) -> Iterator[dict]:
+    """Yield one export record per meeting, in id order"""
+    query = select(Meeting.id, Meeting.title, Meeting.created_at)
+    if created_after:
+        query = query.where(Meeting.created_at >= created_after)
+    if created_before:
+        query = query.where(Meeting.created_at < created_before)
+    result = session.exec(query.order_by(Meeting.id).execution_options(yield_per=batch_size))
+
+    for partition in result.partitions():
+        ids = [row.id for row in partition]
+        transcripts = {
+            row.meeting_id: row
+            for row in session.exec(
+                select(Transcript.id, Transcript.meeting_id, Transcript.duration_sec, Transcript.created_at)
+                .where(Transcript.meeting_id.in_(ids))
+            )
+        }
+        texts = load_texts(session, [t.id for t in transcripts.values()])
+        summaries = {
+            row.meeting_id: row
+            for row in session.exec(
+                select(Summary.meeting_id, Summary.bullets, Summary.decisions, Summary.risks, Summary.created_at)
+                .where(Summary.meeting_id.in_(ids))
+            )
+        }
+        actions: Dict[int, List[dict]] = {}
+        for row in session.exec(
+            select(
+                ActionItem.id, ActionItem.meeting_id, ActionItem.text, ActionItem.assignee,
+                ActionItem.due_date, ActionItem.status, ActionItem.source, ActionItem.created_at,
+            )
+            .where(ActionItem.meeting_id.in_(ids))
+            .order_by(ActionItem.meeting_id, ActionItem.id)
+        ):
+            actions.setdefault(row.meeting_id, []).append({
+                "id": row.id,
+                "text": row.text,
+                "assignee": row.assignee,
+                "due_date": row.due_date,
+                "status": row.status,
+                "source": row.source,
+                "created_at": row.created_at,
+            })
+
+        for row in partition:
+            transcript = transcripts.get(row.id)
+            summary = summaries.get(row.id)
+            yield {
+                "id": row.id,
+                "title": row.title,
+                "created_at": row.created_at,
+                "transcript": {
+                    "text": texts.get(transcript.id, ""),
+                    "duration_sec": transcript.duration_sec,
+                    "created_at": transcript.created_at,
+                } if transcript else None,
+                "summary": {
+                    "bullets": summary.bullets or [],
+                    "decisions": summary.decisions or [],
+                    "risks": summary.risks or [],
+                    "created_at": summary.created_at,
+                } if summary else None,
+                "actions": actions.get(row.id, []),
+            }
+        # load_texts goes through the ORM; keep the identity map from growing across partitions
+        session.expunge_all()
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _ndjson_lines(records: Iterator[dict]) -> Iterator[str]:
+    for record in records:
+        yield json.dumps(record, default=_json_default, ensure_ascii=False) + "\n"
+
+
+def _format_action(action: dict) -> str:
+    details = [action["assignee"] or "", action["due_date"].isoformat() if action["due_date"] else "", action["status"]]
+    return f"{action['text']} ({', '.join(d for d in details if d)})"
+
+
+def _csv_lines(records: Iterator[dict]) -> Iterator[str]:
+    """One row per meeting; list fields are newline-separated within their cell"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    writer.writerow(CSV_COLUMNS)
+    yield flush()
+    for record in records:
+        transcript = record["transcript"] or {}
+        summary = record["summary"] or {}
+        writer.writerow([
+            record["id"],
+            record["title"],
+            record["created_at"].isoformat(),
+            transcript.get("duration_sec") or "",
+            transcript.get("text", ""),
+            "\n".join(summary.get("bullets", [])),
+            "\n".join(summary.get("decisions", [])),
+            "\n".join(summary.get("risks", [])),
+            "\n".join(_format_action(a) for a in record["actions"]),
+        ])
+        yield flush()
+
+
+def stream_export(records: Iterator[dict], fmt: str = "ndjson", compress: bool = False) -> Iterator[bytes]:
+    """Serialize records to ``fmt`` and yield byte chunks, gzip-compressed when ``compress``"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    lines = _ndjson_lines(records) if fmt == "ndjson" else _csv_lines(records)
+    # wbits=31 writes a gzip header and trailer rather than a raw zlib stream
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+    pending: List[bytes] = []
+    size = 0
+    for line in lines:
+        data = line.encode("utf-8")
+        pending.append(data)
+        size += len(data)
+        if size >= CHUNK_BYTES:
+            chunk = b"".join(pending)
+            pending, size = [], 0
+            chunk = compressor.compress(chunk) if compressor else chunk
+            if chunk:
+                yield chunk
+    tail = b"".join(pending)
+    if compressor:
+        tail = compressor.compress(tail) + compressor.flush()
+    if tail:
+        yield tail
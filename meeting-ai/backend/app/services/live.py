@@ -0,0 +1,247 @@
+"""Incremental transcription of audio streamed while a meeting is recorded.
+
+The client sends raw 16-bit little-endian PCM. Audio is collected into
+windows of about ``LIVE_WINDOW_SEC`` and each window is cut at the quietest
+frame near its end. Windows are queued for a single transcription task
+through a bounded queue. When the provider falls behind, the queue fills and
+``feed`` blocks, which stops reading from the socket and pushes back on the
+client instead of buffering without limit. Each window's text is reported
+as it arrives. ``finish`` flushes the last window and stores the transcript
+and its timed segments.
+
+With ``LIVE_SUMMARY_EVERY_WINDOWS`` set, the text of every few windows is
+also folded into the meeting's rolling summary while recording continues,
+and the rest is folded in once the transcript is stored.
+"""
+
+import asyncio
+import io
+import logging
+import wave
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional, Set
+
+from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
+
+from app.db import get_engine
+from app.deps import get_settings
+from app.models import Summary, Transcript
+from app.providers.base import BaseProvider, AudioInput
+from app.schemas import SegmentData
+from app.services.segments import build_segments
+from app.services.transcript_store import save_transcript
+from app.services.usage import usage_scope
+
+logger = logging.getLogger("uvicorn.error")
+
+SAMPLE_WIDTH = 2
+# Audio left over when the session ends is dropped if shorter than this
+MIN_FINAL_WINDOW_SEC = 0.3
+# The cut point is searched for in this much audio at the end of each window
+SPLIT_SEARCH_SEC = 2.0
+
+# Meetings with a live session in this process; a second session is rejected
+active_meetings: Set[int] = set()
+
+
+@dataclass
+class LiveWindow:
+    index: int
+    start_sec: float
+    pcm: bytes
+
+
+@dataclass
+class LiveResult:
+    index: int
+    start_sec: float
+    end_sec: float
+    text: str
+    segments: List[SegmentData] = field(default_factory=list)
+
+
+class LiveTranscriber:
+    def __init__(
+        self,
+        meeting_id: int,
+        provider: BaseProvider,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        on_result: Optional[Callable[[LiveResult], Awaitable[None]]] = None,
+        on_summary: Optional[Callable[[Summary], Awaitable[None]]] = None,
+    ) -> None:
+        settings = get_settings()
+        self.meeting_id = meeting_id
+        self.provider = provider
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.on_result = on_result
+        self.on_summary = on_summary
+        self.summary_every = settings.live_summary_every_windows
+        self.window_bytes = int(settings.live_window_sec * sample_rate) * channels * SAMPLE_WIDTH
+        self.results: List[LiveResult] = []
+        self.errors = 0
+        self._buffer = bytearray()
+        self._consumed_bytes = 0
+        self._next_index = 0
+        self._summarized = 0
+        self._summary_task: Optional[asyncio.Task] = None
+        self._queue: "asyncio.Queue[Optional[LiveWindow]]" = asyncio.Queue(maxsize=settings.live_max_pending_windows)
+        self._worker = asyncio.create_task(self._run())
+
+    @property
+    def bytes_per_sec(self) -> int:
+        return self.sample_rate * self.channels * SAMPLE_WIDTH
+
+    @property
+    def duration_sec(self) -> float:
+        return (self._consumed_bytes + len(self._buffer)) / self.bytes_per_sec
+
+    async def feed(self, pcm: bytes) -> None:
+        """Add audio; waits while the transcription queue is full"""
+        from app.services.audio import quietest_split
+
+        self._buffer.extend(pcm)
+        while len(self._buffer) >= self.window_bytes:
+            head = bytes(self._buffer[: self.window_bytes])
+            cut = quietest_split(head, self.sample_rate, self.channels, SPLIT_SEARCH_SEC)
+            # Keep whole sample frames together
+            cut -= cut % (self.channels * SAMPLE_WIDTH)
+            await self._emit(head[:cut] if cut else head)
+            del self._buffer[: cut or self.window_bytes]
+
+    async def _emit(self, pcm: bytes) -> None:
+        window = LiveWindow(self._next_index, self._consumed_bytes / self.bytes_per_sec, pcm)
+        self._next_index += 1
+        self._consumed_bytes += len(pcm)
+        await self._queue.put(window)
+
+    async def _run(self) -> None:
+        while True:
+            window = await self._queue.get()
+            if window is None:
+                return
+            try:
+                result = await self._transcribe(window)
+            except Exception as e:
+                # One failed window should not end the session; its audio is lost from the transcript
+                self.errors += 1
+                logger.warning("Live transcription window %d for meeting %s failed: %s", window.index, self.meeting_id, e)
+                continue
+            self.results.append(result)
+            if self.on_result and result.text:
+                try:
+                    await self.on_result(result)
+                except Exception:
+                    pass  # client went away; keep transcribing so the transcript is complete
+            self._maybe_summarize()
+
+    def _maybe_summarize(self) -> None:
+        """Start a rolling summary update for the windows not yet folded in.
+
+        Skipped while an update is running; the next one covers more windows.
+        """
+        if not self.summary_every or len(self.results) - self._summarized < self.summary_every:
+            return
+        if self._summary_task and not self._summary_task.done():
+            return
+        text = " ".join(r.text for r in self.results[self._summarized:] if r.text)
+        self._summarized = len(self.results)
+        if text:
+            self._summary_task = asyncio.create_task(self._summarize(text))
+
+    async def _summarize(self, text: Optional[str] = None) -> None:
+        from app.services.rolling_summary import summarize_appended, summarize_tail
+
+        try:
+            with usage_scope(meeting_id=self.meeting_id, source="live"):
+                if text is None:
+                    summary = await summarize_tail(self.meeting_id, self.provider)
+                else:
+                    summary = await summarize_appended(self.meeting_id, text, self.provider)
+        except Exception as e:
+            # The summary can be brought up to date later through /summarize/incremental
+            logger.warning("Rolling summary for meeting %s failed: %s", self.meeting_id, e)
+            return
+        if self.on_summary and summary:
+            try:
+                await self.on_summary(summary)
+            except Exception:
+                pass
+
+    async def _transcribe(self, window: LiveWindow) -> LiveResult:
+        settings = get_settings()
+        length = len(window.pcm) / self.bytes_per_sec
+        data = _wav(window.pcm, self.sample_rate, self.channels)
+        to_window_time: Callable[[float], float] = lambda t: t
+        if settings.audio_preprocess:
+            from app.services.audio import prepare_audio
+
+            prepared = await run_in_threadpool(
+                prepare_audio, data, f"live_{window.index}.wav", "audio/wav", settings.audio_min_silence_ms
+            )
+            if prepared.processed:
+                data = prepared.data
+                to_window_time = prepared.to_original_time
+
+        audio = AudioInput.from_bytes(data, f"live_{window.index}.wav", "audio/wav", settings.audio_spool_max_bytes)
+        try:
+            with usage_scope(meeting_id=self.meeting_id, source="live"):
+                transcribed = await self.provider.transcribe_audio(audio)
+        finally:
+            audio.close()
+
+        text = (transcribed.text or "").strip()
+        segments = [
+            SegmentData(
+                start=window.start_sec + to_window_time(seg.start),
+                end=window.start_sec + to_window_time(seg.end),
+                text=seg.text,
+            )
+            for seg in transcribed.segments
+        ] or ([SegmentData(start=window.start_sec, end=window.start_sec + length, text=text)] if text else [])
+        return LiveResult(window.index, window.start_sec, window.start_sec + length, text, segments)
+
+    async def finish(self) -> Optional[Transcript]:
+        """Transcribe the remaining audio and store the transcript; None when nothing was heard"""
+        tail = self._buffer[: len(self._buffer) - len(self._buffer) % (self.channels * SAMPLE_WIDTH)]
+        if len(tail) >= MIN_FINAL_WINDOW_SEC * self.bytes_per_sec:
+            await self._emit(bytes(tail))
+        self._buffer.clear()
+        await self._queue.put(None)
+        await self._worker
+        if self._summary_task:
+            await self._summary_task
+
+        results = sorted(self.results, key=lambda r: r.index)
+        text = " ".join(r.text for r in results if r.text)
+        if not text:
+            return None
+        duration_sec = max(1, int(round(self.duration_sec)))
+        with Session(get_engine()) as session:
+            transcript = save_transcript(session, self.meeting_id, text, duration_sec=duration_sec)
+            session.add_all(build_segments(
+                transcript.id, text, [seg for r in results for seg in r.segments], duration_sec=duration_sec,
+            ))
+            session.commit()
+            session.refresh(transcript)
+        if self.summary_every:
+            # Fold in whatever the periodic updates have not covered yet
+            await self._summarize()
+        return transcript
+
+
+def has_transcript(meeting_id: int) -> bool:
+    with Session(get_engine()) as session:
+        return session.exec(select(Transcript.id).where(Transcript.meeting_id == meeting_id)).first() is not None
+
+
+def _wav(pcm: bytes, sample_rate: int, channels: int) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(SAMPLE_WIDTH)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buf.getvalue()
@@ -0,0 +1,335 @@
+"""Opt-in per-request profiles: a span timeline plus a sampled call-stack profile.
+
+Profiling is off unless ``PROFILE_SAMPLE_RATE`` or ``PROFILE_ADMIN_TOKEN``
+is set. While it is off, ``install_profiling`` adds nothing to the app, and
+the ``span`` calls left in the code cost one context-variable lookup.
+
+When it is on, ``ProfilingMiddleware`` profiles a random
+``PROFILE_SAMPLE_RATE`` share of requests. It also profiles any request
+whose ``X-Profile`` header matches the admin token. A profile holds:
+
+- spans for SQL statements (cursor events, statement text only), provider
+  calls and response serialization (response model validation and JSON
+  encoding);
+- folded call stacks of the event-loop thread, sampled every
+  ``PROFILE_INTERVAL_MS``. Other requests share that thread, so their
+  frames can appear too. Samples taken while the loop waits for I/O are
+  counted as ``<idle>``.
+
+The last ``PROFILE_BUFFER_SIZE`` profiles are kept in memory, per process,
+and served at ``/api/debug/profiles``. Profiled responses carry an
+``X-Profile-Id`` header.
+"""
+
+import hmac
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from app.deps import get_settings
+
+logger = logging.getLogger("uvicorn.error")
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+# Requests under this prefix are never profiled, so reading profiles does not evict them
+EXCLUDED_PREFIX = "/api/debug/profiles"
+# Bounds on one profile, so an N+1 query loop cannot grow it without limit
+MAX_SPANS = 2000
+MAX_STACK_DEPTH = 64
+MAX_STACKS = 100
+MAX_STATEMENT_CHARS = 500
+
+_current: ContextVar[Optional["Profile"]] = ContextVar("profile", default=None)
+_hooks_installed = False
+_hooks_lock = threading.Lock()
+
+
+class Profile:
+    def __init__(self, method: str, path: str, trigger: str) -> None:
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None
+        self.trigger = trigger
+        self.started_at = datetime.utcnow()
+        self.status: Optional[int] = None
+        self.first_byte_ms: Optional[float] = None
+        self.duration_ms: Optional[float] = None
+        self.spans: List[Dict[str, Any]] = []
+        self.dropped_spans = 0
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.interval_ms = 0.0
+        self._t0 = time.perf_counter()
+
+    def elapsed_ms(self, at: Optional[float] = None) -> float:
+        return round(((at if at is not None else time.perf_counter()) - self._t0) * 1000, 3)
+
+    def add_span(self, kind: str, name: str, started: float, ended: float) -> None:
+        if len(self.spans) >= MAX_SPANS:
+            self.dropped_spans += 1
+            return
+        self.spans.append({
+            "kind": kind,
+            "name": name,
+            "start_ms": self.elapsed_ms(started),
+            "duration_ms": round((ended - started) * 1000, 3),
+        })
+
+    def totals(self) -> Dict[str, Dict[str, float]]:
+        """Span count and time per kind"""
+        totals: Dict[str, Dict[str, float]] = {}
+        for s in self.spans:
+            entry = totals.setdefault(s["kind"], {"count": 0, "ms": 0.0})
+            entry["count"] += 1
+            entry["ms"] = round(entry["ms"] + s["duration_ms"], 3)
+        return totals
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "trigger": self.trigger,
+            "started_at": self.started_at.isoformat(),
+            "status": self.status,
+            "first_byte_ms": self.first_byte_ms,
+            "duration_ms": self.duration_ms,
+            "samples": self.samples,
+            "spans": self.totals(),
+        }
+
+    def detail(self) -> Dict[str, Any]:
+        leaves: Counter = Counter()
+        for stack, n in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += n
+        return {
+            **self.summary(),
+            "interval_ms": self.interval_ms,
+            "timeline": self.spans,
+            "dropped_spans": self.dropped_spans,
+            # Folded stacks, outermost frame first, as flame graph tools expect
+            "stacks": [{"stack": stack, "samples": n} for stack, n in self.stacks.most_common(MAX_STACKS)],
+            "hot_functions": [{"function": name, "samples": n} for name, n in leaves.most_common(20)],
+        }
+
+
+@contextmanager
+def span(kind: str, name: str) -> Iterator[None]:
+    """Time the block as a ``kind`` span when the current request is being profiled"""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_span(kind, name, started, time.perf_counter())
+
+
+def profiling_enabled() -> bool:
+    settings = get_settings()
+    return settings.profile_sample_rate > 0 or bool(settings.profile_admin_token)
+
+
+class ProfileStore:
+    """The most recent profiles, oldest dropped first"""
+
+    def __init__(self, size: int) -> None:
+        self._profiles: Deque[Profile] = deque(maxlen=size)
+
+    def add(self, profile: Profile) -> None:
+        self._profiles.append(profile)
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        for profile in self._profiles:
+            if profile.id == profile_id:
+                return profile
+        return None
+
+    def list(self, path: Optional[str] = None, limit: int = 50) -> List[Profile]:
+        """Newest first, optionally only requests whose path starts with ``path``"""
+        profiles = [p for p in reversed(self._profiles) if path is None or p.path.startswith(path)]
+        return profiles[:limit]
+
+
+profiles = ProfileStore(get_settings().profile_buffer_size)
+
+
+def _frame_name(code) -> str:
+    filename = code.co_filename
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        filename = filename.split(marker, 1)[1]
+    elif os.sep + "app" + os.sep in filename:
+        filename = "app" + os.sep + filename.rsplit(os.sep + "app" + os.sep, 1)[1]
+    else:
+        filename = os.path.basename(filename)
+    return f"{filename}:{code.co_name}"
+
+
+class _Sampler(threading.Thread):
+    """Folds the stack of one thread into ``profile.stacks`` every ``interval`` seconds"""
+
+    def __init__(self, profile: Profile, thread_id: int, interval: float) -> None:
+        super().__init__(name=f"profile-{profile.id}", daemon=True)
+        self.profile = profile
+        self.thread_id = thread_id
+        self.interval = interval
+        self.done = threading.Event()
+        # Held while a sample is recorded, so none lands after stop() returns
+        self._recording = threading.Lock()
+
+    def run(self) -> None:
+        while not self.done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            # The loop waiting in its selector means no Python code of any request was running
+            if frame.f_code.co_name == "select" and frame.f_code.co_filename.endswith("selectors.py"):
+                stack = "<idle>"
+            else:
+                names = []
+                while frame is not None and len(names) < MAX_STACK_DEPTH:
+                    names.append(_frame_name(frame.f_code))
+                    frame = frame.f_back
+                stack = ";".join(reversed(names))
+            with self._recording:
+                if self.done.is_set():
+                    return
+                self.profile.samples += 1
+                self.profile.stacks[stack] += 1
+
+    def stop(self) -> None:
+        """Stop sampling without joining: the thread may be mid-sleep, and this runs on the event loop.
+
+        The lock is held only while a sample is counted, so the profile is
+        final once this returns; the thread exits on its next wake-up.
+        """
+        with self._recording:
+            self.done.set()
+
+
+def _install_hooks() -> None:
+    """Add SQL and serialization spans; done once, and only when profiling is enabled"""
+    global _hooks_installed
+    with _hooks_lock:
+        if _hooks_installed:
+            return
+        _hooks_installed = True
+
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = _current.get()
+        started = conn.info.get("profile_started")
+        if profile is not None and started:
+            profile.add_span("sql", statement[:MAX_STATEMENT_CHARS], started.pop(), time.perf_counter())
+
+    @event.listens_for(Engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("profile_started"):
+            conn.info["profile_started"].pop()
+
+    # FastAPI validates the return value against response_model (and with recent
+    # versions encodes it) in serialize_response; other responses are encoded by render
+    import fastapi.routing
+    from starlette.responses import JSONResponse
+
+    serialize_response = fastapi.routing.serialize_response
+
+    async def profiled_serialize_response(*args, **kwargs):
+        with span("serialize", "response_model"):
+            return await serialize_response(*args, **kwargs)
+
+    fastapi.routing.serialize_response = profiled_serialize_response
+
+    render = JSONResponse.render
+
+    def profiled_render(self, content):
+        with span("serialize", "json"):
+            return render(self, content)
+
+    JSONResponse.render = profiled_render
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware; requests that are not profiled pass straight through"""
+
+    def __init__(self, app) -> None:
+        self.app = app
+        settings = get_settings()
+        self.sample_rate = settings.profile_sample_rate
+        self.token = settings.profile_admin_token.encode()
+        self.interval = settings.profile_interval_ms / 1000
+        _install_hooks()
+
+    def _trigger(self, scope) -> Optional[str]:
+        if scope["path"].startswith(EXCLUDED_PREFIX):
+            return None
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    if hmac.compare_digest(value, self.token):
+                        return "header"
+                    break
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sample"
+        return None
+
+    async def __call__(self, scope, receive, send) -> None:
+        trigger = self._trigger(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            return await self.app(scope, receive, send)
+
+        profile = Profile(scope["method"], scope["path"], trigger)
+        profile.interval_ms = self.interval * 1000
+
+        async def send_profiled(message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                profile.first_byte_ms = profile.elapsed_ms()
+                message = {**message, "headers": [*message.get("headers", []),
+                                                  (PROFILE_ID_HEADER, profile.id.encode())]}
+            await send(message)
+
+        token = _current.set(profile)
+        sampler = _Sampler(profile, threading.get_ident(), self.interval)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_profiled)
+        finally:
+            sampler.stop()
+            _current.reset(token)
+            profile.duration_ms = profile.elapsed_ms()
+            route = scope.get("route")
+            profile.route = getattr(route, "path", None)
+            profiles.add(profile)
+            logger.info("Profiled %s %s in %.1f ms (profile %s)",
+                        profile.method, profile.path, profile.duration_ms, profile.id)
+
+
+def install_profiling(app) -> None:
+    """Add the profiling middleware when sampling or the admin header is configured"""
+    if profiling_enabled():
+        app.add_middleware(ProfilingMiddleware)
@@ -0,0 +1,154 @@
+"""Incremental summarization of a transcript that is still growing.
+
+Text grows either through ``append_transcript`` on a stored transcript
+(``summarize_tail`` folds what was added) or through a live session, which
+folds its windows with ``summarize_appended`` before the transcript is stored.
+
+A ``SummaryState`` row records how many characters of the meeting's text the
+summary already covers. Each update sends the provider the previous summary,
+a few short lists, plus only the text after that offset. The cost of an
+update therefore follows the new text, however long the meeting has run.
+The ``Summary`` row is rewritten in place. Seeded action items go through
+``seed_actions``: repeats update the existing item and new ones are added.
+None are deleted, so status changes made during the meeting survive.
+"""
+
+import asyncio
+import logging
+import weakref
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
+
+from app.db import get_engine
+from app.deps import get_settings
+from app.models import Meeting, Summary, SummaryState
+from app.providers.base import BaseProvider
+from app.schemas import SummaryData
+from app.services.action_extractor import extract_actions
+from app.services.compaction import compact_transcript
+from app.services.search import index_meeting
+from app.services.changes import record_summary
+from app.services.summarization import get_transcript, seed_actions
+from app.services.transcript_store import load_text
+
+logger = logging.getLogger("uvicorn.error")
+
+# Upper bound on each summary list, which keeps the state sent with every update small
+MAX_ITEMS = 10
+
+# Updates for one meeting run one at a time so each sees the previous offset
+_locks: "weakref.WeakValueDictionary[int, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+class NothingToSummarize(Exception):
+    """The meeting has no transcript and no rolling summary yet"""
+
+
+def _lock(meeting_id: int) -> asyncio.Lock:
+    lock = _locks.get(meeting_id)
+    if lock is None:
+        lock = _locks[meeting_id] = asyncio.Lock()
+    return lock
+
+
+async def summarize_tail(meeting_id: int, provider: BaseProvider) -> Summary:
+    """Fold the stored transcript text past the covered offset into the summary.
+
+    Returns the current summary unchanged, without calling the provider, when
+    no new text has been added since the last update.
+    """
+    async with _lock(meeting_id):
+        with Session(get_engine()) as session:
+            meeting = session.get(Meeting, meeting_id)
+            transcript = get_transcript(session, meeting_id)
+            summary = _get_summary(session, meeting_id)
+            if not transcript:
+                if summary:
+                    return summary
+                raise NothingToSummarize(meeting_id)
+
+            text = load_text(session, transcript)
+            state = session.get(SummaryState, meeting_id)
+            if state is None and summary:
+                # A summary written by /summarize or a batch job covers the whole transcript
+                state = SummaryState(meeting_id=meeting_id, chars_covered=len(text))
+                session.add(state)
+                session.commit()
+                session.refresh(summary)
+            covered = state.chars_covered if state else 0
+            tail = text[covered:]
+            if not tail.strip():
+                return summary
+            return await _fold(session, meeting, summary, state, tail, len(text), provider)
+
+
+async def summarize_appended(meeting_id: int, new_text: str, provider: BaseProvider) -> Summary:
+    """Fold text that continues the meeting before the transcript is stored.
+
+    ``new_text`` is taken to follow the covered text after a single space,
+    which is how live sessions join their windows, so the offset still lines
+    up with the transcript saved at the end.
+    """
+    async with _lock(meeting_id):
+        with Session(get_engine()) as session:
+            meeting = session.get(Meeting, meeting_id)
+            summary = _get_summary(session, meeting_id)
+            state = session.get(SummaryState, meeting_id)
+            covered = state.chars_covered if state else 0
+            covered += (1 if covered else 0) + len(new_text)
+            return await _fold(session, meeting, summary, state, new_text, covered, provider)
+
+
+def _get_summary(session: Session, meeting_id: int) -> Optional[Summary]:
+    return session.exec(select(Summary).where(Summary.meeting_id == meeting_id)).first()
+
+
+async def _fold(
+    session: Session,
+    meeting: Meeting,
+    summary: Optional[Summary],
+    state: Optional[SummaryState],
+    new_text: str,
+    covered: int,
+    provider: BaseProvider,
+) -> Summary:
+    settings = get_settings()
+    extraction = extract_actions(new_text, reference=meeting.created_at.date())
+    # With a previous summary in the prompt the provider is not asked for actions, so the local ones are used
+    confident = extraction.is_confident(settings.action_extractor_min_confidence)
+    known_actions = extraction.actions if confident or summary is not None else None
+    compacted = compact_transcript(new_text, max_tokens=settings.summary_token_budget or None)
+
+    previous = SummaryData(
+        bullets=summary.bullets, decisions=summary.decisions, risks=summary.risks, actions=[]
+    ) if summary else None
+    data = await provider.summarize_update(previous, compacted.text, known_actions=known_actions)
+    logger.info(
+        "Rolling summary for meeting %s: folded %d new tokens (covered %d chars)",
+        meeting.id, compacted.compacted_tokens, covered,
+    )
+
+    if summary is None:
+        summary = Summary(meeting_id=meeting.id)
+    # Reassign the lists so the JSON columns are written
+    summary.bullets = list(data.bullets[:MAX_ITEMS])
+    summary.decisions = list(data.decisions[:MAX_ITEMS])
+    summary.risks = list(data.risks[:MAX_ITEMS])
+    session.add(summary)
+    seed_actions(session, meeting.id, data.actions)
+    record_summary(session, summary)
+
+    if state is None:
+        state = SummaryState(meeting_id=meeting.id)
+    state.chars_covered = covered
+    state.updates += 1
+    state.updated_at = datetime.utcnow()
+    session.add(state)
+    session.commit()
+    session.refresh(summary)
+    await run_in_threadpool(index_meeting, session, meeting.id)
+    return summary
+
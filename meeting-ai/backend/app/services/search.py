@@ -0,0 +1,44 @@
+"""Keeps the semantic search index in step with summaries and action items.
+
+Routes and services call these after committing, through
+``run_in_threadpool``: embedding and the index file writes would otherwise
+block the event loop. The vector index needs NumPy, which is only imported on
+first use so it stays out of app startup.
+Search is secondary to the write that triggered it, so failures are logged
+rather than raised; ``scripts/index_search.py`` rebuilds the index.
+"""
+
+import logging
+from typing import Iterable
+
+from sqlmodel import Session
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def index_meeting(session: Session, meeting_id: int) -> None:
+    """Re-index a meeting's summary and action items after either changed"""
+    try:
+        from app.services.semantic_index import get_index, meeting_documents
+
+        get_index().upsert(meeting_documents(session, meeting_id), meeting_id=meeting_id)
+    except Exception as e:
+        logger.warning("Search indexing for meeting %s failed: %s", meeting_id, e)
+
+
+def unindex_actions(action_ids: Iterable[int]) -> None:
+    try:
+        from app.services.semantic_index import KIND_ACTION, get_index
+
+        get_index().remove((KIND_ACTION, action_id) for action_id in action_ids)
+    except Exception as e:
+        logger.warning("Removing action items from the search index failed: %s", e)
+
+
+def unindex_meeting(meeting_id: int) -> None:
+    try:
+        from app.services.semantic_index import get_index
+
+        get_index().remove_meeting(meeting_id)
+    except Exception as e:
+        logger.warning("Removing meeting %s from the search index failed: %s", meeting_id, e)
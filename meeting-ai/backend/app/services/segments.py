@@ -0,0 +1,119 @@
+"""Timed transcript segments.
+
+Segments store start/end times plus character offsets into the transcript
+body, so range reads return a slice of the text rather than the whole
+transcript. Provider timings are used when available; otherwise sentences
+are spread over the recording in proportion to their length.
+"""
+
+import re
+from typing import Callable, List, Optional, Tuple
+
+from sqlmodel import Session, select, func
+
+from app.models import TranscriptSegment
+from app.schemas import SegmentData
+
+# Used to synthesize timings when the recording length is unknown
+SPEAKING_RATE_CHARS_PER_SEC = 15.0
+
+_SENTENCE = re.compile(r"\S.*?(?:[.!?]+(?=\s)|\Z)", re.DOTALL)
+
+
+def build_segments(
+    transcript_id: int,
+    text: str,
+    timed: List[SegmentData],
+    duration_sec: Optional[float] = None,
+    to_original_time: Optional[Callable[[float], float]] = None,
+) -> List[TranscriptSegment]:
+    """Turn provider segments (or synthesized ones) into rows for ``transcript_id``"""
+    return [
+        TranscriptSegment(
+            transcript_id=transcript_id, idx=idx, start_sec=start_sec, end_sec=end_sec,
+            char_start=char_start, char_end=char_end,
+        )
+        for idx, start_sec, end_sec, char_start, char_end
+        in segment_spans(text, timed, duration_sec, to_original_time)
+    ]
+
+
+def segment_spans(
+    text: str,
+    timed: List[SegmentData],
+    duration_sec: Optional[float] = None,
+    to_original_time: Optional[Callable[[float], float]] = None,
+) -> List[Tuple[int, float, float, int, int]]:
+    """``(idx, start_sec, end_sec, char_start, char_end)`` tuples; bulk loaders use these directly"""
+    spans: List[Tuple[int, float, float, int, int]] = []
+    if timed:
+        remap = to_original_time or (lambda t: t)
+        cursor = 0
+        for seg in timed:
+            piece = seg.text.strip()
+            if not piece:
+                continue
+            pos = text.find(piece, cursor)
+            start = pos if pos >= 0 else cursor
+            end = min(len(text), start + len(piece))
+            cursor = end
+            spans.append(_span(len(spans), remap(seg.start), remap(seg.end), start, end))
+        return spans
+
+    sentences = [m.span() for m in _SENTENCE.finditer(text)]
+    total_chars = sum(end - start for start, end in sentences) or 1
+    seconds_per_char = (duration_sec / total_chars) if duration_sec else 1.0 / SPEAKING_RATE_CHARS_PER_SEC
+    clock = 0.0
+    for start, end in sentences:
+        length = (end - start) * seconds_per_char
+        spans.append(_span(len(spans), clock, clock + length, start, end))
+        clock += length
+    return spans
+
+
+def _span(idx: int, start_sec: float, end_sec: float, char_start: int, char_end: int) -> Tuple[int, float, float, int, int]:
+    return idx, round(start_sec, 3), round(max(start_sec, end_sec), 3), char_start, char_end
+
+
+def count_segments(session: Session, transcript_id: int) -> int:
+    return session.exec(
+        select(func.count()).select_from(TranscriptSegment).where(TranscriptSegment.transcript_id == transcript_id)
+    ).one()
+
+
+def segments_in_range(
+    session: Session,
+    transcript_id: int,
+    start_sec: Optional[float] = None,
+    end_sec: Optional[float] = None,
+    from_index: Optional[int] = None,
+    to_index: Optional[int] = None,
+    limit: int = 200,
+) -> List[TranscriptSegment]:
+    """Segments overlapping a time window and/or an inclusive index range"""
+    query = select(TranscriptSegment).where(TranscriptSegment.transcript_id == transcript_id)
+    if start_sec is not None:
+        query = query.where(TranscriptSegment.end_sec > start_sec)
+    if end_sec is not None:
+        query = query.where(TranscriptSegment.start_sec < end_sec)
+    if from_index is not None:
+        query = query.where(TranscriptSegment.idx >= from_index)
+    if to_index is not None:
+        query = query.where(TranscriptSegment.idx <= to_index)
+    return session.exec(query.order_by(TranscriptSegment.idx).limit(limit)).all()
+
+
+def segment_at(session: Session, transcript_id: int, seconds: float) -> Optional[TranscriptSegment]:
+    """The segment playing at ``seconds``: an index seek on (transcript_id, start_sec).
+
+    None when ``seconds`` falls in a gap between segments or after the last one.
+    """
+    seg = session.exec(
+        select(TranscriptSegment)
+        .where(TranscriptSegment.transcript_id == transcript_id, TranscriptSegment.start_sec <= seconds)
+        .order_by(TranscriptSegment.start_sec.desc())
+        .limit(1)
+    ).first()
+    if seg is None or seg.end_sec < seconds:
+        return None
+    return seg
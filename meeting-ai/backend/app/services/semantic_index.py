@@ -0,0 +1,571 @@
+"""Local semantic search over meeting summaries and action items.
+
+Embeddings are computed on the CPU without a model download.
+- Text is turned into hashed sparse features: word stems, word bigrams and
+  character 4-grams.
+- Each word also adds tokens for the concepts it belongs to in
+  ``CONCEPTS``, a small hand-kept lexicon. This is what lets "launch delays"
+  match a summary that says "timeline risk".
+- A fixed Gaussian random projection maps the sparse features to ``DIM``
+  floats, which are L2-normalized.
+
+Each summary bullet, decision and risk is its own document, so a query
+about one point is not diluted by the rest of the summary. Its ``ref_id``
+packs the summary id with the line's position (``SUMMARY_LINE_BITS``), and
+hits carry both. Each action item is one document.
+
+Vectors live in a memory-mapped float32 matrix (``vectors.f32``). A
+parallel int64 matrix (``docs.i64``) holds ``(meeting_id, kind, ref_id,
+list)`` per row. Re-indexing a document appends a new row and tombstones
+the old one, so writes never rewrite the file.
+
+Approximate nearest neighbours come from an inverted file index. K-means
+centroids (``centroids.f32``) split the vectors into lists. Every new row is
+assigned to its nearest centroid as it is written, and a query reranks only
+the rows in its ``NPROBE`` closest lists. Clustered text like meeting notes
+defeats hyperplane hashing, but IVF keeps recall high. Below ``TRAIN_ROWS``
+the index is searched exhaustively. Centroids are trained once it grows past
+that, and retrained after every ``RETRAIN_GROWTH``-fold growth. Training runs
+in a background thread, one process at a time, and holds the index locks only
+to swap the new lists in; writes and searches carry on against the old ones.
+
+The lists are held in memory and rebuilt from the ``list`` column when a
+process opens the index. Rows appended by other worker processes are
+picked up before each search and write.
+"""
+
+import itertools
+import json
+import logging
+import math
+import os
+import re
+import threading
+import uuid
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlmodel import Session, select
+
+from app.deps import get_settings
+from app.models import ActionItem, Summary
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single process owns the index
+    fcntl = None
+
+logger = logging.getLogger("uvicorn.error")
+
+DIM = 128
+HASH_SPACE = 1 << 15
+SEED = 7
+# Bumped when the meaning of rows changes; older indexes must be rebuilt
+FORMAT = 2
+# Below this many rows a query compares against every vector and no centroids are kept
+TRAIN_ROWS = 20000
+RETRAIN_GROWTH = 8
+NPROBE = 32
+KMEANS_ITERATIONS = 8
+KMEANS_SAMPLE_PER_LIST = 40
+
+KIND_SUMMARY = 0
+KIND_ACTION = 1
+KIND_DELETED = -1
+KINDS = {"summary": KIND_SUMMARY, "action": KIND_ACTION}
+# Summary rows keep the line's position in the low bits of ref_id; longer summaries are cut off
+SUMMARY_LINE_BITS = 10
+
+_WEIGHT_WORD = 1.0
+_WEIGHT_BIGRAM = 0.5
+_WEIGHT_CONCEPT = 1.5
+_WEIGHT_CHAR = 0.25
+
+# Words that mean roughly the same thing in meeting notes share a concept token
+CONCEPTS = {
+    "schedule": "delay delayed late slip slipping timeline deadline schedule postpone behind overdue date",
+    "launch": "launch release ship shipping rollout roll go-live live announce",
+    "risk": "risk concern blocker blocked issue problem threat uncertain depend dependency",
+    "budget": "budget cost costs spend spending price pricing expense forecast revenue",
+    "security": "security audit vulnerability compliance breach privacy",
+    "customer": "customer customers client clients user users feedback satisfaction support",
+    "hiring": "hiring hire recruit recruiting headcount candidate candidates onboarding",
+    "quality": "testing test tests qa bug bugs quality regression",
+    "sales": "sales deal deals pipeline quota target targets",
+    "marketing": "marketing campaign campaigns brand promotion",
+    "decision": "decide decided agree agreed approve approved choose chose",
+    "vendor": "vendor vendors partner partners supplier external contractor",
+}
+_CONCEPT_OF: Dict[str, List[str]] = {}
+for _concept, _words in CONCEPTS.items():
+    for _word in _words.split():
+        _CONCEPT_OF.setdefault(_word, []).append(_concept)
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9'-]*")
+_STOPWORDS = frozenset(
+    "the a an and or but so of to in on at for with from this that is are was were be been it its "
+    "we our you your they their he she i us them by as into about".split()
+)
+
+
+def _stem(word: str) -> str:
+    for suffix in ("ing", "ed", "es", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: -len(suffix)]
+    return word
+
+
+def features(text: str) -> Dict[int, float]:
+    """Hashed feature index -> signed weight"""
+    out: Dict[int, float] = {}
+
+    def add(token: str, weight: float) -> None:
+        h = zlib.crc32(token.encode("utf-8"))
+        index = h % HASH_SPACE
+        out[index] = out.get(index, 0.0) + (weight if h & 0x80000000 else -weight)
+
+    words = [w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS]
+    stems = [_stem(w) for w in words]
+    for word, stem in zip(words, stems):
+        add("w:" + stem, _WEIGHT_WORD)
+        for concept in _CONCEPT_OF.get(word, ()) or _CONCEPT_OF.get(stem, ()):
+            add("c:" + concept, _WEIGHT_CONCEPT)
+        padded = f"<{stem}>"
+        for i in range(len(padded) - 3):
+            add("g:" + padded[i:i + 4], _WEIGHT_CHAR)
+    for a, b in zip(stems, stems[1:]):
+        add(f"b:{a} {b}", _WEIGHT_BIGRAM)
+    return out
+
+
+class _Projection:
+    """The fixed random projection, regenerated from ``SEED`` in every process"""
+
+    _matrix: Optional[np.ndarray] = None
+
+    @classmethod
+    def matrix(cls) -> np.ndarray:
+        if cls._matrix is None:
+            rng = np.random.default_rng(SEED)
+            cls._matrix = rng.standard_normal((HASH_SPACE, DIM), dtype=np.float32) / np.float32(np.sqrt(DIM))
+        return cls._matrix
+
+
+def embed(texts: Sequence[str]) -> np.ndarray:
+    """L2-normalized float32 vectors, one row per text (all zeros for empty text)"""
+    matrix = _Projection.matrix()
+    out = np.zeros((len(texts), DIM), dtype=np.float32)
+    for row, text in enumerate(texts):
+        feats = features(text)
+        if not feats:
+            continue
+        index = np.fromiter(feats.keys(), dtype=np.int64, count=len(feats))
+        weight = np.fromiter(feats.values(), dtype=np.float32, count=len(feats))
+        out[row] = weight @ matrix[index]
+    norms = np.linalg.norm(out, axis=1, keepdims=True)
+    np.divide(out, norms, out=out, where=norms > 0)
+    return out
+
+
+def train_centroids(vectors: np.ndarray, lists: int) -> np.ndarray:
+    """Spherical k-means; empty clusters are reseeded from random vectors"""
+    rng = np.random.default_rng(SEED)
+    centroids = vectors[rng.choice(len(vectors), lists, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        empty = np.bincount(assignment, minlength=lists) == 0
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = sums / np.maximum(norms, 1e-9)
+    return centroids.astype(np.float32)
+
+
+@dataclass
+class Document:
+    meeting_id: int
+    kind: int
+    ref_id: int
+    text: str
+
+
+@dataclass
+class Hit:
+    meeting_id: int
+    kind: str
+    ref_id: int
+    score: float
+    # Position of the matching line for summary hits
+    line: Optional[int] = None
+
+
+class SemanticIndex:
+    """The on-disk vector matrix plus in-memory IVF lists for one directory"""
+
+    def __init__(self, directory: str, train_in_background: bool = True) -> None:
+        self.directory = directory
+        self.train_in_background = train_in_background
+        os.makedirs(directory, exist_ok=True)
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._lock = threading.RLock()
+        self._meta_mtime = 0.0
+        self._training = False
+        self._reset()
+        with self._lock:
+            self._catch_up()
+
+    def _reset(self) -> None:
+        self.count = 0
+        self.capacity = 0
+        self.trained_count = 0
+        # Changes when the index is rebuilt or retrained, so running processes know to reload it
+        self.generation = uuid.uuid4().hex
+        self.vectors: Optional[np.memmap] = None
+        self.docs: Optional[np.memmap] = None
+        self.centroids: Optional[np.ndarray] = None
+        self._rows: Dict[Tuple[int, int], int] = {}
+        self._by_meeting: Dict[int, Set[Tuple[int, int]]] = {}
+        self._lists: List[List[int]] = []
+        self._unassigned: List[int] = []
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    # Files
+
+    def _read_meta(self) -> dict:
+        with open(self._meta_path) as f:
+            meta = json.load(f)
+        if meta.get("dim") != DIM or meta.get("seed") != SEED or meta.get("format", 1) != FORMAT:
+            raise ValueError(f"Search index in {self.directory} was built with other settings; rebuild it")
+        return meta
+
+    def _write_meta(self) -> None:
+        tmp = self._meta_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({
+                "dim": DIM,
+                "seed": SEED,
+                "format": FORMAT,
+                "count": self.count,
+                "trained_count": self.trained_count,
+                "generation": self.generation,
+            }, f)
+        os.replace(tmp, self._meta_path)
+        self._meta_mtime = os.stat(self._meta_path).st_mtime
+
+    def _map(self, capacity: int) -> None:
+        """(Re)open both matrices with room for ``capacity`` rows, growing the files if needed"""
+        for name, width, dtype in (("vectors.f32", DIM, np.float32), ("docs.i64", 4, np.int64)):
+            size = capacity * width * np.dtype(dtype).itemsize
+            with open(self._path(name), "ab") as f:
+                if f.tell() < size:
+                    f.truncate(size)
+        if capacity:
+            self.vectors = np.memmap(self._path("vectors.f32"), np.float32, "r+", shape=(capacity, DIM))
+            self.docs = np.memmap(self._path("docs.i64"), np.int64, "r+", shape=(capacity, 4))
+        self.capacity = capacity
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        with open(self._path("index.lock"), "a") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _catch_up(self) -> None:
+        """Load rows written since this process last looked, by itself or another worker"""
+        try:
+            mtime = os.stat(self._meta_path).st_mtime
+        except FileNotFoundError:
+            return
+        if mtime == self._meta_mtime:
+            return
+        meta = self._read_meta()
+        self._meta_mtime = mtime
+        if meta["generation"] != self.generation:
+            self._reset()
+            self.generation = meta["generation"]
+            self.trained_count = int(meta.get("trained_count") or 0)
+            if self.trained_count:
+                self.centroids = np.fromfile(self._path("centroids.f32"), dtype=np.float32).reshape(-1, DIM)
+                self._lists = [[] for _ in range(len(self.centroids))]
+        count = int(meta["count"])
+        if count <= self.count:
+            return
+        if count > self.capacity:
+            # The writer grew the files first, possibly beyond ``count``
+            self._map(os.path.getsize(self._path("vectors.f32")) // (DIM * 4))
+        self._index_rows(self.count, count)
+        self.count = count
+
+    def _index_rows(self, start: int, stop: int) -> None:
+        for offset, (meeting_id, kind, ref_id, list_id) in enumerate(np.asarray(self.docs[start:stop]).tolist()):
+            if kind == KIND_DELETED:
+                continue
+            row = start + offset
+            previous = self._rows.get((kind, ref_id))
+            if previous is not None and previous != row:
+                self.docs[previous, 1] = KIND_DELETED
+            self._rows[(kind, ref_id)] = row
+            self._by_meeting.setdefault(meeting_id, set()).add((kind, ref_id))
+            if list_id >= 0 and self.centroids is not None:
+                self._lists[list_id].append(row)
+            else:
+                self._unassigned.append(row)
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        if self.centroids is None:
+            return np.full(len(vectors), -1, dtype=np.int64)
+        return np.argmax(vectors @ self.centroids.T, axis=1)
+
+    def _needs_training(self) -> bool:
+        return self.count >= max(TRAIN_ROWS, self.trained_count * RETRAIN_GROWTH)
+
+    def _start_training(self) -> None:
+        """Train in a background thread unless this process already is; the caller holds ``_lock``"""
+        if self._training:
+            return
+        self._training = True
+        threading.Thread(target=self._train_in_background, name="search-index-train", daemon=True).start()
+
+    def _train_in_background(self) -> None:
+        try:
+            with open(self._path("train.lock"), "a") as f:
+                if fcntl:
+                    try:
+                        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        return  # another worker is training
+                self.train(force=False)
+        except Exception as e:
+            logger.warning("Training the search index failed: %s", e)
+        finally:
+            with self._lock:
+                self._training = False
+
+    def train(self, force: bool = True) -> None:
+        """Fit centroids to the current rows and reassign every row.
+
+        K-means and the assignment of the rows present at the start run
+        without the index locks. Rows written meanwhile are assigned once
+        the locks are taken to swap the new lists in. Without ``force`` the
+        index is left alone if another worker trained it in the meantime.
+        """
+        with self._lock:
+            self._catch_up()
+            if not self.count or not (force or self._needs_training()):
+                return
+            count, generation = self.count, self.generation
+            vectors, docs = self.vectors, self.docs
+
+        # Rows below ``count`` are never rewritten, only tombstoned, so they can be read unlocked
+        lists = min(4096, max(64, int(2 * math.sqrt(count))))
+        live = np.nonzero(np.asarray(docs[:count, 1]) != KIND_DELETED)[0]
+        if len(live) < lists:
+            return
+        rng = np.random.default_rng(SEED)
+        sample = np.sort(rng.choice(live, min(len(live), lists * KMEANS_SAMPLE_PER_LIST), replace=False))
+        centroids = train_centroids(np.asarray(vectors[sample]), lists)
+        assigned = np.concatenate([
+            np.argmax(np.asarray(vectors[start:min(count, start + 50000)]) @ centroids.T, axis=1)
+            for start in range(0, count, 50000)
+        ])
+
+        with self._lock, self._file_lock():
+            self._catch_up()
+            if self.generation != generation:
+                return  # rebuilt or retrained by another worker meanwhile
+            self.centroids = centroids
+            self.docs[:count, 3] = assigned
+            if self.count > count:
+                self.docs[count:self.count, 3] = self._assign(np.asarray(self.vectors[count:self.count]))
+            self.docs.flush()
+            tmp = self._path("centroids.f32.tmp")
+            centroids.tofile(tmp)
+            os.replace(tmp, self._path("centroids.f32"))
+            self.generation = uuid.uuid4().hex
+            self.trained_count = self.count
+            self._write_meta()
+            logger.info("Trained %d search index lists over %d rows", lists, self.count)
+            # Reload so the in-memory lists follow the new assignment
+            self._meta_mtime = 0.0
+            self.generation = None
+            self._catch_up()
+
+    # Writes
+
+    def upsert(self, documents: Sequence[Document], meeting_id: Optional[int] = None) -> None:
+        """Index or re-index documents; documents with empty text are removed.
+
+        With ``meeting_id`` the documents replace everything indexed for that
+        meeting, so items deleted since the last update drop out.
+        """
+        vectors = embed([d.text for d in documents])
+        with self._lock, self._file_lock():
+            self._catch_up()
+            if meeting_id is not None:
+                current = {(d.kind, d.ref_id) for d in documents}
+                self._tombstone(self._by_meeting.get(meeting_id, set()) - current)
+            self._tombstone((d.kind, d.ref_id) for d in documents)
+            keep = [i for i, d in enumerate(documents) if d.text.strip()]
+            if not keep:
+                if self.docs is not None:
+                    self.docs.flush()
+                return
+            start = self.count
+            stop = start + len(keep)
+            if stop > self.capacity:
+                self._map(max(stop, self.capacity * 2, 1024))
+            self.vectors[start:stop] = vectors[keep]
+            self.docs[start:stop, :3] = [[documents[i].meeting_id, documents[i].kind, documents[i].ref_id] for i in keep]
+            self.docs[start:stop, 3] = self._assign(vectors[keep])
+            self.vectors.flush()
+            self.docs.flush()
+            self._index_rows(start, stop)
+            self.count = stop
+            self._write_meta()
+            if self.train_in_background and self._needs_training():
+                self._start_training()
+
+    def remove(self, keys: Iterable[Tuple[int, int]]) -> None:
+        with self._lock, self._file_lock():
+            self._catch_up()
+            self._tombstone(keys)
+            if self.docs is not None:
+                self.docs.flush()
+
+    def remove_meeting(self, meeting_id: int) -> None:
+        self.upsert([], meeting_id=meeting_id)
+
+    def _tombstone(self, keys: Iterable[Tuple[int, int]]) -> None:
+        for key in list(keys):
+            row = self._rows.pop(key, None)
+            if row is not None:
+                meeting_keys = self._by_meeting.get(int(self.docs[row, 0]))
+                if meeting_keys:
+                    meeting_keys.discard(key)
+                self.docs[row, 1] = KIND_DELETED
+
+    # Reads
+
+    def search(self, query: str, k: int = 10, kind: Optional[int] = None) -> List[Hit]:
+        vector = embed([query])[0]
+        if not vector.any():
+            return []
+        with self._lock:
+            self._catch_up()
+            if not self.count:
+                return []
+            if self.centroids is None:
+                rows = np.arange(self.count)
+            else:
+                probes = np.argsort(-(self.centroids @ vector))[:NPROBE]
+                rows = np.fromiter(
+                    itertools.chain(self._unassigned, *(self._lists[p] for p in probes.tolist())), dtype=np.int64
+                )
+                # Sorted rows read the memory map front to back
+                rows.sort()
+            docs = np.asarray(self.docs[rows])
+            live = docs[:, 1] != KIND_DELETED if kind is None else docs[:, 1] == kind
+            rows, docs = rows[live], docs[live]
+            scores = np.asarray(self.vectors[rows]) @ vector
+        top = np.argsort(-scores)[:k]
+        return [_hit(docs[i], float(scores[i])) for i in top if scores[i] > 0]
+
+
+def _hit(doc: np.ndarray, score: float) -> Hit:
+    meeting_id, kind, ref_id = int(doc[0]), int(doc[1]), int(doc[2])
+    if kind == KIND_SUMMARY:
+        return Hit(meeting_id, "summary", ref_id >> SUMMARY_LINE_BITS, score, ref_id & ((1 << SUMMARY_LINE_BITS) - 1))
+    return Hit(meeting_id, "action", ref_id, score)
+
+
+_index: Optional[SemanticIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> SemanticIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SemanticIndex(get_settings().search_index_dir)
+    return _index
+
+
+def summary_lines(bullets: Optional[List[str]], decisions: Optional[List[str]], risks: Optional[List[str]]) -> List[str]:
+    """A summary's lines in the order their positions are indexed"""
+    return [*(bullets or []), *(decisions or []), *(risks or [])]
+
+
+def summary_documents(meeting_id: int, summary_id: int, lines: Sequence[str]) -> List[Document]:
+    return [
+        Document(meeting_id, KIND_SUMMARY, (summary_id << SUMMARY_LINE_BITS) | position, text)
+        for position, text in enumerate(lines[: 1 << SUMMARY_LINE_BITS])
+    ]
+
+
+def meeting_documents(session: Session, meeting_id: int) -> List[Document]:
+    """The summary line and action item documents of one meeting, as currently stored"""
+    documents = []
+    summary = session.exec(select(Summary).where(Summary.meeting_id == meeting_id)).first()
+    if summary:
+        lines = summary_lines(summary.bullets, summary.decisions, summary.risks)
+        documents.extend(summary_documents(meeting_id, summary.id, lines))
+    for action_id, text in session.exec(
+        select(ActionItem.id, ActionItem.text).where(ActionItem.meeting_id == meeting_id)
+    ):
+        documents.append(Document(meeting_id, KIND_ACTION, action_id, text))
+    return documents
+
+
+def best_line(query: str, lines: Sequence[str]) -> str:
+    """The line of a multi-line document closest to the query, shown as the match"""
+    if not lines:
+        return ""
+    vectors = embed([query, *lines])
+    return lines[int(np.argmax(vectors[1:] @ vectors[0]))]
+
+
+def rebuild(session: Session, directory: str, batch_size: int = 5000) -> int:
+    """Write a fresh index of every summary and action item into ``directory``"""
+    os.makedirs(directory, exist_ok=True)
+    for name in ("vectors.f32", "docs.i64", "centroids.f32", "meta.json"):
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            os.remove(path)
+    # Trained once at the end rather than as the rows come in
+    index = SemanticIndex(directory, train_in_background=False)
+    total = 0
+    for model, kind, columns in (
+        (Summary, KIND_SUMMARY, (Summary.id, Summary.meeting_id, Summary.bullets, Summary.decisions, Summary.risks)),
+        (ActionItem, KIND_ACTION, (ActionItem.id, ActionItem.meeting_id, ActionItem.text)),
+    ):
+        last_id = 0
+        while True:
+            rows = session.exec(select(*columns).where(model.id > last_id).order_by(model.id).limit(batch_size)).all()
+            if not rows:
+                break
+            if kind == KIND_SUMMARY:
+                documents = [
+                    document
+                    for ref_id, meeting_id, b, d, r in rows
+                    for document in summary_documents(meeting_id, ref_id, summary_lines(b, d, r))
+                ]
+            else:
+                documents = [Document(meeting_id, kind, ref_id, text) for ref_id, meeting_id, text in rows]
+            index.upsert(documents)
+            total += len(documents)
+            last_id = rows[-1][0]
+    if index.count >= TRAIN_ROWS:
+        index.train()
+    return total
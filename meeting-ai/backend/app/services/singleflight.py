@@ -0,0 +1,110 @@
+"""Request coalescing for expensive per-meeting operations.
+
+``SingleFlight`` makes concurrent callers with the same key share one
+in-flight task, so double clicks and client retries cost one provider call.
+A caller whose input differs (another upload for the same meeting) passes a
+different fingerprint and is refused with ``ConflictingCall`` rather than
+handed a result computed from someone else's input.
+``IdempotencyCache`` remembers finished results under a client-supplied
+``Idempotency-Key`` so a retry after completion gets the same response.
+Both are per process; the unique constraints on ``Transcript.meeting_id`` and
+``Summary.meeting_id`` catch races between workers.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from app.deps import get_settings
+from app.services.deadline import without_deadline
+
+T = TypeVar("T")
+
+
+class ConflictingCall(RuntimeError):
+    """A call for the key is in flight with a different fingerprint"""
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        self._fingerprints: Dict[Hashable, Hashable] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]], fingerprint: Hashable = None) -> T:
+        """Run ``fn`` once per key at a time; concurrent callers await the same task.
+
+        Raises ``ConflictingCall`` when the call in flight was started with
+        another ``fingerprint``. The task runs in the first caller's context
+        but without its deadline, since callers with later deadlines may join;
+        each caller times out on its own, and the task is cancelled once every
+        caller waiting on it is gone.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            with without_deadline():
+                task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            self._waiters[key] = 0
+            self._fingerprints[key] = fingerprint
+            task.add_done_callback(lambda t: self._forget(key, t))
+        elif self._fingerprints[key] != fingerprint:
+            raise ConflictingCall(key)
+        self._waiters[key] += 1
+        try:
+            # A caller going away must not cancel the work other callers are waiting on
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._calls.get(key) is task and self._waiters[key] == 1 and not task.done():
+                # Nobody is left to use the result; free the provider and let the task unwind
+                task.cancel()
+                await asyncio.wait({task})
+            raise
+        finally:
+            if self._calls.get(key) is task:
+                self._waiters[key] -= 1
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether a call for ``key`` is in flight"""
+        return key in self._calls
+
+    def joins(self, key: Hashable, fingerprint: Hashable = None) -> bool:
+        """Whether a caller with ``fingerprint`` would share a call in flight"""
+        return key in self._calls and self._fingerprints[key] == fingerprint
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+            del self._waiters[key]
+            del self._fingerprints[key]
+
+
+class IdempotencyCache:
+    """Bounded, time-limited map of (operation, meeting, key) to a finished result"""
+
+    def __init__(self, max_entries: int = 1024, ttl_sec: float = 3600) -> None:
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl_sec:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+inflight = SingleFlight()
+idempotency = IdempotencyCache(ttl_sec=get_settings().idempotency_ttl_sec)
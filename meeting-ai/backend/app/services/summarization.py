@@ -0,0 +1,190 @@
+"""Shared summarization steps used by the summarize route and batch jobs"""
+
+import logging
+from datetime import datetime
+from typing import List, Set
+
+from sqlmodel import Session, select, delete
+
+from app.deps import get_settings
+from app.models import Meeting, Transcript, Summary, SummaryState, ActionItem, ActionMention
+from app.providers.base import BaseProvider
+from app.schemas import ActionItemCreate, SummaryData
+from app.services.action_index import OPEN_STATUSES, find_similar, index_action, unindex_actions
+from app.services.action_rollups import record_deletes, record_insert, record_update, rollup_key
+from app.services.changes import record_action, record_action_deletes, record_summary, record_summary_delete
+from app.services.action_extractor import extract_actions
+from app.services.compaction import compact_transcript
+from app.services.transcript_store import load_text
+
+logger = logging.getLogger("uvicorn.error")
+
+
+async def generate_summary(
+    session: Session, meeting: Meeting, transcript: Transcript, provider: BaseProvider
+) -> SummaryData:
+    """Run local pre-processing and ask the provider for a summary"""
+    settings = get_settings()
+    transcript_text = load_text(session, transcript)
+
+    # Pull action items out locally; when the rules cover the transcript the
+    # provider can leave actions out of the prompt and completion
+    extraction = extract_actions(transcript_text, reference=meeting.created_at.date())
+    threshold = settings.action_extractor_min_confidence
+    known_actions = extraction.actions if extraction.is_confident(threshold) else None
+
+    # Strip whitespace, disfluencies and repeats before paying for prompt tokens
+    compacted = compact_transcript(transcript_text, max_tokens=settings.summary_token_budget or None)
+    logger.info(
+        "Transcript compaction for meeting %s: %d -> %d tokens (%.2fx, %d sentences dropped)",
+        meeting.id, compacted.original_tokens, compacted.compacted_tokens,
+        compacted.compression_ratio, compacted.dropped_sentences,
+    )
+
+    return await provider.summarize(compacted.text, known_actions=known_actions)
+
+
+def store_summary(
+    session: Session, meeting_id: int, summary_data: SummaryData, replace: bool = False
+) -> Summary:
+    """Add the summary and its seeded action items to the session; the caller commits.
+
+    With ``replace`` the previous summary, the action items it seeded and its
+    links to items in other meetings are removed in the same transaction.
+    Manually created actions are kept, as are seeded items other meetings
+    link to. Any rolling summary progress is reset so the new summary covers
+    the whole transcript.
+    """
+    if replace:
+        session.exec(delete(SummaryState).where(SummaryState.meeting_id == meeting_id))
+        # The new summary gets a new id, so clients are told the old one is gone
+        for summary_id in session.exec(select(Summary.id).where(Summary.meeting_id == meeting_id)).all():
+            record_summary_delete(session, summary_id, meeting_id)
+        session.exec(delete(Summary).where(Summary.meeting_id == meeting_id))
+        session.exec(delete(ActionMention).where(ActionMention.meeting_id == meeting_id))
+        seeded = session.exec(
+            select(ActionItem.id).where(
+                ActionItem.meeting_id == meeting_id,
+                ActionItem.source == "summary",
+                ActionItem.id.not_in(select(ActionMention.action_id)),
+            )
+        ).all()
+        if seeded:
+            unindex_actions(session, seeded)
+            record_deletes(session, ActionItem.id.in_(seeded))
+            record_action_deletes(session, [(action_id, meeting_id) for action_id in seeded])
+            session.exec(delete(ActionItem).where(ActionItem.id.in_(seeded)))
+
+    summary = Summary(
+        meeting_id=meeting_id,
+        bullets=summary_data.bullets,
+        decisions=summary_data.decisions,
+        risks=summary_data.risks
+    )
+    session.add(summary)
+    seed_actions(session, meeting_id, summary_data.actions)
+    record_summary(session, summary)
+    return summary
+
+
+def seed_actions(session: Session, meeting_id: int, actions: List[ActionItemCreate]) -> None:
+    """Add a summary's action items, merging repeats into items that already exist.
+
+    A near duplicate of an item this meeting already has, in any status,
+    updates that item. A near duplicate of an open item from another meeting
+    (recurring meetings restate the same tasks) is linked to this meeting
+    through ``ActionMention`` instead of being copied. An unassigned action
+    only matches unassigned items, and an assigned one prefers that person's
+    items to unassigned ones. Everything else is added and indexed. The
+    caller commits.
+    """
+    threshold = get_settings().action_merge_threshold
+    now = datetime.utcnow()
+    for action in actions:
+        match = None
+        if threshold > 0:
+            similar = [
+                item for item, _ in find_similar(
+                    session, action.text, action.assignee, statuses=None, threshold=threshold, limit=20
+                )
+                if (item.meeting_id == meeting_id or item.status in OPEN_STATUSES)
+                and (action.assignee or not item.assignee)
+            ]
+            # Prefer this meeting's own item over one from another meeting, then the same person's; the
+            # sort is stable, so ties stay best match first
+            similar.sort(key=lambda item: (item.meeting_id != meeting_id, item.assignee is None))
+            match = next(iter(similar), None)
+
+        if match is None:
+            item = ActionItem(
+                meeting_id=meeting_id,
+                text=action.text,
+                assignee=action.assignee,
+                due_date=action.due_date,
+                status=action.status,
+                source="summary",
+            )
+            session.add(item)
+            session.flush()
+            index_action(session, item)
+            record_insert(session, item)
+            record_action(session, item)
+            continue
+
+        mentioned = False
+        if match.meeting_id != meeting_id and not session.exec(
+            select(ActionMention.id).where(ActionMention.action_id == match.id, ActionMention.meeting_id == meeting_id)
+        ).first():
+            session.add(ActionMention(action_id=match.id, meeting_id=meeting_id))
+            mentioned = True
+        # A repeat fills in details; the status may already have been changed by a person. Only the
+        # meeting's own summary may move a due date: another meeting restating a task does not reschedule it
+        before = rollup_key(match)
+        changed = False
+        if action.assignee and not match.assignee:
+            match.assignee = action.assignee
+            changed = True
+        if action.due_date and action.due_date != match.due_date and (
+            match.meeting_id == meeting_id or match.due_date is None
+        ):
+            match.due_date = action.due_date
+            changed = True
+        if changed:
+            match.updated_at = now
+            record_update(session, before, match)
+            session.add(match)
+        if changed or mentioned:
+            record_action(session, match)
+
+
+def hand_over_actions(session: Session, meeting_id: int) -> Set[int]:
+    """Give a meeting's repeated action items to the earliest meeting that repeated them.
+
+    Called before deleting the meeting, so items other meetings still link
+    to survive it. Each item's link to its new owner is dropped; links from
+    further meetings stay. Rollups do not depend on the meeting, so only the
+    change feed is told. Returns the new owners, to be re-indexed for search
+    after the commit. The caller commits.
+    """
+    mentions = session.exec(
+        select(ActionMention)
+        .join(ActionItem, ActionItem.id == ActionMention.action_id)
+        .join(Meeting, Meeting.id == ActionMention.meeting_id)
+        .where(ActionItem.meeting_id == meeting_id, ActionMention.meeting_id != meeting_id)
+        .order_by(ActionMention.action_id, Meeting.created_at, Meeting.id)
+    ).all()
+    owners = {}
+    for mention in mentions:
+        owners.setdefault(mention.action_id, mention)
+    for action_id, mention in owners.items():
+        item = session.get(ActionItem, action_id)
+        item.meeting_id = mention.meeting_id
+        session.add(item)
+        session.delete(mention)
+        record_action(session, item)
+    session.flush()
+    return {mention.meeting_id for mention in owners.values()}
+
+
+def get_transcript(session: Session, meeting_id: int):
+    return session.exec(select(Transcript).where(Transcript.meeting_id == meeting_id)).first()
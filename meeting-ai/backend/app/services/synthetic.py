@@ -0,0 +1,173 @@
+"""Deterministic synthetic meetings for load testing and local development.
+
+``generate_meetings`` yields records in the export format, so they can be
+written with ``BulkLoader`` or saved as NDJSON. The same seed always
+produces the same meetings relative to the reference date. Durations are
+log-normal around half an hour. Transcript length follows the duration at
+a typical speaking rate, and action items are spoken in the transcript in
+the phrasing the local extractor recognizes.
+"""
+
+import math
+import random
+from datetime import date, datetime, timedelta
+from typing import Iterator, List, Optional
+
+PEOPLE = [
+    "John", "Sarah", "Mike", "Priya", "Chen", "Fatima", "Lucas", "Emma", "Omar", "Sofia",
+    "David", "Aisha", "Tom", "Mei", "Carlos", "Nina", "Raj", "Hannah", "Yuki", "Leo",
+]
+TEAMS = ["Engineering team", "Marketing team", "Sales team", "Design team", "Support team", "Finance team"]
+TOPICS = [
+    "Q3 review", "Q4 planning", "product launch", "security audit", "customer feedback",
+    "hiring plan", "pricing update", "onboarding flow", "mobile release", "data migration",
+    "partner integration", "budget review", "incident retro", "roadmap", "sprint planning",
+]
+MEETING_KINDS = ["Weekly Standup", "Planning", "Review", "Sync", "Retro", "Kickoff", "1:1", "All Hands"]
+
+_STATEMENTS = [
+    "We made good progress on the {topic} this week.",
+    "The {topic} is on track but the timeline is tight.",
+    "Numbers for the {topic} came in {pct}% above the target.",
+    "Customer satisfaction for the {topic} is at {score} out of 5.",
+    "There is still an open question about the scope of the {topic}.",
+    "I think we should revisit the {topic} after the next release.",
+    "The {topic} depends on the vendor delivering on time.",
+    "We agreed to keep the current approach for the {topic}.",
+    "Feedback on the {topic} has been mostly positive so far.",
+    "We are about {pct}% through the {topic}.",
+    "Let's make sure everyone has read the {topic} document before Friday.",
+    "Um, so, just to recap, the {topic} is the main priority.",
+]
+_DECISIONS = [
+    "Ship the {topic} behind a feature flag",
+    "Move the {topic} deadline by one week",
+    "Keep the current vendor for the {topic}",
+    "Run a pilot of the {topic} with two customers",
+]
+_RISKS = [
+    "{topic} timeline depends on external vendor",
+    "Limited capacity for the {topic} next sprint",
+    "Open security questions around the {topic}",
+]
+_ACTIONS = [
+    "prepare the {topic} forecast", "update the {topic} document", "review the {topic} budget",
+    "schedule a follow-up on the {topic}", "share the {topic} results with the team",
+    "finish testing the {topic}", "draft the {topic} announcement", "collect feedback on the {topic}",
+]
+_DUE_PHRASES = [
+    ("by Friday", None), ("by next Monday", None), ("by the end of the week", None),
+    ("in two weeks", 14), ("tomorrow", 1), ("", None),
+]
+STATUSES = ["open"] * 6 + ["in_progress"] * 3 + ["completed"] * 3 + ["cancelled"]
+
+# Roughly 130 spoken words per minute at about 6 characters per word
+CHARS_PER_SEC = 13.0
+# Pre-rendered sentences and turns per topic; transcripts sample whole turns
+# from these instead of formatting every line, which dominates generation time
+_POOL_SIZE = 64
+_TURN_POOL_SIZE = 256
+
+
+def _sentence_pool(rng: random.Random, topic: str) -> List[str]:
+    return [
+        rng.choice(_STATEMENTS).format(topic=topic, pct=rng.randint(5, 95), score=round(rng.uniform(3.5, 5.0), 1))
+        for _ in range(_POOL_SIZE)
+    ]
+
+
+def _turn_pool(rng: random.Random, sentences: List[str]) -> List[str]:
+    return [" ".join(rng.choices(sentences, k=rng.randint(1, 4))) for _ in range(_TURN_POOL_SIZE)]
+
+
+def _sentence_case(text: str) -> str:
+    return text[0].upper() + text[1:]
+
+
+def _due_date(rng: random.Random, phrase_days: Optional[int], created: date) -> Optional[date]:
+    if phrase_days is not None:
+        return created + timedelta(days=phrase_days)
+    return created + timedelta(days=rng.randint(1, 21)) if rng.random() < 0.7 else None
+
+
+def generate_meetings(
+    count: int,
+    seed: int = 42,
+    days: int = 365,
+    reference: Optional[datetime] = None,
+    transcript_ratio: float = 0.85,
+    summary_ratio: float = 0.8,
+    mean_duration_min: float = 30.0,
+    max_duration_min: float = 120.0,
+) -> Iterator[dict]:
+    """Yield ``count`` meeting records spread over the ``days`` before ``reference``"""
+    rng = random.Random(seed)
+    reference = reference or datetime.utcnow().replace(microsecond=0)
+    pools = {topic: _sentence_pool(rng, topic) for topic in TOPICS}
+    turns = {topic: _turn_pool(rng, pools[topic]) for topic in TOPICS}
+    # Log-normal parameters so the mean duration comes out near mean_duration_min
+    sigma = 0.6
+    mu = math.log(mean_duration_min) - sigma ** 2 / 2
+
+    for _ in range(count):
+        topic = rng.choice(TOPICS)
+        created_at = reference - timedelta(seconds=rng.randint(0, days * 86400))
+        speakers = rng.sample(PEOPLE, rng.randint(2, 6))
+        record = {
+            "title": f"{rng.choice(MEETING_KINDS)} - {topic.title()}",
+            "created_at": created_at,
+            "transcript": None,
+            "summary": None,
+            "actions": [],
+        }
+        if rng.random() >= transcript_ratio:
+            yield record
+            continue
+
+        duration = int(min(max_duration_min, rng.lognormvariate(mu, sigma)) * 60)
+        actions = []
+        for _ in range(min(8, int(rng.expovariate(1 / 3.0)))):
+            assignee = rng.choice(speakers + TEAMS[:2])
+            phrase, phrase_days = rng.choice(_DUE_PHRASES)
+            text = rng.choice(_ACTIONS).format(topic=rng.choice(TOPICS))
+            actions.append({
+                "text": _sentence_case(text),
+                "assignee": assignee,
+                "due_date": _due_date(rng, phrase_days, created_at.date()),
+                "status": rng.choice(STATUSES),
+                "source": "summary",
+                "spoken": f"{assignee} needs to {text}" + (f" {phrase}" if phrase else "") + ".",
+            })
+        record["transcript"] = {
+            "text": _transcript(rng, turns[topic], speakers, duration, [a.pop("spoken") for a in actions]),
+            "duration_sec": duration,
+            "created_at": created_at + timedelta(seconds=duration),
+        }
+        if rng.random() < summary_ratio:
+            record["summary"] = {
+                "bullets": rng.sample(pools[topic], rng.randint(3, 6)),
+                "decisions": [d.format(topic=topic) for d in rng.sample(_DECISIONS, rng.randint(0, 2))],
+                "risks": [r.format(topic=topic) for r in rng.sample(_RISKS, rng.randint(0, 2))],
+                "created_at": created_at + timedelta(seconds=duration + 60),
+            }
+            record["actions"] = actions
+        # A few manual actions are added by people after the meeting
+        for _ in range(rng.choice((0, 0, 0, 1, 2))):
+            record["actions"].append({
+                "text": _sentence_case(rng.choice(_ACTIONS).format(topic=topic)),
+                "assignee": rng.choice(speakers),
+                "due_date": _due_date(rng, None, created_at.date()),
+                "status": rng.choice(STATUSES),
+                "source": "manual",
+            })
+        yield record
+
+
+def _transcript(rng: random.Random, turns: List[str], speakers: List[str], duration: int, spoken: List[str]) -> str:
+    """Speaker turns drawn from the pool, sized to ``duration``, with the action lines mixed in"""
+    mean_turn = sum(len(t) for t in turns) / len(turns) + 8
+    count = max(1, int(duration * CHARS_PER_SEC / mean_turn))
+    lines = [f"{who}: {turn}" for who, turn in zip(rng.choices(speakers, k=count), rng.choices(turns, k=count))]
+    for action in spoken:
+        lines.insert(rng.randint(0, len(lines)), f"{rng.choice(speakers)}: {action}")
+    return "\n".join(lines)
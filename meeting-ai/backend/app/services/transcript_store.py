@@ -0,0 +1,240 @@
+"""Compressed transcript storage with a cold tier.
+
+Transcript text lives in ``TranscriptBody`` as zstd (when ``zstandard`` is
+installed) or zlib compressed bytes and is only read when a caller asks for
+it. Bodies older than the configured age can be moved into append-only
+segment files, which are read back through ``mmap``.
+"""
+
+import mmap
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from app.deps import get_settings
+from app.models import Transcript, TranscriptBody, TranscriptSegment
+from app.services.changes import record_transcript
+from app.services.segments import segment_spans
+
+try:
+    import zstandard
+except ImportError:  # zlib is always available
+    zstandard = None
+
+# Segment files roll over once they reach this size
+SEGMENT_MAX_BYTES = 256 * 1024 * 1024
+
+# Decompressed text of recently read transcripts, bounded by total characters.
+# Bodies only change by appending, which changes their size; the size is part
+# of the key, so an appended transcript is read afresh and the old text ages out
+TEXT_CACHE_MAX_CHARS = 16 * 1024 * 1024
+
+_maps: Dict[str, mmap.mmap] = {}
+_maps_lock = threading.Lock()
+_texts: "OrderedDict[Tuple[int, datetime, int], str]" = OrderedDict()
+_texts_chars = 0
+_texts_lock = threading.Lock()
+
+
+def compress(text: str) -> Tuple[str, bytes]:
+    raw = text.encode("utf-8")
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=6).compress(raw)
+    return "zlib", zlib.compress(raw, 6)
+
+
+def decompress(codec: str, data: bytes) -> str:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Transcript is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    if codec == "zlib":
+        return zlib.decompress(data).decode("utf-8")
+    raise ValueError(f"Unknown transcript codec: {codec}")
+
+
+def save_transcript(
+    session: Session, meeting_id: int, text: str, duration_sec: Optional[int] = None
+) -> Transcript:
+    """Add a transcript and its compressed body to the session; the caller commits"""
+    transcript = Transcript(meeting_id=meeting_id, duration_sec=duration_sec)
+    session.add(transcript)
+    session.flush()
+    session.add(build_body(transcript.id, text))
+    record_transcript(session, transcript)
+    return transcript
+
+
+class ConcurrentAppend(Exception):
+    """Another request appended to the transcript between our read and write"""
+
+
+def append_transcript(session: Session, transcript: Transcript, text: str, duration_sec: Optional[int] = None) -> int:
+    """Add ``text`` and synthesized segments for it to the end of a stored transcript; the caller commits.
+
+    The text follows the old after a single space, as live windows are
+    joined, so a rolling summary's covered offset still lines up. A cold body
+    moves back to the hot tier, leaving its old bytes unreferenced in the
+    segment file. Returns the index of the first new segment. Raises
+    ``ConcurrentAppend`` if the body changed since it was read.
+    """
+    body = session.get(TranscriptBody, transcript.id)
+    current = _read_body(body) if body else ""
+    start = len(current) + 1 if current else 0
+    joined = f"{current} {text}" if current else text
+    codec, data = compress(joined)
+    values = dict(codec=codec, size=len(joined.encode("utf-8")), data=data, segment=None, offset=None, length=None)
+    if body is None:
+        session.add(TranscriptBody(transcript_id=transcript.id, **values))
+    else:
+        # The size only grows, so it doubles as the version the write is conditional on
+        result = session.exec(
+            update(TranscriptBody)
+            .where(TranscriptBody.transcript_id == transcript.id, TranscriptBody.size == body.size)
+            .values(**values)
+        )
+        if result.rowcount != 1:
+            raise ConcurrentAppend(transcript.id)
+        session.expire(body)
+
+    last = session.exec(
+        select(TranscriptSegment)
+        .where(TranscriptSegment.transcript_id == transcript.id)
+        .order_by(TranscriptSegment.idx.desc())
+        .limit(1)
+    ).first()
+    first_idx = last.idx + 1 if last else 0
+    clock = last.end_sec if last else float(transcript.duration_sec or 0)
+    for idx, start_sec, end_sec, char_start, char_end in segment_spans(text, [], duration_sec):
+        session.add(TranscriptSegment(
+            transcript_id=transcript.id, idx=first_idx + idx,
+            start_sec=round(clock + start_sec, 3), end_sec=round(clock + end_sec, 3),
+            char_start=start + char_start, char_end=start + char_end,
+        ))
+    if duration_sec:
+        transcript.duration_sec = (transcript.duration_sec or 0) + duration_sec
+        session.add(transcript)
+    record_transcript(session, transcript)
+    return first_idx
+
+
+def build_body(transcript_id: int, text: str) -> TranscriptBody:
+    codec, data = compress(text)
+    return TranscriptBody(
+        transcript_id=transcript_id, codec=codec, size=len(text.encode("utf-8")), data=data
+    )
+
+
+def load_text(session: Session, transcript: Transcript) -> str:
+    body = session.get(TranscriptBody, transcript.id)
+    return _read_body(body) if body else ""
+
+
+def load_text_cached(session: Session, transcript: Transcript) -> str:
+    """``load_text`` through a small LRU cache, for range reads that slice the same transcript repeatedly"""
+    global _texts_chars
+    # created_at tells a transcript apart from a later one that reuses a deleted row's id
+    size = session.exec(select(TranscriptBody.size).where(TranscriptBody.transcript_id == transcript.id)).first()
+    key = (transcript.id, transcript.created_at, size or 0)
+    with _texts_lock:
+        text = _texts.get(key)
+        if text is not None:
+            _texts.move_to_end(key)
+            return text
+    text = load_text(session, transcript)
+    if len(text) <= TEXT_CACHE_MAX_CHARS:
+        with _texts_lock:
+            if key not in _texts:
+                _texts[key] = text
+                _texts_chars += len(text)
+            while _texts_chars > TEXT_CACHE_MAX_CHARS:
+                _, evicted = _texts.popitem(last=False)
+                _texts_chars -= len(evicted)
+    return text
+
+
+def load_texts(session: Session, transcript_ids: Iterable[int]) -> Dict[int, str]:
+    """Load several transcript bodies in one query, keyed by transcript id"""
+    ids = list(transcript_ids)
+    if not ids:
+        return {}
+    bodies = session.exec(select(TranscriptBody).where(TranscriptBody.transcript_id.in_(ids))).all()
+    return {body.transcript_id: _read_body(body) for body in bodies}
+
+
+def _read_body(body: TranscriptBody) -> str:
+    if body.data is not None:
+        return decompress(body.codec, body.data)
+    if body.segment is None:
+        return ""
+    return decompress(body.codec, read_segment(body.segment, body.offset, body.length))
+
+
+def segment_dir() -> str:
+    return get_settings().transcript_segment_dir
+
+
+def read_segment(name: str, offset: int, length: int) -> bytes:
+    """Read a slice of a cold segment file through a cached mmap"""
+    path = os.path.join(segment_dir(), name)
+    with _maps_lock:
+        mapped = _maps.get(path)
+        if mapped is None or offset + length > len(mapped):
+            # Segment grew since it was mapped (or was never mapped): remap it
+            if mapped is not None:
+                mapped.close()
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            _maps[path] = mapped
+        return mapped[offset:offset + length]
+
+
+def _active_segment(directory: str) -> str:
+    names = sorted(n for n in os.listdir(directory) if n.startswith("segment-") and n.endswith(".seg"))
+    if names and os.path.getsize(os.path.join(directory, names[-1])) < SEGMENT_MAX_BYTES:
+        return names[-1]
+    return f"segment-{len(names):05d}.seg"
+
+
+def offload_cold_transcripts(session: Session, older_than_days: int, batch_size: int = 500) -> int:
+    """Move compressed bodies older than ``older_than_days`` into segment files.
+
+    Bytes are appended and fsynced before the rows are repointed, so a crash
+    leaves at worst unreferenced bytes in a segment. Only one offloader
+    should run at a time.
+    """
+    directory = segment_dir()
+    os.makedirs(directory, exist_ok=True)
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    moved = 0
+
+    while True:
+        bodies = session.exec(
+            select(TranscriptBody)
+            .join(Transcript, Transcript.id == TranscriptBody.transcript_id)
+            .where(Transcript.created_at < cutoff, TranscriptBody.data.is_not(None))
+            .limit(batch_size)
+        ).all()
+        if not bodies:
+            return moved
+
+        name = _active_segment(directory)
+        with open(os.path.join(directory, name), "ab") as f:
+            for body in bodies:
+                offset = f.tell()
+                f.write(body.data)
+                body.segment, body.offset, body.length = name, offset, len(body.data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        for body in bodies:
+            body.data = None
+            session.add(body)
+        session.commit()
+        moved += len(bodies)
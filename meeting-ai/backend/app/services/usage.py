@@ -0,0 +1,200 @@
+"""Ledger of provider calls: tokens, audio seconds, latency, retries and cache hits.
+
+``MeteredProvider`` wraps every provider returned by ``get_provider`` and
+opens a ``provider_call`` around each method. Providers add what the
+upstream response reports (model, token counts, audio seconds, retries)
+with ``note_usage``. Which meeting and which caller (api, batch, live) the
+call belongs to comes from ``usage_scope``, a context variable set by the
+route or job, so provider signatures stay unchanged.
+
+Rows go to an in-memory buffer. A background task writes them with one
+``executemany`` every ``USAGE_FLUSH_INTERVAL_SEC``, so recording a call
+never waits on the database. If the database falls behind, the buffer is
+capped at ``USAGE_MAX_BUFFER`` rows and the oldest are dropped.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.deps import get_settings
+from app.services.profiling import span
+
+logger = logging.getLogger("uvicorn.error")
+
+_scope: ContextVar[Dict[str, Any]] = ContextVar("usage_scope", default={})
+_call: ContextVar[Optional[Dict[str, Any]]] = ContextVar("usage_call", default=None)
+
+# A buffer this long is written straight away instead of at the next interval
+FLUSH_ROWS = 500
+# Fields a provider may report for the call in progress
+USAGE_FIELDS = ("model", "prompt_tokens", "completion_tokens", "total_tokens", "audio_seconds", "retries")
+
+
+@contextmanager
+def usage_scope(**fields: Any) -> Iterator[None]:
+    """Attribute provider calls made inside the block to a ``meeting_id`` and/or ``source``.
+
+    Scopes nest; inner values override outer ones. Tasks started inside the
+    block inherit the scope.
+    """
+    token = _scope.set({**_scope.get(), **fields})
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def note_usage(**fields: Any) -> None:
+    """Report usage for the provider call in progress; a no-op outside a metered call.
+
+    Token and retry counts add up when a provider calls upstream more than
+    once, e.g. when it falls back to another model.
+    """
+    call = _call.get()
+    if call is None:
+        return
+    for name, value in fields.items():
+        if name not in USAGE_FIELDS:
+            raise ValueError(f"Unknown usage field: {name}")
+        if value is None:
+            continue
+        if name == "model":
+            call[name] = value
+        else:
+            call[name] = (call.get(name) or 0) + value
+
+
+@contextmanager
+def provider_call(operation: str, provider: str) -> Iterator[None]:
+    """Time one provider call and add it to the ledger, whether it succeeds, fails, times out or is cancelled"""
+    call: Dict[str, Any] = {}
+    token = _call.set(call)
+    started = time.perf_counter()
+    status, error = "ok", None
+    try:
+        with span("provider", f"{provider}.{operation}"):
+            yield
+    except asyncio.CancelledError:
+        status = "cancelled"
+        raise
+    except asyncio.TimeoutError:
+        status, error = "timeout", "Deadline exceeded"
+        raise
+    except Exception as e:
+        status, error = "error", str(e)[:300]
+        raise
+    finally:
+        _call.reset(token)
+        if call.get("total_tokens") is None and (call.get("prompt_tokens") or call.get("completion_tokens")):
+            call["total_tokens"] = (call.get("prompt_tokens") or 0) + (call.get("completion_tokens") or 0)
+        ledger.record(
+            operation=operation,
+            provider=provider,
+            status=status,
+            error=error,
+            latency_ms=round((time.perf_counter() - started) * 1000, 3),
+            **call,
+        )
+
+
+def record_cache_hit(operation: str, meeting_id: Optional[int] = None, source: str = "api") -> None:
+    """A request answered from a coalesced call or the idempotency cache, without its own provider call"""
+    ledger.record(operation=operation, provider="cache", status="cached", cache_hit=True, latency_ms=0.0,
+                  meeting_id=meeting_id, source=source)
+
+
+class UsageLedger:
+    """Buffers ledger rows and writes them in batches from a background task"""
+
+    def __init__(self) -> None:
+        self._buffer: List[Dict[str, Any]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self.dropped = 0
+
+    def record(self, **row: Any) -> None:
+        settings = get_settings()
+        if not settings.usage_ledger:
+            return
+        row = {
+            "created_at": datetime.utcnow(),
+            "meeting_id": None,
+            "source": None,
+            "model": None,
+            "prompt_tokens": None,
+            "completion_tokens": None,
+            "total_tokens": None,
+            "audio_seconds": None,
+            "retries": 0,
+            "cache_hit": False,
+            "error": None,
+            **_scope.get(),
+            **row,
+        }
+        self._buffer.append(row)
+        if len(self._buffer) > settings.usage_max_buffer:
+            overflow = len(self._buffer) - settings.usage_max_buffer
+            del self._buffer[:overflow]
+            self.dropped += overflow
+            logger.warning("Usage ledger buffer full; dropped %d rows", overflow)
+        self._ensure_writer()
+        if self._wake is not None and len(self._buffer) >= FLUSH_ROWS:
+            self._wake.set()
+
+    def _ensure_writer(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no event loop (a script); rows wait for flush()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._wake = asyncio.Event()
+            self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        from starlette.concurrency import run_in_threadpool
+
+        interval = get_settings().usage_flush_interval_sec
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if self._buffer:
+                await run_in_threadpool(self.flush)
+
+    def flush(self) -> int:
+        """Write buffered rows now; returns how many were written"""
+        rows, self._buffer = self._buffer, []
+        if not rows:
+            return 0
+        from app.db import get_engine
+        from app.models import ProviderUsage
+
+        try:
+            with get_engine().begin() as conn:
+                conn.execute(ProviderUsage.__table__.insert(), rows)
+        except Exception as e:
+            # The ledger is best effort; losing rows must not fail or slow requests
+            logger.warning("Could not write %d usage rows: %s", len(rows), e)
+            return 0
+        return len(rows)
+
+    async def stop(self) -> None:
+        """Stop the writer and flush what is left (application shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        self.flush()
+
+
+ledger = UsageLedger()
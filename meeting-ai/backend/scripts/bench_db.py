@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Measure SQLite read/write throughput with several worker processes sharing one database
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def worker(db_url, duration, write_ratio, seed, results):
+    # Each process configures its own engine, exactly like a uvicorn worker
+    os.environ["DB_URL"] = db_url
+    os.environ["DEBUG"] = "false"
+    from sqlalchemy.exc import OperationalError
+    from sqlmodel import Session, select, func
+    from app.db import engine
+    from app.models import Meeting, ActionItem
+
+    rng = random.Random(seed)
+    reads = writes = errors = 0
+    deadline = time.perf_counter() + duration
+    with Session(engine) as session:
+        max_id = session.exec(select(func.max(Meeting.id))).one()
+    while time.perf_counter() < deadline:
+        meeting_id = rng.randint(1, max_id)
+        try:
+            with Session(engine) as session:
+                if rng.random() < write_ratio:
+                    session.add(ActionItem(meeting_id=meeting_id, text="Benchmark action", assignee="Bench"))
+                    session.commit()
+                    writes += 1
+                else:
+                    session.get(Meeting, meeting_id)
+                    session.exec(
+                        select(func.count()).select_from(ActionItem).where(ActionItem.meeting_id == meeting_id)
+                    ).one()
+                    reads += 1
+        except OperationalError:
+            # "database is locked": the failure mode the pragmas are meant to remove
+            errors += 1
+    results.put((reads, writes, errors))
+
+def prepare(db_url, meetings):
+    os.environ["DB_URL"] = db_url
+    os.environ["DEBUG"] = "false"
+    from sqlmodel import Session
+    from app.db import engine, create_all
+    from app.models import Meeting
+
+    create_all()
+    with Session(engine) as session:
+        session.add_all(Meeting(title=f"Benchmark meeting {i}") for i in range(meetings))
+        session.commit()
+    engine.dispose()
+
+def run(db_url, workers, duration, write_ratio):
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(db_url, duration, write_ratio, i, results)) for i in range(workers)]
+    for p in procs:
+        p.start()
+    totals = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    reads, writes, errors = (sum(t[i] for t in totals) for i in range(3))
+    return reads / duration, writes / duration, errors
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="Worker counts to compare")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per run")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="Share of operations that write")
+    parser.add_argument("--meetings", type=int, default=1000, help="Meetings to seed before measuring")
+    args = parser.parse_args()
+
+    # Pragmas come from the usual SQLITE_* settings, so e.g. SQLITE_JOURNAL_MODE=DELETE gives a baseline
+    print(
+        f"journal_mode={os.getenv('SQLITE_JOURNAL_MODE', 'WAL')} "
+        f"synchronous={os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')} write_ratio={args.write_ratio}"
+    )
+    print(f"{'workers':>8} {'reads/s':>10} {'writes/s':>10} {'locked':>8}")
+    # Settings and the engine are per process, so the database is seeded once and shared by all runs
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        prepare(db_url, args.meetings)
+        for count in args.workers:
+            reads, writes, errors = run(db_url, count, args.duration, args.write_ratio)
+            print(f"{count:>8} {reads:>10.0f} {writes:>10.0f} {errors:>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Export every meeting with its transcript, summary and actions as NDJSON or CSV
+"""
+
+import argparse
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import engine, create_all
+from app.services.export import EXPORT_FORMATS, iter_meeting_records, stream_export
+from datetime import datetime
+from sqlmodel import Session
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    parser.add_argument("--gzip", action="store_true", help="Compress the output with gzip")
+    parser.add_argument("--created-after", type=datetime.fromisoformat)
+    parser.add_argument("--created-before", type=datetime.fromisoformat)
+    parser.add_argument("--batch-size", type=int, default=500, help="Meetings read per partition")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    args = parser.parse_args()
+
+    create_all()
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        with Session(engine) as session:
+            records = iter_meeting_records(session, args.created_after, args.created_before, args.batch_size)
+            for chunk in stream_export(records, args.format, compress=args.gzip):
+                out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+
+if __name__ == "__main__":
+    main()
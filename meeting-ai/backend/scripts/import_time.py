@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Measure cold-start import time of the API and list the slowest modules
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def measure(module, provider):
+    """Import ``module`` in a fresh interpreter; returns (total_us, {module: (self_us, cumulative_us)})"""
+    env = dict(os.environ, PROVIDER=provider, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules.get(module, (0, 0))[1], modules
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="app.main", help="Module to import")
+    parser.add_argument("--provider", default="mock", help="PROVIDER value for the measurement")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to take the median over")
+    parser.add_argument("--top", type=int, default=15, help="Slowest top-level packages to list")
+    parser.add_argument("--budget-ms", type=float, help="Exit non-zero when the median exceeds this")
+    args = parser.parse_args()
+
+    # Discard the first run, which pays for a cold OS file cache
+    measure(args.module, args.provider)
+    totals, modules = [], {}
+    for _ in range(args.runs):
+        total, modules = measure(args.module, args.provider)
+        totals.append(total / 1000)
+    median = statistics.median(totals)
+
+    # Group by top-level package so third-party dependencies show up as one line each
+    packages = {}
+    for name, (self_us, _) in modules.items():
+        root = name.split(".")[0]
+        packages[root] = packages.get(root, 0) + self_us
+
+    print(f"import {args.module} (PROVIDER={args.provider}): median {median:.1f} ms over {args.runs} runs")
+    for root, self_us in sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {root}")
+
+    if args.budget_ms is not None and median > args.budget_ms:
+        print(f"Import time {median:.1f} ms exceeds budget of {args.budget_ms:.1f} ms")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Rebuild the near-duplicate (MinHash LSH) index over all action items
+"""
+
+import argparse
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import engine, create_all
+from app.services.action_index import rebuild_index
+from sqlmodel import Session
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=5000, help="Action items indexed per insert")
+    args = parser.parse_args()
+
+    create_all()
+    started = time.perf_counter()
+    with Session(engine) as session:
+        count = rebuild_index(session, batch_size=args.batch_size)
+    print(f"Indexed {count} action items in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Rebuild the semantic search index over all summaries and action items
+"""
+
+import argparse
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import engine, create_all
+from app.deps import get_settings
+from app.services.semantic_index import rebuild
+from sqlmodel import Session
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dir", default=settings.search_index_dir, help="Index directory")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Documents embedded per write")
+    args = parser.parse_args()
+
+    create_all()
+    started = time.perf_counter()
+    with Session(engine) as session:
+        count = rebuild(session, args.dir, batch_size=args.batch_size)
+    print(f"Indexed {count} documents into {args.dir} in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Move transcript bodies older than TRANSCRIPT_COLD_AFTER_DAYS into the cold tier
+"""
+
+import argparse
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import engine, create_all
+from app.deps import get_settings
+from app.services.transcript_store import offload_cold_transcripts
+from sqlmodel import Session
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--older-than-days",
+        type=int,
+        default=settings.transcript_cold_after_days,
+        help="Offload transcripts created more than this many days ago",
+    )
+    args = parser.parse_args()
+
+    create_all()
+    with Session(engine) as session:
+        moved = offload_cold_transcripts(session, args.older_than_days)
+    print(f"Offloaded {moved} transcripts to {settings.transcript_segment_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Recompute the action item analytics rollups from the action items table
+"""
+
+import argparse
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import engine, create_all
+from app.services.action_rollups import rebuild_rollups
+from sqlmodel import Session
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=20000, help="Action items read per query")
+    args = parser.parse_args()
+
+    create_all()
+    started = time.perf_counter()
+    with Session(engine) as session:
+        count = rebuild_rollups(session, batch_size=args.batch_size)
+    print(f"Counted {count} action items in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
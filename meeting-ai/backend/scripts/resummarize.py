@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Regenerate summaries for many meetings with bounded provider concurrency
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import engine, create_all
+from app.deps import get_provider
+from app.services.batch import BatchJobRunning, create_job, load_job, run_job, select_meeting_ids
+from app.services.usage import ledger
+from datetime import datetime
+from sqlmodel import Session
+
+async def report_progress(job, interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        print(
+            f"[{job.job_id}] {job.completed}/{job.total} done, {job.failed} failed, "
+            f"{job.remaining} remaining ({job.meetings_per_sec:.2f} meetings/s)",
+            flush=True,
+        )
+
+async def main(args):
+    create_all()
+    if args.resume:
+        job = load_job(args.resume)
+        if not job:
+            sys.exit(f"No checkpoint found for job {args.resume}")
+    else:
+        with Session(engine) as session:
+            meeting_ids = select_meeting_ids(
+                session,
+                meeting_ids=args.ids,
+                created_after=args.created_after,
+                created_before=args.created_before,
+                only_missing=args.only_missing,
+            )
+        if not meeting_ids:
+            print("No transcribed meetings match the filter")
+            return
+        job = create_job(meeting_ids, args.concurrency)
+        print(f"Started job {job.job_id} for {job.total} meetings (resume with --resume {job.job_id})")
+
+    reporter = asyncio.create_task(report_progress(job, args.progress_interval))
+    try:
+        await run_job(job, get_provider(), engine)
+    except BatchJobRunning:
+        sys.exit(f"Job {job.job_id} is already running in another process")
+    finally:
+        reporter.cancel()
+        await ledger.stop()
+
+    print(
+        f"Job {job.job_id} {job.status}: {job.completed} done, {job.failed} failed, "
+        f"{job.skipped} skipped in {job.elapsed_sec:.1f}s ({job.meetings_per_sec:.2f} meetings/s)"
+    )
+    for meeting_id, error in job.errors.items():
+        print(f"  meeting {meeting_id}: {error}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ids", type=int, nargs="+", help="Only these meeting ids")
+    parser.add_argument("--created-after", type=datetime.fromisoformat, help="ISO date or datetime")
+    parser.add_argument("--created-before", type=datetime.fromisoformat, help="ISO date or datetime")
+    parser.add_argument("--only-missing", action="store_true", help="Skip meetings that already have a summary")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent provider calls")
+    parser.add_argument("--resume", metavar="JOB_ID", help="Continue a previous job from its checkpoint")
+    parser.add_argument("--progress-interval", type=float, default=10.0, help="Seconds between progress lines")
+    asyncio.run(main(parser.parse_args()))
@@ -1,66 +1,49 @@
 #!/usr/bin/env python3
 """
-Seed script to populate the database with sample data
+Seed the database with sample data, synthetic meetings at volume, or an NDJSON export
 """
 
+import argparse
 import sys
 import os
+import time
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.db import engine, create_all
-from app.models import Meeting, Transcript, Summary, ActionItem
-from sqlmodel import Session
-from datetime import datetime, date
+from app.models import Meeting
+from app.services.action_rollups import ensure_rollups
+from app.services.bulk_load import load_records, read_ndjson
+from app.services.synthetic import generate_meetings
+from datetime import datetime, timedelta
+from sqlmodel import Session, select, func
 
-def seed_database():
-    """Seed the database with sample data"""
-    # Create tables
-    create_all()
-    
-    with Session(engine) as session:
-        # Check if data already exists
-        existing_meetings = session.exec("SELECT COUNT(*) FROM meeting").first()
-        if existing_meetings and existing_meetings[0] > 0:
-            print("Database already seeded. Skipping...")
-            return
-        
-        print("Seeding database with sample data...")
-        
-        # Create sample meeting
-        meeting = Meeting(
-            title="Weekly Team Standup - Q3 Review",
-            created_at=datetime.utcnow()
-        )
-        session.add(meeting)
-        session.commit()
-        session.refresh(meeting)
-        
-        # Create sample transcript
-        transcript = Transcript(
-            meeting_id=meeting.id,
-            text="""
+def sample_meeting() -> dict:
+    """The hand-written demo meeting, as an export-format record"""
+    now = datetime.utcnow()
+    today = now.date()
+    return {
+        "title": "Weekly Team Standup - Q3 Review",
+        "created_at": now,
+        "transcript": {
+            "text": """
             Welcome to our weekly team standup. Today we're reviewing Q3 performance and planning Q4.
-            
+
             John: Q3 sales exceeded targets by 15%. The new marketing campaign was very successful.
             Sarah: Customer satisfaction scores are up to 4.8 out of 5. Great feedback on the new features.
             Mike: Engineering team completed 3 major features on schedule. Security audit is 80% complete.
-            
+
             We discussed the upcoming product launch. Engineering needs to finish testing by next Friday.
             Marketing will start the campaign the following Monday.
-            
+
             Action items: John to prepare Q4 forecast, Sarah to update customer feedback process,
             Engineering team to complete security audit and final testing.
-            
+
             Meeting concluded with reminder about company holiday party next month.
             """,
-            duration_sec=1800  # 30 minutes
-        )
-        session.add(transcript)
-        
-        # Create sample summary
-        summary = Summary(
-            meeting_id=meeting.id,
-            bullets=[
+            "duration_sec": 1800,  # 30 minutes
+        },
+        "summary": {
+            "bullets": [
                 "Q3 sales exceeded targets by 15%",
                 "New marketing campaign was successful",
                 "Customer satisfaction improved to 4.8/5",
@@ -68,59 +51,67 @@ def seed_database():
                 "Security audit 80% complete",
                 "Product launch scheduled for next month"
             ],
-            decisions=[
+            "decisions": [
                 "Engineering team to complete testing by next Friday",
                 "Marketing campaign to start the following Monday",
                 "Q4 forecast preparation assigned to John"
             ],
-            risks=[
+            "risks": [
                 "Security audit completion timeline",
                 "Customer feedback process updates needed"
-            ]
-        )
-        session.add(summary)
-        
-        # Create sample action items
-        actions = [
-            ActionItem(
-                meeting_id=meeting.id,
-                text="Prepare Q4 sales forecast",
-                assignee="John",
-                due_date=date.today().replace(day=date.today().day + 7),
-                status="open"
-            ),
-            ActionItem(
-                meeting_id=meeting.id,
-                text="Update customer feedback process",
-                assignee="Sarah",
-                due_date=date.today().replace(day=date.today().day + 5),
-                status="open"
-            ),
-            ActionItem(
-                meeting_id=meeting.id,
-                text="Complete security audit",
-                assignee="Engineering Team",
-                due_date=date.today().replace(day=date.today().day + 3),
-                status="in_progress"
-            ),
-            ActionItem(
-                meeting_id=meeting.id,
-                text="Finalize product testing",
-                assignee="Engineering Team",
-                due_date=date.today().replace(day=date.today().day + 7),
-                status="open"
-            )
-        ]
-        
-        for action in actions:
-            session.add(action)
-        
-        session.commit()
-        print(f"Created sample meeting: {meeting.title}")
-        print(f"Created transcript with {len(transcript.text)} characters")
-        print(f"Created summary with {len(summary.bullets)} bullet points")
-        print(f"Created {len(actions)} action items")
-        print("Database seeded successfully!")
+            ],
+        },
+        # timedelta rather than date.replace(day=...), which fails late in the month
+        "actions": [
+            {"text": "Prepare Q4 sales forecast", "assignee": "John",
+             "due_date": today + timedelta(days=7), "status": "open", "source": "summary"},
+            {"text": "Update customer feedback process", "assignee": "Sarah",
+             "due_date": today + timedelta(days=5), "status": "open", "source": "summary"},
+            {"text": "Complete security audit", "assignee": "Engineering Team",
+             "due_date": today + timedelta(days=3), "status": "in_progress", "source": "summary"},
+            {"text": "Finalize product testing", "assignee": "Engineering Team",
+             "due_date": today + timedelta(days=7), "status": "open", "source": "summary"},
+        ],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--meetings", type=int, help="Generate this many synthetic meetings")
+    source.add_argument("--import", dest="import_path", help="Load meetings from an NDJSON (or .ndjson.gz) export")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for synthetic meetings")
+    parser.add_argument("--days", type=int, default=365, help="Spread synthetic meetings over this many past days")
+    parser.add_argument("--batch-size", type=int, default=20000, help="Rows buffered before each round of executemany")
+    parser.add_argument("--commit-every", type=int, default=500000, help="Rows per transaction")
+    parser.add_argument("--no-segments", action="store_true", help="Skip building timed transcript segments")
+    parser.add_argument("--force", action="store_true", help="Add the sample meeting even if the database has data")
+    args = parser.parse_args()
+
+    create_all()
+    # Count existing actions first; the loader only adds its own rows to the rollups
+    ensure_rollups()
+    if args.meetings is not None:
+        records = generate_meetings(args.meetings, seed=args.seed, days=args.days)
+    elif args.import_path:
+        records = read_ndjson(args.import_path)
+    else:
+        with Session(engine) as session:
+            if session.exec(select(func.count()).select_from(Meeting)).one() and not args.force:
+                print("Database already seeded. Skipping...")
+                return
+        records = [sample_meeting()]
+
+    print("Seeding database...")
+    started = time.perf_counter()
+    counts = load_records(
+        engine, records,
+        batch_size=args.batch_size, commit_every=args.commit_every, segments=not args.no_segments,
+    )
+    elapsed = time.perf_counter() - started
+    rows = sum(counts.values())
+    for table, count in counts.items():
+        print(f"  {table}: {count}")
+    print(f"Inserted {rows} rows in {elapsed:.1f}s ({rows / elapsed if elapsed else 0:.0f} rows/s)")
 
 if __name__ == "__main__":
-    seed_database()
+    main()
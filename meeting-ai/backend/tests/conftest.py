@@ -0,0 +1,35 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings are read when app.deps is first imported, so the test database and
+# data directories are chosen here, before any test module imports the app
+_data_dir = tempfile.mkdtemp(prefix="meeting-ai-tests-")
+os.environ.update({
+    "DB_URL": f"sqlite:///{os.path.join(_data_dir, 'app.db')}",
+    "PROVIDER": "mock",
+    "DEBUG": "false",
+    "SEARCH_INDEX_DIR": os.path.join(_data_dir, "search_index"),
+    "BATCH_CHECKPOINT_DIR": os.path.join(_data_dir, "batch_jobs"),
+    "TRANSCRIPT_SEGMENT_DIR": os.path.join(_data_dir, "transcript_segments"),
+})
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def session(client):
+    from sqlmodel import Session
+
+    from app.db import get_engine
+
+    with Session(get_engine()) as session:
+        yield session
@@ -0,0 +1,52 @@
+from datetime import date
+
+from app.services.action_extractor import extract_actions
+
+MEETING_DAY = date(2024, 3, 4)  # a Monday
+
+
+def _pairs(text):
+    return [(a.assignee, a.text) for a in extract_actions(text, reference=MEETING_DAY).actions]
+
+
+def test_assigned_actions_with_due_dates():
+    result = extract_actions(
+        "John needs to prepare the Q4 forecast by Friday. Sarah will send the notes tomorrow.",
+        reference=MEETING_DAY,
+    )
+    assert [(a.assignee, a.text, a.due_date) for a in result.actions] == [
+        ("John", "Prepare the Q4 forecast", date(2024, 3, 8)),
+        ("Sarah", "Send the notes", date(2024, 3, 5)),
+    ]
+    assert result.is_confident(0.8)
+
+
+def test_bare_to_is_not_an_assignment():
+    assert _pairs("Going to lunch.") == []
+    assert _pairs("Thanks to everyone for joining. Back to the agenda.") == []
+
+
+def test_filler_words_are_stripped_from_the_assignee():
+    assert _pairs("Please Anna should review the draft.") == [("Anna", "Review the draft")]
+    assert _pairs("So Mark will book the room.") == [("Mark", "Book the room")]
+
+
+def test_days_and_months_are_not_assignees():
+    assert _pairs("Monday will be busy. March should be quieter.") == []
+    assert _pairs("Next Friday will be the launch. Omar will update the docs.") == [("Omar", "Update the docs")]
+
+
+def test_single_item_is_never_confident():
+    result = extract_actions("Please Anna should review the draft.", reference=MEETING_DAY)
+    assert result.confidence == 1.0
+    assert not result.is_confident(0.8)
+
+
+def test_unattributed_cues_lower_confidence():
+    result = extract_actions(
+        "John needs to prepare the forecast. Sarah will send the notes. "
+        "Somebody mentioned we really must fix the build, and it should be soon.",
+        reference=MEETING_DAY,
+    )
+    assert len(result.actions) == 2
+    assert not result.is_confident(0.8)
@@ -0,0 +1,80 @@
+from datetime import date
+
+from sqlmodel import func, select
+
+from app.db import get_engine
+from app.models import ActionCount, ActionDueCount, ActionItem, Meeting
+from app.schemas import ActionItemCreate, SummaryData
+from app.services.action_rollups import NO_DUE_DATE
+from app.services.bulk_load import load_records
+from app.services.summarization import store_summary
+
+
+def _assert_rollups_match(session):
+    """The rollup rows equal a GROUP BY over the live action items"""
+    counts = {
+        (assignee or "", status): n
+        for assignee, status, n in session.exec(
+            select(ActionItem.assignee, ActionItem.status, func.count()).group_by(ActionItem.assignee, ActionItem.status)
+        )
+    }
+    due = {
+        (status, due_date or NO_DUE_DATE): n
+        for status, due_date, n in session.exec(
+            select(ActionItem.status, ActionItem.due_date, func.count()).group_by(ActionItem.status, ActionItem.due_date)
+        )
+    }
+    assert {(r.assignee, r.status): r.count for r in session.exec(select(ActionCount)) if r.count} == counts
+    assert {(r.status, r.due_date): r.count for r in session.exec(select(ActionDueCount)) if r.count} == due
+
+
+def _summary(*actions):
+    return SummaryData(bullets=["Rollup check"], decisions=[], risks=[], actions=list(actions))
+
+
+def test_every_action_write_path_keeps_the_rollups_exact(client, session):
+    meeting_id = client.post("/api/meetings", json={"title": "Rollups"}).json()["id"]
+
+    # Create, update, delete through the API
+    created = client.post(f"/api/meetings/{meeting_id}/actions", json={
+        "text": "Draft the rollup migration guide", "assignee": "Priya", "due_date": "2026-11-02",
+    }).json()
+    _assert_rollups_match(session)
+    client.patch(f"/api/actions/{created['id']}", json={"status": "completed", "assignee": "Omar", "due_date": "2026-11-09"})
+    _assert_rollups_match(session)
+    doomed = client.post(f"/api/meetings/{meeting_id}/actions", json={"text": "Archive the old rollup dashboards"}).json()
+    client.delete(f"/api/actions/{doomed['id']}")
+    _assert_rollups_match(session)
+
+    # Seeding from a summary, then replacing it
+    store_summary(session, meeting_id, _summary(
+        ActionItemCreate(text="Benchmark the rollup refresh job", assignee="Lena", due_date=date(2026, 12, 1)),
+        ActionItemCreate(text="Email finance the quarterly rollup numbers"),
+    ))
+    session.commit()
+    _assert_rollups_match(session)
+    store_summary(session, meeting_id, _summary(
+        ActionItemCreate(text="Retire the nightly rollup cron", assignee="Lena", status="in_progress"),
+    ), replace=True)
+    session.commit()
+    seeded = session.exec(select(ActionItem.text).where(ActionItem.meeting_id == meeting_id, ActionItem.source == "summary"))
+    assert seeded.all() == ["Retire the nightly rollup cron"]
+    _assert_rollups_match(session)
+
+    # Bulk loading
+    loaded = load_records(get_engine(), [{
+        "title": "Imported rollups",
+        "created_at": "2026-10-01T09:00:00",
+        "actions": [
+            {"text": "Reconcile imported rollup totals", "assignee": "Priya", "status": "open", "due_date": "2026-10-20"},
+            {"text": "Close out the import checklist", "status": "completed"},
+        ],
+    }])
+    assert loaded["actionitem"] == 2
+    _assert_rollups_match(session)
+
+    # Deleting the meetings takes their items out of the rollups
+    imported_id = session.exec(select(Meeting.id).where(Meeting.title == "Imported rollups")).one()
+    assert client.delete(f"/api/meetings/{imported_id}").status_code == 200
+    assert client.delete(f"/api/meetings/{meeting_id}").status_code == 200
+    _assert_rollups_match(session)
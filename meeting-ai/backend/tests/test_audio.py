@@ -0,0 +1,135 @@
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from app.deps import get_provider, get_settings
+from app.main import app
+from app.models import Meeting
+from app.schemas import SegmentData, TranscriptionResult
+from app.services.audio import TARGET_SAMPLE_RATE, decode_wav, prepare_audio
+
+
+def _wav(samples, rate, width=2):
+    """``samples`` in [-1, 1], shaped (frames,) or (frames, channels)"""
+    samples = np.asarray(samples, dtype=np.float64)
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    if width == 1:
+        raw = (samples * 127 + 128).astype(np.uint8).tobytes()
+    elif width == 2:
+        raw = (samples * 32767).astype("<i2").tobytes()
+    else:
+        ints = (samples * 8388607).astype("<i4").ravel()
+        raw = np.stack([ints & 0xFF, (ints >> 8) & 0xFF, (ints >> 16) & 0xFF], axis=1).astype(np.uint8).tobytes()
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wav:
+        wav.setnchannels(samples.shape[1])
+        wav.setsampwidth(width)
+        wav.setframerate(rate)
+        wav.writeframes(raw)
+    return buf.getvalue()
+
+
+def _speech(seconds, rate):
+    t = np.arange(int(seconds * rate)) / rate
+    return 0.5 * np.sin(2 * np.pi * 220 * t)
+
+
+def _silence(seconds, rate):
+    return np.zeros(int(seconds * rate))
+
+
+def test_a_stereo_recording_is_downmixed_resampled_and_trimmed():
+    rate = 44100
+    mono = np.concatenate([_speech(1, rate), _silence(3, rate), _speech(1, rate)])
+    content = _wav(np.stack([mono, mono], axis=1), rate)
+
+    prepared = prepare_audio(content, "standup.WAV", "audio/x-wav")
+
+    assert prepared.processed
+    assert (prepared.filename, prepared.content_type, prepared.original_bytes) == (
+        "standup.wav", "audio/wav", len(content),
+    )
+    samples, sample_rate = decode_wav(prepared.data)
+    assert (sample_rate, samples.shape[1]) == (TARGET_SAMPLE_RATE, 1)
+    assert prepared.duration_sec == pytest.approx(5)
+    # Most of the 3 s pause is cut; both speech runs survive
+    assert 2 < prepared.processed_sec < 3
+    assert len(prepared.data) < len(content) / 4
+    # Half a second before the end is half a second before the end of the original too
+    assert len(prepared.time_map) == 2
+    assert prepared.to_original_time(prepared.processed_sec - 0.5) == pytest.approx(4.5, abs=0.05)
+    assert prepared.to_original_time(0.5) == pytest.approx(0.5)
+
+
+def test_a_recording_without_pauses_is_not_trimmed():
+    content = _wav(_speech(2, TARGET_SAMPLE_RATE), TARGET_SAMPLE_RATE)
+    prepared = prepare_audio(content, "tone.wav", "audio/wav")
+    assert prepared.processed_sec == pytest.approx(2)
+    assert prepared.time_map == []
+    assert prepared.to_original_time(1.25) == 1.25
+
+
+@pytest.mark.parametrize("content", [
+    b"\x1aE\xdf\xa3" + b"\x00" * 100,  # webm
+    b"RIFF\x24\x00\x00\x00WAVEfmt garbage",  # truncated header
+])
+def test_other_or_broken_uploads_pass_through(content):
+    prepared = prepare_audio(content, "call.webm", "audio/webm")
+    assert not prepared.processed
+    assert (prepared.data, prepared.filename, prepared.content_type) == (content, "call.webm", "audio/webm")
+
+
+@pytest.mark.parametrize("width", [1, 2, 3])
+def test_pcm_sample_widths_decode_to_the_same_signal(width):
+    signal = _speech(0.1, 8000)
+    samples, rate = decode_wav(_wav(signal, 8000, width=width))
+    assert rate == 8000
+    assert np.abs(samples[:, 0] - signal).max() < 0.02
+
+
+class _TimedProvider:
+    """Reports one segment per second of the audio it is sent"""
+
+    def __init__(self):
+        self.received = None
+
+    def get_provider_name(self):
+        return "timed"
+
+    async def transcribe_audio(self, audio):
+        self.received = await audio.read()
+        samples, rate = decode_wav(self.received)
+        seconds = int(samples.shape[0] / rate)
+        return TranscriptionResult(
+            text=" ".join(f"second {n}." for n in range(seconds)),
+            segments=[SegmentData(start=n, end=n + 1, text=f"second {n}.") for n in range(seconds)],
+        )
+
+
+def test_an_upload_is_trimmed_and_its_timings_map_onto_the_recording(client, session, monkeypatch):
+    monkeypatch.setattr(get_settings(), "audio_preprocess", True)
+    provider = _TimedProvider()
+    app.dependency_overrides[get_provider] = lambda: provider
+    meeting = Meeting(title="Trimmed upload")
+    session.add(meeting)
+    session.commit()
+    rate = 16000
+    content = _wav(np.concatenate([_speech(1.5, rate), _silence(4, rate), _speech(1.5, rate)]), rate)
+
+    try:
+        response = client.post(
+            "/api/transcribe", params={"meeting_id": meeting.id},
+            files={"audio": ("call.wav", content, "audio/wav")},
+        )
+    finally:
+        app.dependency_overrides.pop(get_provider, None)
+
+    assert response.status_code == 200
+    assert response.json()["duration_sec"] == 7
+    assert len(provider.received) < len(content) * 0.6
+    segments = client.get(f"/api/meetings/{meeting.id}/transcript/segments").json()["segments"]
+    # The provider's second 2 falls in the second speech run, after the cut pause
+    assert segments[-1]["start_sec"] > 5
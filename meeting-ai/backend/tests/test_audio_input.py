@@ -0,0 +1,68 @@
+import asyncio
+import hashlib
+import io
+import os
+
+from app.providers.audio_input import AudioInput
+
+AUDIO = bytes(range(256)) * 1000  # 256 kB
+
+
+def test_small_audio_stays_in_memory_and_large_audio_spills_to_disk():
+    small = AudioInput.from_bytes(AUDIO, "call.webm", "audio/webm", spool_max_bytes=len(AUDIO) + 1)
+    large = AudioInput.from_bytes(AUDIO, "call.webm", "audio/webm", spool_max_bytes=1024)
+    try:
+        assert not small.file._rolled and large.file._rolled
+        assert small.size == large.size == len(AUDIO)
+        assert asyncio.run(large.read()) == AUDIO
+    finally:
+        small.close()
+        large.close()
+
+
+def test_a_copy_is_hashed_and_outlives_the_source():
+    source = io.BytesIO(AUDIO)
+    source.read(10)  # copied from the start whatever the position
+    audio = asyncio.run(AudioInput.from_file(source, "../uploads/call.m4a", "", spool_max_bytes=1024))
+    source.close()
+    try:
+        assert audio.sha256 == hashlib.sha256(AUDIO).hexdigest()
+        assert (audio.filename, audio.content_type, audio.size) == ("call.m4a", "application/octet-stream", len(AUDIO))
+        assert asyncio.run(audio.read()) == AUDIO
+    finally:
+        audio.close()
+
+
+def test_peek_and_chunks_leave_the_stream_usable():
+    audio = AudioInput.from_bytes(AUDIO, "call.wav", "audio/wav")
+
+    async def scenario():
+        assert audio.peek(4) == AUDIO[:4]
+        chunks = [chunk async for chunk in audio.chunks(100_000)]
+        assert [len(chunk) for chunk in chunks] == [100_000, 100_000, 56_000]
+        return b"".join(chunks), await audio.read()
+
+    streamed, read = asyncio.run(scenario())
+    assert streamed == read == AUDIO
+    audio.close()
+
+
+def test_as_path_copies_a_buffer_and_reuses_a_file(tmp_path):
+    async def path_of(audio):
+        async with audio.as_path() as path:
+            with open(path, "rb") as f:
+                return path, f.read()
+
+    spooled = AudioInput.from_bytes(AUDIO, "call.mp3", "audio/mpeg")
+    path, content = asyncio.run(path_of(spooled))
+    assert content == AUDIO and path.endswith(".mp3")
+    assert not os.path.exists(path)  # the temporary copy is removed
+    spooled.close()
+
+    on_disk = tmp_path / "call.wav"
+    on_disk.write_bytes(AUDIO)
+    audio = AudioInput.from_path(str(on_disk), "audio/wav")
+    path, content = asyncio.run(path_of(audio))
+    audio.close()
+    assert (path, content) == (str(on_disk), AUDIO)
+    assert on_disk.exists()
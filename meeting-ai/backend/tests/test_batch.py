@@ -0,0 +1,85 @@
+import json
+import os
+import threading
+import time
+
+from app.models import Meeting
+from app.services import batch
+from app.services.batch import create_job, load_job
+from app.services.transcript_store import save_transcript
+
+
+def _lease(job_id, heartbeat_age):
+    now = time.time()
+    with open(batch._lease_path(job_id), "w", encoding="utf-8") as f:
+        json.dump({"owner": "other-host:1:x", "started_at": now - 60, "heartbeat": now - heartbeat_age,
+                   "resumed_from": 0}, f)
+
+
+def test_job_running_in_another_process_is_reported_and_not_restarted(client):
+    job = create_job([101, 102], concurrency=1)
+    _lease(job.job_id, heartbeat_age=1)
+
+    r = client.get(f"/api/summarize/batch/{job.job_id}")
+    assert r.json()["status"] == "running"
+    assert r.json()["elapsed_sec"] >= 60
+    assert client.post(f"/api/summarize/batch/{job.job_id}/resume").status_code == 409
+
+
+def test_job_with_a_stale_lease_can_be_resumed():
+    job = create_job([101, 102], concurrency=1)
+    _lease(job.job_id, heartbeat_age=batch.LEASE_TIMEOUT_SEC + 1)
+    assert load_job(job.job_id).status == "pending"
+
+
+def test_finished_job_releases_its_lease(client, session):
+    meeting = Meeting(title="Batch")
+    session.add(meeting)
+    session.flush()
+    save_transcript(session, meeting.id, "Anna will send the notes tomorrow. Ben should book the room.")
+    session.commit()
+
+    r = client.post("/api/summarize/batch", json={"meeting_ids": [meeting.id], "concurrency": 1})
+    assert r.status_code == 202
+    job_id = r.json()["job_id"]
+    for _ in range(100):
+        status = client.get(f"/api/summarize/batch/{job_id}").json()
+        if status["status"] != "running":
+            break
+        time.sleep(0.05)
+    assert status["status"] == "completed"
+    assert batch.read_lease(job_id) is None
+    assert load_job(job_id).status == "completed"
+
+
+def test_concurrent_starts_leave_exactly_one_owner():
+    job = create_job([101, 102], concurrency=1)
+    _lease(job.job_id, heartbeat_age=batch.LEASE_TIMEOUT_SEC + 1)
+    barrier = threading.Barrier(8)
+    owners, refused = [], []
+
+    def start():
+        barrier.wait()
+        try:
+            owners.append(batch.acquire_lease(job))
+        except batch.BatchJobRunning:
+            refused.append(True)
+
+    threads = [threading.Thread(target=start) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(owners) == 1 and len(refused) == 7
+    assert batch.read_lease(job.job_id)["owner"] == owners[0]
+    # Only the winner's lease files are left behind
+    leftovers = [name for name in os.listdir(os.path.dirname(batch._lease_path(job.job_id))) if job.job_id in name]
+    assert sorted(leftovers) == sorted([f"{job.job_id}.json", f"{job.job_id}.lease"])
+
+
+def test_a_job_whose_lease_was_taken_over_does_not_remove_the_new_lease():
+    job = create_job([101], concurrency=1)
+    owner = batch.acquire_lease(job)
+    _lease(job.job_id, heartbeat_age=0)  # another process took the job over
+    batch._release_lease(job.job_id, owner)
+    assert batch.read_lease(job.job_id)["owner"] == "other-host:1:x"
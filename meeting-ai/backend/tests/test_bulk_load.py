@@ -0,0 +1,92 @@
+import gzip
+import json
+
+import pytest
+from sqlmodel import func, select
+
+from app.db import get_engine
+from app.models import ActionCount, ActionItem, Meeting, Summary, Transcript, TranscriptSegment
+from app.services.action_index import find_similar
+from app.services.bulk_load import load_records, read_ndjson
+from app.services.export import iter_meeting_records, stream_export
+from app.services.transcript_store import load_text
+
+
+def _record(n, actions=()):
+    return {
+        "title": f"Bulk {n}",
+        "created_at": "2002-03-04T05:06:07",
+        "transcript": {"text": f"Meeting {n}. " + "We went through the backlog. " * 40, "duration_sec": 600},
+        "summary": {"bullets": [f"Point {n}"], "decisions": [], "risks": ["Slipping"]},
+        "actions": list(actions),
+    }
+
+
+def _meeting_ids(session, title_prefix):
+    return session.exec(
+        select(Meeting.id).where(Meeting.title.startswith(title_prefix)).order_by(Meeting.id)
+    ).all()
+
+
+def test_records_are_loaded_with_their_children_in_small_batches(session):
+    records = [
+        _record("batch 0", [{"text": "Renew the bulk import service certificate", "assignee": "Bulk Owner",
+                             "due_date": "2002-03-10", "status": "open"}]),
+        _record("batch 1"),
+        {"title": "Bulk batch bare"},
+    ]
+    counts = load_records(get_engine(), records, batch_size=5, commit_every=10)
+
+    assert (counts["meeting"], counts["transcript"], counts["summary"], counts["actionitem"]) == (3, 2, 2, 1)
+    ids = _meeting_ids(session, "Bulk batch")
+    assert len(ids) == 3
+
+    transcript = session.exec(select(Transcript).where(Transcript.meeting_id == ids[0])).one()
+    assert load_text(session, transcript) == records[0]["transcript"]["text"]
+    segments = session.exec(
+        select(func.count()).select_from(TranscriptSegment).where(TranscriptSegment.transcript_id == transcript.id)
+    ).one()
+    assert segments == counts["transcriptsegment"] // 2 > 1
+    assert session.exec(select(Summary).where(Summary.meeting_id == ids[1])).one().risks == ["Slipping"]
+
+    [action] = session.exec(select(ActionItem).where(ActionItem.meeting_id == ids[0])).all()
+    assert (action.assignee, action.due_date.isoformat(), action.source) == ("Bulk Owner", "2002-03-10", "manual")
+    # Indexed for later merging, and counted in the analytics rollups
+    assert [item.id for item, _ in find_similar(session, "Renew the bulk import service certificate")] == [action.id]
+    assert session.get(ActionCount, ("Bulk Owner", "open")).count == 1
+
+
+def test_a_failed_load_leaves_nothing_behind(session):
+    records = [_record("fails 0"), {"summary": {"bullets": []}}]  # the second has no title
+    with pytest.raises(KeyError):
+        load_records(get_engine(), records)
+    assert _meeting_ids(session, "Bulk fails") == []
+
+
+def test_an_export_loads_back(client, session, tmp_path):
+    load_records(get_engine(), [_record("round trip", [{"text": "Archive the round trip notes"}])])
+    [source_id] = _meeting_ids(session, "Bulk round trip")
+    exported = [r for r in iter_meeting_records(session) if r["id"] == source_id]
+    path = tmp_path / "meetings.ndjson.gz"
+    path.write_bytes(b"".join(stream_export(iter(exported), compress=True)))
+
+    assert load_records(get_engine(), read_ndjson(str(path)))["meeting"] == 1
+    [_, copy_id] = _meeting_ids(session, "Bulk round trip")
+    [copy] = [r for r in iter_meeting_records(session) if r["id"] == copy_id]
+    [original] = exported
+    for key in ("transcript", "summary", "created_at"):
+        assert copy[key] == original[key]
+    assert [a["text"] for a in copy["actions"]] == ["Archive the round trip notes"]
+
+
+def test_ndjson_blank_lines_are_skipped_and_bad_lines_reported(tmp_path):
+    path = tmp_path / "records.ndjson"
+    path.write_text(json.dumps({"title": "a"}) + "\n\n" + json.dumps({"title": "b"}) + "\n{not json\n")
+    records = read_ndjson(str(path))
+    assert [next(records)["title"], next(records)["title"]] == ["a", "b"]
+    with pytest.raises(ValueError, match=r"records.ndjson:4: invalid JSON"):
+        next(records)
+
+    packed = tmp_path / "records.ndjson.gz"
+    packed.write_bytes(gzip.compress(b'{"title": "c"}\n'))
+    assert list(read_ndjson(str(packed))) == [{"title": "c"}]
@@ -0,0 +1,160 @@
+import asyncio
+import json
+
+from sqlmodel import select
+
+from app.deps import get_settings
+from app.models import Meeting, Summary
+from app.schemas import SummaryData
+from app.services.changes import ChangeFeed, compact, record_meeting
+from app.services.summarization import store_summary
+
+
+def _summary(bullet):
+    return SummaryData(bullets=[bullet], decisions=[], risks=[], actions=[])
+
+
+def test_replacing_a_summary_reports_the_old_one_deleted(client, session):
+    meeting, other = Meeting(title="Replaced summary"), Meeting(title="Summarized later")
+    session.add_all([meeting, other])
+    session.commit()
+    old_id = store_summary(session, meeting.id, _summary("First take")).id
+    # A later summary keeps SQLite from handing the replaced summary's id to the new one
+    store_summary(session, other.id, _summary("Unrelated"))
+    session.commit()
+    since = client.get("/api/changes", params={"timeout": 0}).json()["seq"]
+
+    new = store_summary(session, meeting.id, _summary("Second take"), replace=True)
+    session.commit()
+    assert session.exec(select(Summary.id).where(Summary.meeting_id == meeting.id)).all() == [new.id]
+
+    r = client.get("/api/changes", params={"since": since, "timeout": 5})
+    summaries = {(c["id"], c["op"]) for c in r.json()["changes"] if c["entity"] == "summary"}
+    assert summaries == {(old_id, "delete"), (new.id, "upsert")}
+
+
+def _add_meeting(session, title):
+    meeting = Meeting(title=title)
+    session.add(meeting)
+    session.flush()
+    record_meeting(session, meeting)
+    session.commit()
+    return meeting.id
+
+
+def _event(seq, entity, entity_id, op="upsert", meeting_id=None):
+    return {"seq": seq, "entity": entity, "id": entity_id, "meeting_id": meeting_id, "op": op, "data": None, "at": ""}
+
+
+def test_compact_keeps_the_last_event_per_entity_and_drops_children_of_deleted_meetings():
+    events = [
+        _event(1, "meeting", 1, meeting_id=1),
+        _event(2, "action", 7, meeting_id=1),
+        _event(3, "action", 8, meeting_id=2),
+        _event(4, "action", 8, "delete", meeting_id=2),
+        _event(5, "meeting", 1, "delete", meeting_id=1),
+    ]
+    assert [(e["seq"], e["entity"], e["op"]) for e in compact(events)] == [
+        (4, "action", "delete"),
+        (5, "meeting", "delete"),
+    ]
+
+
+def test_wait_answers_when_a_change_arrives(client, session):
+    async def scenario():
+        feed = ChangeFeed()
+        try:
+            start = (await feed.read(None, 1)).seq
+            idle = await feed.wait(start, 100, 0.05)
+            assert (idle.seq, idle.changes, idle.reset) == (start, [], False)
+
+            waiter = asyncio.ensure_future(feed.wait(start, 100, 5))
+            await asyncio.sleep(0.05)
+            meeting_id = _add_meeting(session, "Waited for")
+            feed.notify()
+            batch = await waiter
+            assert [(c["entity"], c["id"]) for c in batch.changes] == [("meeting", meeting_id)]
+            assert batch.seq > start
+        finally:
+            await feed.stop()
+
+    asyncio.run(scenario())
+
+
+def test_a_seq_older_than_the_retained_log_is_a_reset(client, session):
+    async def scenario():
+        feed = ChangeFeed()
+        try:
+            _add_meeting(session, "Pruned away")
+            latest = (await feed.read(None, 1)).seq
+            feed._oldest = latest + 1  # as if everything up to latest had been pruned
+            assert (await feed.read(latest - 1, 100)).reset
+        finally:
+            await feed.stop()
+
+    asyncio.run(scenario())
+
+
+def test_a_seq_from_a_worker_further_ahead_is_not_a_reset(client, session, monkeypatch):
+    # The lagging feed only learns about new events when it is poked
+    monkeypatch.setattr(get_settings(), "change_poll_sec", 60)
+
+    async def scenario():
+        ahead, behind = ChangeFeed(), ChangeFeed()
+        try:
+            start = (await ahead.read(None, 1)).seq
+            await behind.read(None, 1)
+            _add_meeting(session, "Seen by one worker")
+            ahead.notify()
+            seen = await ahead.wait(start, 100, 5)
+            assert seen.changes
+
+            meeting_id = _add_meeting(session, "Also missed by the lagging worker")
+
+            # The client got seen.seq from one worker and now polls the other
+            batch = await behind.read(seen.seq, 100)
+            assert not batch.reset
+            assert [(c["entity"], c["id"]) for c in batch.changes] == [("meeting", meeting_id)]
+            caught_up = await behind.read(batch.seq, 100)
+            assert (caught_up.seq, caught_up.changes, caught_up.reset) == (batch.seq, [], False)
+
+            # A seq beyond anything stored comes from another database
+            assert (await behind.read(batch.seq + 1000, 100)).reset
+        finally:
+            await ahead.stop()
+            await behind.stop()
+
+    asyncio.run(scenario())
+
+
+class _Request:
+    async def is_disconnected(self):
+        return False
+
+
+def test_the_stream_sends_changes_as_server_sent_events(client, session, monkeypatch):
+    from app.routers import changes as changes_router
+
+    async def scenario():
+        feed = ChangeFeed()
+        monkeypatch.setattr(changes_router, "changes", feed)
+        try:
+            start = (await feed.read(None, 1)).seq
+            response = await changes_router.stream_changes(_Request(), since=start, last_event_id=None)
+            assert response.media_type == "text/event-stream"
+            body = response.body_iterator
+            assert await anext(body) == "retry: 3000\n\n"
+            meeting_id = _add_meeting(session, "Streamed")
+            feed.notify()
+            message = await anext(body)
+            await body.aclose()
+        finally:
+            await feed.stop()
+        return message
+
+    message = asyncio.run(scenario())
+    lines = message.strip().split("\n")
+    assert lines[1] == "event: change"
+    change = json.loads(lines[2][len("data: "):])
+    assert lines[0] == f"id: {change['seq']}"
+    assert (change["entity"], change["op"], change["data"]["title"]) == ("meeting", "upsert", "Streamed")
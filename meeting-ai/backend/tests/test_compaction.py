@@ -0,0 +1,33 @@
+from app.services.compaction import compact_transcript
+
+
+def _compact(text):
+    return compact_transcript(text).text
+
+
+def test_fillers_and_stutters_are_removed():
+    assert _compact("Um, so the the plan is, you know, to ship it.") == "So the plan is to ship it."
+    assert _compact("We we need to go.") == "We need to go."
+
+
+def test_false_starts_restarted_by_the_next_word_are_removed():
+    assert _compact("I th- think so.") == "I think so."
+    assert _compact("We wa- we want to ship.") == "We want to ship."
+    assert _compact("Re- re- restart it.") == "Restart it."
+
+
+def test_hyphens_that_are_not_false_starts_are_kept():
+    assert _compact("Pre- and post-processing steps.") == "Pre- and post-processing steps."
+    assert _compact("We should follow-\nup next week.") == "We should follow-up next week."
+
+
+def test_meaningful_repeats_are_kept():
+    assert _compact("Order 4 4 4 units.") == "Order 4 4 4 units."
+    assert _compact("Bye bye everyone.") == "Bye bye everyone."
+
+
+def test_budget_keeps_informative_sentences_in_order():
+    text = "Nice weather today. We decided to ship on 2024-05-01. Coffee was good. Anna will own the rollout."
+    result = compact_transcript(text, max_tokens=16)
+    assert result.text == "We decided to ship on 2024-05-01. Anna will own the rollout."
+    assert result.dropped_sentences == 2
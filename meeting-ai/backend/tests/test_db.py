@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import text
+
+from app import db
+
+
+def _pragmas(engine, *names):
+    with engine.connect() as conn:
+        return {name: conn.execute(text(f"PRAGMA {name}")).scalar() for name in names}
+
+
+def test_connections_are_tuned_for_concurrent_workers(client):
+    assert _pragmas(db.get_engine(), "journal_mode", "busy_timeout", "synchronous", "cache_size", "temp_store") == {
+        "journal_mode": "wal",
+        "busy_timeout": 5000,
+        "synchronous": 1,  # NORMAL
+        "cache_size": -32 * 1024,
+        "temp_store": 2,  # MEMORY
+    }
+
+
+def test_pragmas_follow_the_settings(monkeypatch, tmp_path):
+    monkeypatch.setattr(db.settings, "db_url", f"sqlite:///{tmp_path / 'tuned.db'}")
+    monkeypatch.setattr(db.settings, "sqlite_journal_mode", "delete")
+    monkeypatch.setattr(db.settings, "sqlite_synchronous", "full")
+    monkeypatch.setattr(db.settings, "sqlite_busy_timeout_ms", 250)
+    engine = db._create_engine()
+    try:
+        assert _pragmas(engine, "journal_mode", "busy_timeout", "synchronous") == {
+            "journal_mode": "delete", "busy_timeout": 250, "synchronous": 2,
+        }
+        assert engine.pool.size() == db.settings.db_pool_size
+    finally:
+        engine.dispose()
+
+
+def test_an_in_memory_database_keeps_one_connection(monkeypatch):
+    monkeypatch.setattr(db.settings, "db_url", "sqlite://")
+    engine = db._create_engine()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("CREATE TABLE t (x INTEGER)"))
+            conn.execute(text("INSERT INTO t VALUES (1)"))
+            conn.commit()
+        # The table is still there because every checkout gets the same connection
+        assert _pragmas(engine, "journal_mode") == {"journal_mode": "memory"}
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT x FROM t")).scalar() == 1
+    finally:
+        engine.dispose()
+
+
+@pytest.mark.parametrize("setting, value", [("sqlite_journal_mode", "wal2"), ("sqlite_synchronous", "sometimes")])
+def test_an_unsupported_pragma_setting_is_refused(monkeypatch, tmp_path, setting, value):
+    monkeypatch.setattr(db.settings, "db_url", f"sqlite:///{tmp_path / 'refused.db'}")
+    monkeypatch.setattr(db.settings, setting, value)
+    with pytest.raises(RuntimeError, match="Unsupported"):
+        db._create_engine()
+
+
+def test_the_engine_is_created_on_first_use(tmp_path):
+    code = (
+        "import json, app.db as db; created = [db._engine is not None]; "
+        "from app.db import engine; created.append(db._engine is engine); "
+        "created.append(db.get_engine() is engine); print(json.dumps(created))"
+    )
+    env = {**os.environ, "DB_URL": f"sqlite:///{tmp_path / 'lazy.db'}"}
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env)
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == [False, True, True]
+    # Creating the engine does not connect; the file appears with the first connection
+    assert not (tmp_path / "lazy.db").exists()
@@ -0,0 +1,104 @@
+import csv
+import gzip
+import io
+import json
+from datetime import date, datetime
+
+import pytest
+
+from app.models import ActionItem, Meeting, Summary
+from app.services import export
+from app.services.export import iter_meeting_records, stream_export
+from app.services.transcript_store import save_transcript
+
+# The test database is shared, so these meetings are dated where nothing else is
+SINCE, UNTIL = datetime(2001, 1, 1), datetime(2001, 2, 1)
+
+
+@pytest.fixture(scope="module")
+def meetings(client):
+    from sqlmodel import Session
+
+    from app.db import get_engine
+
+    with Session(get_engine()) as session:
+        ids = []
+        for n in range(5):
+            meeting = Meeting(title=f"Export {n}", created_at=datetime(2001, 1, 1 + n))
+            session.add(meeting)
+            session.flush()
+            ids.append(meeting.id)
+        save_transcript(session, ids[0], "We agreed to ship on Friday, \"as is\".", duration_sec=95)
+        session.add(Summary(meeting_id=ids[0], bullets=["Ship Friday"], decisions=["Ship as is"], risks=[]))
+        session.add(ActionItem(meeting_id=ids[0], text="Tag the release", assignee="Ana", due_date=date(2001, 1, 5)))
+        session.add(ActionItem(meeting_id=ids[0], text="Write release notes"))
+        session.add(ActionItem(meeting_id=ids[3], text="Book the retro room", status="done"))
+        session.commit()
+    return ids
+
+
+def _records(session, **kwargs):
+    return list(iter_meeting_records(session, kwargs.pop("since", SINCE), kwargs.pop("until", UNTIL), **kwargs))
+
+
+def test_records_carry_transcript_summary_and_actions_across_partitions(session, meetings):
+    records = _records(session, batch_size=2)
+
+    assert [r["id"] for r in records] == meetings
+    first = records[0]
+    assert first["transcript"]["text"] == "We agreed to ship on Friday, \"as is\"."
+    assert first["transcript"]["duration_sec"] == 95
+    assert (first["summary"]["bullets"], first["summary"]["decisions"]) == (["Ship Friday"], ["Ship as is"])
+    assert [(a["text"], a["assignee"], a["status"]) for a in first["actions"]] == [
+        ("Tag the release", "Ana", "open"), ("Write release notes", None, "open"),
+    ]
+    assert [len(r["actions"]) for r in records] == [2, 0, 0, 1, 0]
+    assert records[1]["transcript"] is None and records[1]["summary"] is None
+
+
+def test_records_are_filtered_by_creation_time(session, meetings):
+    records = _records(session, since=datetime(2001, 1, 2), until=datetime(2001, 1, 4))
+    assert [r["id"] for r in records] == meetings[1:3]
+
+
+def test_ndjson_and_csv_hold_the_same_records(session, meetings):
+    lines = b"".join(stream_export(iter(_records(session)), "ndjson")).decode().splitlines()
+    decoded = [json.loads(line) for line in lines]
+    assert [d["id"] for d in decoded] == meetings
+    assert decoded[0]["actions"][0]["due_date"] == "2001-01-05"
+    assert decoded[0]["created_at"] == "2001-01-01T00:00:00"
+
+    rows = list(csv.DictReader(io.StringIO(b"".join(stream_export(iter(_records(session)), "csv")).decode())))
+    assert [int(row["meeting_id"]) for row in rows] == meetings
+    assert rows[0]["transcript"] == "We agreed to ship on Friday, \"as is\"."
+    assert rows[0]["actions"] == "Tag the release (Ana, 2001-01-05, open)\nWrite release notes (open)"
+    assert rows[1]["duration_sec"] == "" and rows[1]["bullets"] == ""
+
+
+def test_output_is_chunked_and_optionally_gzipped(monkeypatch):
+    monkeypatch.setattr(export, "CHUNK_BYTES", 1024)
+    records = [{"id": n, "text": "x" * 300} for n in range(20)]
+
+    chunks = list(stream_export(iter(records)))
+    assert len(chunks) > 3 and all(len(chunk) < 1024 + 400 for chunk in chunks)
+    compressed = b"".join(stream_export(iter(records), compress=True))
+    assert gzip.decompress(compressed) == b"".join(chunks)
+    assert len(compressed) < len(b"".join(chunks)) / 10
+
+    with pytest.raises(ValueError, match="Unsupported export format"):
+        list(stream_export(iter(records), "xml"))
+
+
+def test_the_export_route_streams_a_download(client, meetings):
+    params = {"created_after": SINCE.isoformat(), "created_before": UNTIL.isoformat()}
+    response = client.get("/api/export", params={**params, "format": "csv", "gzip": "true"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+    assert response.headers["content-disposition"] == 'attachment; filename="meetings_export.csv.gz"'
+    rows = list(csv.reader(io.StringIO(gzip.decompress(response.content).decode())))
+    assert len(rows) == 1 + len(meetings)
+
+    response = client.get("/api/export", params=params)
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert len(response.text.splitlines()) == len(meetings)
+    assert client.get("/api/export", params={"format": "xml"}).status_code == 422
@@ -0,0 +1,13 @@
+import json
+import subprocess
+import sys
+
+# Loaded on first use by the routes and providers that need them, never at startup
+DEFERRED = ["numpy", "openai", "httpx", "app.services.semantic_index", "app.providers.openai_provider",
+            "app.providers.hf_provider", "app.providers.routing"]
+
+
+def test_starting_the_api_does_not_import_heavy_modules():
+    code = f"import json, sys, app.main; print(json.dumps([m for m in {DEFERRED!r} if m in sys.modules]))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
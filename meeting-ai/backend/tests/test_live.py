@@ -0,0 +1,162 @@
+import asyncio
+
+import numpy as np
+import pytest
+from sqlmodel import select
+from starlette.websockets import WebSocketDisconnect
+
+from app.deps import get_provider, get_settings
+from app.main import app
+from app.models import Meeting, Transcript, TranscriptSegment
+from app.schemas import TranscriptionResult
+from app.services import live
+from app.services.audio import FRAME_MS
+from app.services.live import LiveTranscriber, active_meetings
+from app.services.transcript_store import load_text
+
+RATE = 8000
+
+
+class _CountingProvider:
+    """Transcribes window N as "window N"; fails the windows listed in ``fail``"""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.calls = 0
+
+    def get_provider_name(self):
+        return "counting"
+
+    async def transcribe_audio(self, audio):
+        index = self.calls
+        self.calls += 1
+        if index in self.fail:
+            raise RuntimeError("upstream 500")
+        return TranscriptionResult(text=f"window {index}")
+
+
+def _tone(seconds, pause_every=0.9):
+    """A tone with a short pause every ``pause_every`` seconds, where windows are cut"""
+    t = np.arange(int(seconds * RATE)) / RATE
+    samples = np.sin(2 * np.pi * 440 * t) * 8000
+    pause = int(FRAME_MS * RATE / 1000)
+    for at in np.arange(pause_every, seconds, pause_every):
+        samples[int(at * RATE):int(at * RATE) + pause] = 0
+    return samples.astype("<i2").tobytes()
+
+
+@pytest.fixture
+def live_settings(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "live_window_sec", 1.0)
+    monkeypatch.setattr(settings, "live_summary_every_windows", 0)
+    monkeypatch.setattr(settings, "audio_preprocess", False)
+    # As with the defaults, only the end of a window is searched for a cut
+    monkeypatch.setattr(live, "SPLIT_SEARCH_SEC", 0.3)
+    return settings
+
+
+@pytest.fixture
+def provider():
+    provider = _CountingProvider()
+    app.dependency_overrides[get_provider] = lambda: provider
+    yield provider
+    app.dependency_overrides.pop(get_provider, None)
+
+
+def _meeting(session, title):
+    meeting = Meeting(title=title)
+    session.add(meeting)
+    session.commit()
+    return meeting.id
+
+
+def test_a_live_session_reports_windows_and_stores_the_transcript(client, session, live_settings, provider):
+    meeting_id = _meeting(session, "Live session")
+
+    with client.websocket_connect(f"/api/transcribe/live?meeting_id={meeting_id}&sample_rate={RATE}") as ws:
+        ws.send_bytes(_tone(2.5))
+        ws.send_json({"type": "stop"})
+        messages = []
+        while True:
+            message = ws.receive_json()
+            messages.append(message)
+            if message["type"] == "final":
+                break
+
+    partials = [m for m in messages if m["type"] == "partial"]
+    assert [m["text"] for m in partials] == ["window 0", "window 1", "window 2"]
+    assert partials[1]["start_sec"] == pytest.approx(partials[0]["end_sec"])
+    final = messages[-1]
+    assert (final["duration_sec"], final["failed_windows"]) == (2, 0)
+
+    transcript = session.get(Transcript, final["transcript_id"])
+    assert load_text(session, transcript) == "window 0 window 1 window 2"
+    segments = session.exec(select(TranscriptSegment).where(TranscriptSegment.transcript_id == transcript.id)).all()
+    assert len(segments) == 3
+    assert meeting_id not in active_meetings
+
+
+def test_a_session_for_an_unknown_meeting_is_rejected(client, live_settings, provider):
+    with client.websocket_connect("/api/transcribe/live?meeting_id=999999") as ws:
+        assert ws.receive_json() == {"type": "error", "detail": "Meeting not found"}
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 4404
+
+
+def test_a_failure_storing_the_transcript_is_reported_and_closes_with_1011(
+    client, session, live_settings, provider, monkeypatch
+):
+    meeting_id = _meeting(session, "Live store fails")
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("disk I/O error")
+
+    monkeypatch.setattr(live, "save_transcript", fail)
+    with client.websocket_connect(f"/api/transcribe/live?meeting_id={meeting_id}&sample_rate={RATE}") as ws:
+        ws.send_bytes(_tone(1.5))
+        ws.send_json({"type": "stop"})
+        message = ws.receive_json()
+        while message["type"] == "partial":
+            message = ws.receive_json()
+        assert message == {"type": "error", "detail": "Could not store the transcript"}
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 1011
+    assert meeting_id not in active_meetings
+
+
+def test_a_failed_window_is_counted_and_the_rest_is_kept(session, live_settings):
+    meeting_id = _meeting(session, "Live window fails")
+    provider = _CountingProvider(fail={1})
+    reported = []
+
+    async def scenario():
+        async def on_result(result):
+            reported.append(result.index)
+
+        transcriber = LiveTranscriber(meeting_id, provider, sample_rate=RATE, on_result=on_result)
+        # Fed in small chunks, as a browser sends it
+        audio = _tone(3.2)
+        for start in range(0, len(audio), 3200):
+            await transcriber.feed(audio[start:start + 3200])
+        return transcriber, await transcriber.finish()
+
+    transcriber, transcript = asyncio.run(scenario())
+    assert transcriber.errors == 1
+    assert reported == [0, 2, 3]
+    assert load_text(session, transcript) == "window 0 window 2 window 3"
+    assert transcript.duration_sec == 3
+
+
+def test_a_session_with_nothing_heard_stores_nothing(session, live_settings):
+    meeting_id = _meeting(session, "Live silence")
+
+    async def scenario():
+        transcriber = LiveTranscriber(meeting_id, _CountingProvider(), sample_rate=RATE)
+        await transcriber.feed(b"\x00\x00" * 100)  # shorter than the last window worth sending
+        return await transcriber.finish()
+
+    assert asyncio.run(scenario()) is None
+    assert session.exec(select(Transcript).where(Transcript.meeting_id == meeting_id)).first() is None
@@ -0,0 +1,54 @@
+from sqlmodel import select
+
+from app.models import ActionItem, ActionMention, Meeting
+from app.services.transcript_store import save_transcript
+
+TRANSCRIPT = (
+    "Anna will send the launch plan by Friday. Ben should book the venue. "
+    "Carla needs to review the budget."
+)
+
+
+def _summarized_meeting(client, session, title, transcript=TRANSCRIPT):
+    meeting = Meeting(title=title)
+    session.add(meeting)
+    session.flush()
+    save_transcript(session, meeting.id, transcript)
+    session.commit()
+    assert client.post("/api/summarize", params={"meeting_id": meeting.id}).status_code == 200
+    return meeting.id
+
+
+def test_deleting_a_meeting_keeps_actions_that_later_meetings_repeated(client, session):
+    first = _summarized_meeting(client, session, "Weekly 1")
+    second = _summarized_meeting(client, session, "Weekly 2")
+    third = _summarized_meeting(client, session, "Weekly 3")
+    shared = [a["id"] for a in client.get(f"/api/meetings/{first}").json()["actions"]]
+    assert shared
+    # The repeats were linked rather than copied
+    assert [a["id"] for a in client.get(f"/api/meetings/{second}").json()["actions"]] == shared
+    before = client.get("/api/stats").json()["action_items_count"]
+
+    assert client.delete(f"/api/meetings/{first}").status_code == 200
+
+    assert client.get("/api/stats").json()["action_items_count"] == before
+    assert [a["id"] for a in client.get(f"/api/meetings/{second}").json()["actions"]] == shared
+    assert [a["id"] for a in client.get(f"/api/meetings/{third}").json()["actions"]] == shared
+    session.expire_all()
+    items = session.exec(select(ActionItem).where(ActionItem.id.in_(shared))).all()
+    assert {item.meeting_id for item in items} == {second}
+    mentions = session.exec(select(ActionMention.meeting_id).where(ActionMention.action_id.in_(shared))).all()
+    assert set(mentions) == {third}
+
+
+def test_deleting_a_meeting_removes_actions_nobody_repeated(client, session):
+    meeting_id = _summarized_meeting(
+        client, session, "One-off", "Dana will renew the domain. Eric should migrate the wiki."
+    )
+    own = session.exec(select(ActionItem.id).where(ActionItem.meeting_id == meeting_id)).all()
+    assert len(own) == 2
+
+    assert client.delete(f"/api/meetings/{meeting_id}").status_code == 200
+
+    session.expire_all()
+    assert session.exec(select(ActionItem).where(ActionItem.id.in_(own))).all() == []
@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, SQLModel, select
+
+from app.migrations import upgrade
+from app.models import ActionItem, Summary, Transcript, TranscriptSegment
+from app.services.transcript_store import load_text
+
+# The tables as the first release created them
+BASELINE_SCHEMA = """
+CREATE TABLE meeting (id INTEGER NOT NULL, title VARCHAR(200) NOT NULL, created_at DATETIME NOT NULL, PRIMARY KEY (id));
+CREATE TABLE transcript (id INTEGER NOT NULL, meeting_id INTEGER NOT NULL, text VARCHAR NOT NULL,
+    duration_sec INTEGER, created_at DATETIME NOT NULL, PRIMARY KEY (id), FOREIGN KEY(meeting_id) REFERENCES meeting (id));
+CREATE TABLE summary (id INTEGER NOT NULL, meeting_id INTEGER NOT NULL, bullets JSON, decisions JSON, risks JSON,
+    created_at DATETIME NOT NULL, PRIMARY KEY (id), FOREIGN KEY(meeting_id) REFERENCES meeting (id));
+CREATE TABLE actionitem (id INTEGER NOT NULL, meeting_id INTEGER NOT NULL, text VARCHAR(500) NOT NULL,
+    assignee VARCHAR(100), due_date DATE, status VARCHAR(20) NOT NULL, created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL, PRIMARY KEY (id), FOREIGN KEY(meeting_id) REFERENCES meeting (id));
+INSERT INTO meeting VALUES (1, 'Planning', '2024-01-08 10:00:00'), (2, 'Retro', '2024-01-09 10:00:00');
+INSERT INTO transcript VALUES (1, 1, 'We will ship in March. Anna owns the rollout.', 20, '2024-01-08 11:00:00');
+INSERT INTO transcript VALUES (2, 2, 'First take.', NULL, '2024-01-09 11:00:00');
+INSERT INTO transcript VALUES (3, 2, 'Second take.', NULL, '2024-01-09 12:00:00');
+INSERT INTO summary VALUES (1, 1, '["old"]', '[]', '[]', '2024-01-08 12:00:00');
+INSERT INTO summary VALUES (2, 1, '["new"]', '[]', '[]', '2024-01-08 13:00:00');
+INSERT INTO actionitem VALUES (1, 1, 'Own the rollout', 'Anna', NULL, 'open', '2024-01-08 12:00:00', '2024-01-08 12:00:00');
+"""
+
+
+def _baseline_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        for statement in BASELINE_SCHEMA.split(";"):
+            if statement.strip():
+                conn.execute(text(statement))
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def test_upgrade_moves_transcript_text_and_adds_constraints(tmp_path):
+    engine = _baseline_engine(tmp_path)
+    upgrade(engine)
+    upgrade(engine)  # nothing left to do the second time
+
+    assert "text" not in {c["name"] for c in inspect(engine).get_columns("transcript")}
+    with Session(engine) as session:
+        transcripts = session.exec(select(Transcript).order_by(Transcript.id)).all()
+        assert [(t.id, t.meeting_id) for t in transcripts] == [(1, 1), (3, 2)]
+        assert load_text(session, transcripts[0]) == "We will ship in March. Anna owns the rollout."
+        assert load_text(session, transcripts[1]) == "Second take."
+        segments = session.exec(select(TranscriptSegment).where(TranscriptSegment.transcript_id == 1)).all()
+        assert [s.char_start for s in segments] == [0, 23]
+
+        assert [s.bullets for s in session.exec(select(Summary)).all()] == [["new"]]
+        assert session.exec(select(ActionItem)).one().source == "manual"
+
+        session.add(Transcript(meeting_id=1))
+        with pytest.raises(IntegrityError):
+            session.commit()
+
+
+def test_upgrade_sets_older_rows_aside_instead_of_deleting_them(tmp_path):
+    engine = _baseline_engine(tmp_path)
+    upgrade(engine)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT id, meeting_id, text FROM transcript_duplicate")).all() == [(2, 2, "First take.")]
+        assert conn.execute(text("SELECT id, bullets FROM summary_duplicate")).all() == [(1, '["old"]')]
+        # The compressed body and segments of the set-aside transcript move with it
+        assert conn.execute(text("SELECT transcript_id FROM transcriptbody_duplicate")).scalars().all() == [2]
+        assert conn.execute(text("SELECT DISTINCT transcript_id FROM transcriptsegment_duplicate")).scalars().all() == [2]
+        assert conn.execute(text("SELECT COUNT(*) FROM transcriptbody WHERE transcript_id = 2")).scalar() == 0
@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from sqlalchemy import text
+
+from app.db import get_engine
+from app.deps import get_settings
+from app.services import profiling
+from app.services.profiling import Profile, ProfileStore, ProfilingMiddleware, span
+
+TOKEN = "profile-secret"
+
+
+class _Count(BaseModel):
+    meetings: int
+
+
+@pytest.fixture
+def profiled(client, monkeypatch):
+    """A small app behind the middleware, with the admin header enabled and a fresh buffer.
+
+    It queries the tables the main app (``client``) has created.
+    """
+    settings = get_settings()
+    monkeypatch.setattr(settings, "profile_admin_token", TOKEN)
+    monkeypatch.setattr(settings, "profile_sample_rate", 0.0)
+    monkeypatch.setattr(settings, "profile_interval_ms", 1.0)
+    store = ProfileStore(10)
+    monkeypatch.setattr(profiling, "profiles", store)
+
+    app = FastAPI()
+
+    @app.get("/count", response_model=_Count)
+    def count():
+        with get_engine().connect() as conn:
+            total = conn.execute(text("SELECT count(*) FROM meeting")).scalar_one()
+        with span("provider", "fake.summarize"):
+            time.sleep(0.02)
+        return {"meetings": total}
+
+    @app.get("/api/debug/profiles")
+    def listing():
+        return []
+
+    app.add_middleware(ProfilingMiddleware)
+    with TestClient(app) as profiled_client:
+        yield profiled_client, store
+
+
+def test_only_requests_with_the_admin_token_are_profiled(profiled):
+    client, store = profiled
+    assert "x-profile-id" not in client.get("/count").headers
+    assert "x-profile-id" not in client.get("/count", headers={"X-Profile": "wrong"}).headers
+    assert "x-profile-id" not in client.get("/api/debug/profiles", headers={"X-Profile": TOKEN}).headers
+    assert store.list() == []
+
+    response = client.get("/count", headers={"X-Profile": TOKEN})
+    [profile] = store.list()
+    assert response.headers["x-profile-id"] == profile.id
+    assert (profile.trigger, profile.status, profile.route) == ("header", 200, "/count")
+    assert profile.duration_ms >= profile.first_byte_ms > 0
+
+
+def test_a_profile_has_sql_provider_and_serialize_spans(profiled):
+    client, store = profiled
+    client.get("/count", headers={"X-Profile": TOKEN})
+    [profile] = store.list()
+
+    kinds = {s["kind"] for s in profile.spans}
+    assert {"sql", "provider", "serialize"} <= kinds
+    [statement] = [s["name"] for s in profile.spans if s["kind"] == "sql"]
+    assert statement.startswith("SELECT count(*) FROM meeting")
+    assert profile.totals()["provider"]["ms"] >= 20
+    detail = profile.detail()
+    assert detail["timeline"] == profile.spans and detail["samples"] == profile.samples
+
+
+def test_spans_outside_a_profile_and_past_the_limit_are_not_kept(monkeypatch):
+    with span("sql", "unprofiled"):
+        pass
+
+    monkeypatch.setattr(profiling, "MAX_SPANS", 2)
+    profile = Profile("GET", "/x", "sample")
+    token = profiling._current.set(profile)
+    try:
+        for name in ("a", "b", "c"):
+            with span("sql", name):
+                pass
+    finally:
+        profiling._current.reset(token)
+    assert [s["name"] for s in profile.spans] == ["a", "b"]
+    assert profile.dropped_spans == 1
+
+
+def test_the_buffer_keeps_the_newest_profiles():
+    store = ProfileStore(3)
+    added = [Profile("GET", f"/api/meetings/{n}" if n % 2 else "/api/search", "sample") for n in range(5)]
+    for profile in added:
+        store.add(profile)
+
+    assert store.list() == added[:1:-1]
+    assert store.get(added[0].id) is None and store.get(added[4].id) is added[4]
+    assert store.list(path="/api/meetings") == [added[3]]
+    assert store.list(limit=1) == [added[4]]
+
+
+def test_stopping_the_sampler_does_not_wait_for_a_sample_in_progress(monkeypatch):
+    sampling, release = threading.Event(), threading.Event()
+
+    def slow_frame_name(code):
+        sampling.set()
+        release.wait(5)
+        return code.co_name
+
+    monkeypatch.setattr(profiling, "_frame_name", slow_frame_name)
+    profile = Profile("GET", "/x", "header")
+    sampler = profiling._Sampler(profile, threading.get_ident(), interval=0.001)
+    sampler.start()
+    assert sampling.wait(5)
+
+    started = time.perf_counter()
+    sampler.stop()
+    assert time.perf_counter() - started < 1
+    release.set()
+    sampler.join(5)
+    assert not sampler.is_alive()
+    # The sample taken while stopping is dropped rather than changing a finished profile
+    assert (profile.samples, profile.stacks) == (0, {})
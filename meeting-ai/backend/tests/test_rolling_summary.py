@@ -0,0 +1,164 @@
+import asyncio
+from typing import List, Optional
+
+import pytest
+
+from app.deps import get_provider
+from app.main import app
+from app.models import Meeting, Summary, SummaryState
+from app.providers.base import BaseProvider
+from app.schemas import ActionItemCreate, SummaryData
+from app.services.rolling_summary import MAX_ITEMS, summarize_appended, summarize_tail
+from app.services.transcript_store import save_transcript
+
+FIRST = "We reviewed the onboarding flow. Omar will update the welcome email by Friday."
+SECOND = "Later we agreed to drop the legacy signup page."
+
+
+class _RecordingProvider(BaseProvider):
+    """Summarizes by echoing what it was sent, and keeps every call"""
+
+    def __init__(self):
+        self.calls: List[tuple] = []
+
+    async def transcribe(self, audio_path: str) -> str:
+        raise NotImplementedError
+
+    async def summarize(
+        self, transcript: str, known_actions: Optional[List[ActionItemCreate]] = None
+    ) -> SummaryData:
+        self.calls.append((transcript, known_actions))
+        actions = known_actions if known_actions is not None else [ActionItemCreate(text="Model-found action")]
+        return SummaryData(bullets=[f"Call {len(self.calls)}"], decisions=[], risks=[], actions=actions)
+
+
+@pytest.fixture
+def provider():
+    provider = _RecordingProvider()
+    app.dependency_overrides[get_provider] = lambda: provider
+    yield provider
+    app.dependency_overrides.pop(get_provider, None)
+
+
+def _meeting_with_transcript(session, title):
+    meeting = Meeting(title=title)
+    session.add(meeting)
+    session.flush()
+    save_transcript(session, meeting.id, FIRST, duration_sec=10)
+    session.commit()
+    return meeting.id
+
+
+def test_appended_text_is_folded_into_the_summary(client, session, provider):
+    meeting_id = _meeting_with_transcript(session, "Growing transcript")
+    url = "/api/summarize/incremental"
+
+    first = client.post(url, params={"meeting_id": meeting_id}).json()
+    assert first["bullets"] == ["Call 1"]
+    # Nothing new: the summary comes back without another provider call
+    assert client.post(url, params={"meeting_id": meeting_id}).json() == first
+    assert len(provider.calls) == 1
+
+    r = client.post(f"/api/meetings/{meeting_id}/transcript/append", json={"text": SECOND, "duration_sec": 4})
+    assert r.status_code == 200
+    appended = r.json()
+    assert appended["duration_sec"] == 14
+    assert [s["text"] for s in appended["segments"]] == [SECOND]
+    assert appended["segments"][0]["start_sec"] >= 10
+
+    second = client.post(url, params={"meeting_id": meeting_id}).json()
+    assert second["bullets"] == ["Call 2"]
+    assert second["id"] == first["id"]
+    prompt, known_actions = provider.calls[1]
+    assert SECOND in prompt and "onboarding" not in prompt.split("New discussion:")[1]
+    # The previous summary is in the prompt, so actions come from the new text only, found locally
+    assert known_actions is not None
+    assert provider.calls[0][1] is None  # the first fold had no previous summary to confuse the model
+
+    session.expire_all()
+    assert session.get(SummaryState, meeting_id).chars_covered == len(FIRST) + 1 + len(SECOND)
+
+
+def test_range_reads_see_appended_text(client, session, provider):
+    meeting_id = _meeting_with_transcript(session, "Read after append")
+    url = f"/api/meetings/{meeting_id}/transcript/segments"
+    before = client.get(url).json()
+    client.post(f"/api/meetings/{meeting_id}/transcript/append", json={"text": SECOND})
+
+    after = client.get(url).json()
+    assert after["total_segments"] == before["total_segments"] + 1
+    assert [s["text"] for s in after["segments"]][:-1] == [s["text"] for s in before["segments"]]
+    assert after["segments"][-1]["text"] == SECOND
+    assert client.get(f"/api/meetings/{meeting_id}").json()["transcript"]["text"] == f"{FIRST} {SECOND}"
+
+
+def test_appending_to_a_meeting_without_a_transcript_is_404(client, session):
+    meeting = Meeting(title="No transcript")
+    session.add(meeting)
+    session.commit()
+    r = client.post(f"/api/meetings/{meeting.id}/transcript/append", json={"text": SECOND})
+    assert r.status_code == 404
+
+
+def test_an_update_does_not_ask_the_model_for_actions_in_the_previous_summary():
+    provider = _RecordingProvider()
+    previous = SummaryData(bullets=["Anna will send the deck"], decisions=[], risks=[], actions=[])
+    data = asyncio.run(provider.summarize_update(previous, "We discussed the budget."))
+    assert provider.calls[0][1] == []
+    assert data.actions == []
+
+
+def test_a_full_summary_counts_as_covering_the_transcript(client, session, provider):
+    meeting_id = _meeting_with_transcript(session, "Summarized in full")
+    session.add(Summary(meeting_id=meeting_id, bullets=["Onboarding reviewed"], decisions=[], risks=[]))
+    session.commit()
+    url = "/api/summarize/incremental"
+
+    assert client.post(url, params={"meeting_id": meeting_id}).json()["bullets"] == ["Onboarding reviewed"]
+    assert provider.calls == []
+
+    client.post(f"/api/meetings/{meeting_id}/transcript/append", json={"text": SECOND})
+    assert client.post(url, params={"meeting_id": meeting_id}).json()["bullets"] == ["Call 1"]
+    [(prompt, _)] = provider.calls
+    assert "Onboarding reviewed" in prompt and SECOND in prompt and "welcome email" not in prompt
+
+
+def test_live_folds_line_up_with_the_transcript_stored_afterwards(client, session, provider):
+    meeting = Meeting(title="Folded live")
+    session.add(meeting)
+    session.commit()
+    windows = ["We opened with the roadmap.", "Then we went over hiring."]
+
+    async def scenario():
+        for text in windows:
+            await summarize_appended(meeting.id, text, provider)
+        save_transcript(session, meeting.id, " ".join(windows), duration_sec=20)
+        session.commit()
+        return await summarize_tail(meeting.id, provider)
+
+    summary = asyncio.run(scenario())
+    assert summary.bullets == ["Call 2"]
+    assert len(provider.calls) == 2  # nothing left over once the transcript is stored
+    session.expire_all()
+    state = session.get(SummaryState, meeting.id)
+    assert (state.chars_covered, state.updates) == (len(" ".join(windows)), 2)
+
+
+def test_summary_lists_are_capped(session, provider, monkeypatch):
+    meeting_id = _meeting_with_transcript(session, "Long lists")
+
+    async def summarize_update(previous, transcript, known_actions=None):
+        return SummaryData(bullets=[f"Point {n}" for n in range(25)], decisions=[], risks=["Late"], actions=[])
+
+    monkeypatch.setattr(provider, "summarize_update", summarize_update)
+    summary = asyncio.run(summarize_tail(meeting_id, provider))
+    assert (len(summary.bullets), summary.risks) == (MAX_ITEMS, ["Late"])
+
+
+def test_incremental_summary_without_a_transcript_is_400(client, session, provider):
+    meeting = Meeting(title="Nothing said yet")
+    session.add(meeting)
+    session.commit()
+    r = client.post("/api/summarize/incremental", params={"meeting_id": meeting.id})
+    assert r.status_code == 400
+    assert provider.calls == []
@@ -0,0 +1,115 @@
+import asyncio
+import time
+from typing import List, Optional
+
+import pytest
+
+from app import deps
+from app.deps import get_settings
+from app.providers.base import BaseProvider
+from app.providers.routing import RoutingProvider
+from app.schemas import ActionItemCreate, SummaryData
+from app.services.deadline import DeadlineExceeded
+
+
+class _Backend(BaseProvider):
+    """Answers after ``delay`` seconds, or raises ``error``; records every call and cancellation"""
+
+    def __init__(self, name: str, delay: float = 0.0, error: Optional[BaseException] = None):
+        self.name, self.delay, self.error = name, delay, error
+        self.calls = 0
+        self.cancelled = 0
+
+    async def transcribe(self, audio_path: str) -> str:
+        raise NotImplementedError
+
+    async def summarize(
+        self, transcript: str, known_actions: Optional[List[ActionItemCreate]] = None
+    ) -> SummaryData:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        return SummaryData(bullets=[self.name], decisions=[], risks=[], actions=[])
+
+
+@pytest.fixture
+def router_settings(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "router_failure_threshold", 2)
+    monkeypatch.setattr(settings, "router_cooldown_sec", 30.0)
+    monkeypatch.setattr(settings, "router_hedge_after_ms", 0.0)
+    return settings
+
+
+def _route(router):
+    return asyncio.run(router.summarize("transcript")).bullets[0]
+
+
+def test_a_failing_backend_fails_over_to_the_next(router_settings):
+    a, b = _Backend("a", error=RuntimeError("upstream 500")), _Backend("b")
+    router = RoutingProvider([("a", a), ("b", b)])
+
+    assert _route(router) == "b"
+    decision = router.snapshot()["decisions"][0]
+    assert [(attempt["backend"], attempt["outcome"]) for attempt in decision["attempts"]] == [("a", "error"), ("b", "ok")]
+    assert decision["backend"] == "b"
+
+
+def test_a_backend_is_skipped_after_repeated_failures_then_gets_one_trial_call(router_settings):
+    a, b = _Backend("a", error=RuntimeError("upstream 500")), _Backend("b")
+    router = RoutingProvider([("a", a), ("b", b)])
+
+    # a has no successful call to rank it by, so it is tried first until it trips
+    assert [_route(router) for _ in range(2)] == ["b", "b"]
+    assert a.calls == 2
+    assert not router._stats("a", "summarize").healthy(time.monotonic())
+    assert _route(router) == "b"
+    assert a.calls == 2  # out of rotation
+
+    # Cooldown over: a single trial call, whose failure takes it out again at once
+    router._stats("a", "summarize").unhealthy_until = 0.0
+    assert _route(router) == "b"
+    assert a.calls == 3
+    assert _route(router) == "b"
+    assert a.calls == 3
+
+
+def test_a_slow_call_is_hedged_and_the_loser_cancelled(router_settings):
+    router_settings.router_hedge_after_ms = 20.0
+    slow, fast = _Backend("slow", delay=5.0), _Backend("fast", delay=0.01)
+    router = RoutingProvider([("slow", slow), ("fast", fast)])
+
+    assert _route(router) == "fast"
+    assert slow.cancelled == 1
+    decision = router.snapshot()["decisions"][0]
+    assert decision["hedged"] is True
+    assert {attempt["backend"]: attempt["outcome"] for attempt in decision["attempts"]} == {
+        "slow": "cancelled", "fast": "ok",
+    }
+
+
+def test_an_expired_deadline_neither_fails_over_nor_counts_against_the_backend(router_settings):
+    a, b = _Backend("a", error=DeadlineExceeded()), _Backend("b")
+    router = RoutingProvider([("a", a), ("b", b)])
+
+    for _ in range(3):
+        with pytest.raises(DeadlineExceeded):
+            _route(router)
+    assert b.calls == 0
+    stats = router._stats("a", "summarize")
+    assert (stats.failures, stats.consecutive_failures, stats.error_rate) == (0, 0, 0.0)
+    assert router.snapshot()["decisions"][0]["outcome"] == "timeout"
+
+
+def test_router_backends_accept_the_same_aliases_as_provider(monkeypatch):
+    monkeypatch.setattr(deps.settings, "router_backends", "mock, HuggingFace, hf, hugging_face")
+    monkeypatch.setattr(deps.settings, "hf_token", "hf_test")
+    monkeypatch.setattr(deps, "_providers", {})
+
+    router = deps._router()
+    assert [name for name, _ in router.backends] == ["mock", "hf"]
@@ -0,0 +1,98 @@
+from datetime import date
+
+from sqlmodel import select
+
+from app.models import ActionItem, ActionMention, Meeting
+from app.schemas import ActionItemCreate
+from app.services.action_index import index_action, meeting_actions
+from app.services.summarization import seed_actions
+
+
+def _meeting(session, title):
+    meeting = Meeting(title=title)
+    session.add(meeting)
+    session.flush()
+    return meeting.id
+
+
+def _item(session, meeting_id, text, assignee=None, due_date=None, status="open"):
+    item = ActionItem(meeting_id=meeting_id, text=text, assignee=assignee, due_date=due_date, status=status)
+    session.add(item)
+    session.flush()
+    index_action(session, item)
+    return item
+
+
+def _mentions(session, meeting_id):
+    return session.exec(select(ActionMention.action_id).where(ActionMention.meeting_id == meeting_id)).all()
+
+
+def test_a_repeat_is_merged_into_the_meetings_own_item(session):
+    meeting_id = _meeting(session, "Seed own")
+    own = _item(session, meeting_id, "Prepare the quarterly vendor spend report", due_date=date(2026, 11, 1))
+    _item(session, _meeting(session, "Seed own, earlier"), "Prepare the quarterly vendor spend report")
+
+    seed_actions(session, meeting_id, [ActionItemCreate(
+        text="Prepare the quarterly vendor spend report", assignee="Dana", due_date=date(2026, 11, 8),
+    )])
+    session.commit()
+
+    assert [item.id for item in meeting_actions(session, meeting_id)] == [own.id]
+    session.refresh(own)
+    assert (own.assignee, own.due_date) == ("Dana", date(2026, 11, 8))
+    assert _mentions(session, meeting_id) == []
+
+
+def test_a_repeat_of_another_meetings_item_is_linked_without_rescheduling_it(session):
+    earlier = _meeting(session, "Seed link, earlier")
+    existing = _item(session, earlier, "Migrate the billing cron jobs to the new scheduler", assignee="Lena",
+                     due_date=date(2026, 11, 20))
+    undated = _item(session, earlier, "Write the incident review for the staging outage", assignee="Lena")
+    meeting_id = _meeting(session, "Seed link")
+
+    seed_actions(session, meeting_id, [
+        ActionItemCreate(text="Migrate the billing cron jobs to the new scheduler", assignee="Lena",
+                         due_date=date(2026, 12, 31)),
+        ActionItemCreate(text="Write the incident review for the staging outage", assignee="Lena",
+                         due_date=date(2026, 11, 14)),
+    ])
+    session.commit()
+
+    assert sorted(_mentions(session, meeting_id)) == sorted([existing.id, undated.id])
+    assert session.exec(select(ActionItem).where(ActionItem.meeting_id == meeting_id)).all() == []
+    session.refresh(existing)
+    session.refresh(undated)
+    assert existing.due_date == date(2026, 11, 20)  # the owner's date stands
+    assert undated.due_date == date(2026, 11, 14)  # a missing one is filled in
+
+
+def test_an_unassigned_action_does_not_merge_into_someone_elses_item(session):
+    earlier = _meeting(session, "Seed insert, earlier")
+    _item(session, earlier, "Renew the SSL certificates for the public API", assignee="Omar")
+    meeting_id = _meeting(session, "Seed insert")
+
+    seed_actions(session, meeting_id, [
+        ActionItemCreate(text="Renew the SSL certificates for the public API"),
+        ActionItemCreate(text="Order new chairs for the design studio"),
+    ])
+    session.commit()
+
+    added = session.exec(select(ActionItem).where(ActionItem.meeting_id == meeting_id).order_by(ActionItem.id)).all()
+    assert [(item.text, item.assignee, item.source) for item in added] == [
+        ("Renew the SSL certificates for the public API", None, "summary"),
+        ("Order new chairs for the design studio", None, "summary"),
+    ]
+    assert _mentions(session, meeting_id) == []
+
+
+def test_an_assigned_action_prefers_that_persons_item(session):
+    earlier = _meeting(session, "Seed prefer, earlier")
+    _item(session, earlier, "Draft the onboarding checklist for new support hires")
+    theirs = _item(session, earlier, "Draft the onboarding checklist for new support hires", assignee="Priya")
+    meeting_id = _meeting(session, "Seed prefer")
+
+    seed_actions(session, meeting_id, [
+        ActionItemCreate(text="Draft the onboarding checklist for new support hires", assignee="priya"),
+    ])
+    session.commit()
+    assert _mentions(session, meeting_id) == [theirs.id]
@@ -0,0 +1,50 @@
+from app.models import Meeting
+from app.schemas import SegmentData
+from app.services import transcript_store
+from app.services.segments import build_segments
+from app.services.transcript_store import save_transcript
+
+TEXT = "Welcome everyone. We ship in March. Anna owns the rollout."
+
+
+def _meeting_with_transcript(session):
+    meeting = Meeting(title="Segments")
+    session.add(meeting)
+    session.flush()
+    transcript = save_transcript(session, meeting.id, TEXT, duration_sec=6)
+    timed = [
+        SegmentData(start=0.0, end=1.5, text="Welcome everyone."),
+        SegmentData(start=2.0, end=4.0, text="We ship in March."),
+        SegmentData(start=4.0, end=6.0, text="Anna owns the rollout."),
+    ]
+    session.add_all(build_segments(transcript.id, TEXT, timed))
+    session.commit()
+    return meeting.id
+
+
+def test_segment_at_returns_the_segment_being_spoken(client, session):
+    meeting_id = _meeting_with_transcript(session)
+    r = client.get(f"/api/meetings/{meeting_id}/transcript/segment_at", params={"t": 3})
+    assert r.status_code == 200
+    assert r.json() == {"index": 1, "start_sec": 2.0, "end_sec": 4.0, "text": "We ship in March."}
+
+
+def test_segment_at_outside_any_segment_is_404(client, session):
+    meeting_id = _meeting_with_transcript(session)
+    url = f"/api/meetings/{meeting_id}/transcript/segment_at"
+    assert client.get(url, params={"t": 1.8}).status_code == 404  # between segments
+    assert client.get(url, params={"t": 9999}).status_code == 404  # after the recording
+
+
+def test_range_reads_decompress_the_body_once(client, session, monkeypatch):
+    meeting_id = _meeting_with_transcript(session)
+    calls = []
+    load_text = transcript_store.load_text
+    monkeypatch.setattr(transcript_store, "load_text", lambda *a: calls.append(1) or load_text(*a))
+
+    url = f"/api/meetings/{meeting_id}/transcript/segments"
+    first = client.get(url, params={"start_sec": 3.5}).json()
+    second = client.get(url, params={"from_index": 0, "to_index": 0}).json()
+    assert [s["text"] for s in first["segments"]] == ["We ship in March.", "Anna owns the rollout."]
+    assert [s["text"] for s in second["segments"]] == ["Welcome everyone."]
+    assert len(calls) == 1
@@ -0,0 +1,78 @@
+import threading
+
+from app.services import semantic_index
+from app.services.semantic_index import KIND_ACTION, Document, SemanticIndex
+
+
+def _documents(count):
+    topics = ["budget review", "hiring plan", "security audit", "launch timeline", "customer feedback"]
+    return [
+        Document(meeting_id=i, kind=KIND_ACTION, ref_id=i, text=f"{topics[i % len(topics)]} item {i}")
+        for i in range(1, count + 1)
+    ]
+
+
+def test_training_runs_outside_the_writing_thread(tmp_path, monkeypatch):
+    monkeypatch.setattr(semantic_index, "TRAIN_ROWS", 300)
+    index = SemanticIndex(str(tmp_path))
+    release = threading.Event()
+    fit = semantic_index.train_centroids
+
+    def slow_fit(vectors, lists):
+        release.wait(10)
+        return fit(vectors, lists)
+
+    monkeypatch.setattr(semantic_index, "train_centroids", slow_fit)
+    # The write that crosses the threshold returns while the centroids are still being fit
+    index.upsert(_documents(300))
+    assert index.centroids is None
+    index.upsert([Document(meeting_id=999, kind=KIND_ACTION, ref_id=999, text="vendor contract renewal")])
+    assert index.search("vendor contract", k=1)[0].ref_id == 999
+
+    release.set()
+    for thread in threading.enumerate():
+        if thread.name == "search-index-train":
+            thread.join(10)
+    assert index.centroids is not None
+    assert index.trained_count == 301
+    # Rows written while training ran are assigned to the new lists too
+    assert index.search("vendor contract", k=1)[0].ref_id == 999
+
+
+def _meeting_with_summary(session, title, bullets, decisions, risks):
+    from app.models import Meeting, Summary
+    from app.services.search import index_meeting
+
+    meeting = Meeting(title=title)
+    session.add(meeting)
+    session.flush()
+    session.add(Summary(meeting_id=meeting.id, bullets=bullets, decisions=decisions, risks=risks))
+    session.commit()
+    index_meeting(session, meeting.id)
+    return meeting.id
+
+
+def test_a_risk_line_is_found_despite_the_rest_of_the_summary(client, session):
+    planning = _meeting_with_summary(
+        session, "Quarterly planning",
+        bullets=[
+            "Reviewed hiring for the data team",
+            "Office move confirmed for spring",
+            "New expense tool rolled out to finance",
+            "Sales pipeline reviewed region by region",
+        ],
+        decisions=["Keep the weekly standup at 10am", "Adopt the new design system"],
+        risks=["Timeline risk: the vendor API may not be ready before launch"],
+    )
+    kickoff = _meeting_with_summary(
+        session, "Marketing kickoff",
+        bullets=["Start the campaign next week", "Brand refresh assets are ready"],
+        decisions=[], risks=[],
+    )
+
+    r = client.get("/api/search/semantic", params={"q": "launch delays"})
+    assert r.status_code == 200
+    results = {result["meeting_id"]: result for result in r.json()}
+    assert planning in results
+    assert results[planning]["matches"][0]["text"] == "Timeline risk: the vendor API may not be ready before launch"
+    assert kickoff not in results
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from app.services import singleflight
+from app.services.deadline import DeadlineExceeded, remaining, run_request
+from app.services.singleflight import ConflictingCall, IdempotencyCache, SingleFlight
+
+
+class _Request:
+    headers = {}
+
+    async def is_disconnected(self):
+        return False
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "result"
+
+    async def scenario():
+        results = await asyncio.gather(*(flight.do("key", work) for _ in range(3)))
+        assert "key" not in flight
+        return results, await flight.do("key", work)
+
+    results, later = asyncio.run(scenario())
+    assert results == ["result"] * 3
+    assert later == "result"
+    assert len(calls) == 2  # the call after the first finished is a new one
+
+
+def test_a_caller_with_another_fingerprint_is_refused():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "first"
+
+    async def scenario():
+        first = asyncio.ensure_future(flight.do("key", work, fingerprint="a"))
+        await asyncio.sleep(0)
+        assert flight.joins("key", "a") and not flight.joins("key", "b")
+        with pytest.raises(ConflictingCall):
+            await flight.do("key", work, fingerprint="b")
+        return await first
+
+    assert asyncio.run(scenario()) == "first"
+
+
+def test_the_call_outlives_a_caller_that_leaves_but_not_the_last_one():
+    flight = SingleFlight()
+    finished, cancelled = [], []
+
+    async def work():
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+        finished.append(1)
+        return "done"
+
+    async def scenario():
+        first = asyncio.ensure_future(flight.do("shared", work))
+        second = asyncio.ensure_future(flight.do("shared", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == "done"
+
+        alone = asyncio.ensure_future(flight.do("alone", work))
+        await asyncio.sleep(0.01)
+        alone.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await alone
+        assert "alone" not in flight
+
+    asyncio.run(scenario())
+    assert (finished, cancelled) == ([1], [1])
+
+
+def test_a_shared_call_does_not_inherit_the_first_callers_deadline():
+    flight = SingleFlight()
+    seen = []
+
+    async def work():
+        seen.append(remaining())
+        await asyncio.sleep(0.3)
+        return "done"
+
+    async def scenario():
+        hasty = asyncio.ensure_future(run_request(_Request(), 0.02, lambda: flight.do("key", work)))
+        await asyncio.sleep(0)
+        patient = asyncio.ensure_future(run_request(_Request(), 5.0, lambda: flight.do("key", work)))
+        with pytest.raises(DeadlineExceeded):
+            await hasty
+        return await patient
+
+    assert asyncio.run(scenario()) == "done"
+    assert seen == [None]
+
+
+def test_idempotency_cache_expires_and_evicts_the_least_recently_used(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(singleflight.time, "monotonic", lambda: now[0])
+    cache = IdempotencyCache(max_entries=2, ttl_sec=60)
+
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # now the most recently used
+    cache.put("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+    now[0] += 61
+    assert cache.get("a") is None
+    assert cache.get("missing") is None
@@ -0,0 +1,88 @@
+import asyncio
+import io
+
+import pytest
+from fastapi import HTTPException
+from starlette.datastructures import Headers, UploadFile
+
+from app.models import Meeting
+from app.routers.transcribe import transcribe_audio
+from app.schemas import TranscriptionResult
+from app.services import deadline
+from app.services.deadline import ClientDisconnected
+
+AUDIO = b"\x1aE\xdf\xa3" + b"\x00" * 4096  # WebM header, so the audio is not pre-processed
+
+
+class _Request:
+    headers = {}
+
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+class _GatedProvider:
+    """Reads the audio only once the test opens the gate"""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+
+    def get_provider_name(self):
+        return "gated"
+
+    async def transcribe_audio(self, audio):
+        await self.gate.wait()
+        return TranscriptionResult(text=f"{len(await audio.read())} bytes of audio")
+
+
+def _upload():
+    return UploadFile(io.BytesIO(AUDIO), filename="call.webm", headers=Headers({"content-type": "audio/webm"}))
+
+
+def test_a_shared_transcription_survives_the_first_caller_leaving(client, session, monkeypatch):
+    monkeypatch.setattr(deadline, "DISCONNECT_POLL_SEC", 0.01)
+    meeting = Meeting(title="Coalesced upload")
+    session.add(meeting)
+    session.commit()
+
+    async def scenario():
+        provider = _GatedProvider()
+        first_request, first_upload = _Request(), _upload()
+        first = asyncio.ensure_future(transcribe_audio(first_request, meeting.id, first_upload, None, session, provider))
+        await asyncio.sleep(0.05)
+        second = asyncio.ensure_future(transcribe_audio(_Request(), meeting.id, _upload(), None, session, provider))
+        await asyncio.sleep(0.05)
+
+        first_request.disconnected = True
+        with pytest.raises(ClientDisconnected):
+            await first
+        await first_upload.close()  # as the framework does once the request has ended
+        provider.gate.set()
+        return await second
+
+    response = asyncio.run(scenario())
+    assert response.text == f"{len(AUDIO)} bytes of audio"
+
+
+def test_a_different_recording_for_a_meeting_being_transcribed_is_refused(client, session):
+    meeting = Meeting(title="Conflicting upload")
+    session.add(meeting)
+    session.commit()
+    other = UploadFile(io.BytesIO(AUDIO + b"\x01"), filename="other.webm",
+                       headers=Headers({"content-type": "audio/webm"}))
+
+    async def scenario():
+        provider = _GatedProvider()
+        first = asyncio.ensure_future(transcribe_audio(_Request(), meeting.id, _upload(), None, session, provider))
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as refused:
+            await transcribe_audio(_Request(), meeting.id, other, None, session, provider)
+        provider.gate.set()
+        return refused.value, await first
+
+    refused, response = asyncio.run(scenario())
+    assert refused.status_code == 409
+    assert response.text == f"{len(AUDIO)} bytes of audio"
@@ -0,0 +1,167 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from app.deps import get_settings
+from app.models import Meeting
+from app.providers import openai_provider
+from app.providers.openai_provider import OpenAIProvider
+from app.services import usage
+from app.services.deadline import DeadlineExceeded
+from app.services.usage import UsageLedger, note_usage, provider_call, record_cache_hit, usage_scope
+
+
+@pytest.fixture
+def ledger(monkeypatch):
+    """A fresh ledger, so rows recorded by other tests do not leak in"""
+    ledger = UsageLedger()
+    monkeypatch.setattr(usage, "ledger", ledger)
+    return ledger
+
+
+def test_a_provider_call_records_what_the_provider_reports(ledger):
+    with usage_scope(meeting_id=7, source="batch"):
+        with provider_call("summarize", "fake"):
+            note_usage(model="small", prompt_tokens=100, completion_tokens=20)
+            note_usage(model="large", prompt_tokens=50, completion_tokens=10, retries=1)
+    note_usage(prompt_tokens=1000)  # outside a call: ignored
+
+    [row] = ledger._buffer
+    assert (row["operation"], row["provider"], row["status"], row["meeting_id"], row["source"]) == (
+        "summarize", "fake", "ok", 7, "batch",
+    )
+    # Counts add up over upstream requests, the last model wins
+    assert (row["model"], row["prompt_tokens"], row["completion_tokens"], row["total_tokens"], row["retries"]) == (
+        "large", 150, 30, 180, 1,
+    )
+    with pytest.raises(ValueError):
+        with provider_call("summarize", "fake"):
+            note_usage(cost=1)
+
+
+def test_failed_timed_out_and_cancelled_calls_are_recorded(ledger):
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            with provider_call("transcribe", "fake"):
+                raise RuntimeError("upstream 500")
+        with pytest.raises(DeadlineExceeded):
+            with provider_call("transcribe", "fake"):
+                raise DeadlineExceeded()
+
+        async def slow():
+            with provider_call("transcribe", "fake"):
+                await asyncio.sleep(10)
+
+        task = asyncio.ensure_future(slow())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    assert [(row["status"], row["error"]) for row in ledger._buffer] == [
+        ("error", "upstream 500"), ("timeout", "Deadline exceeded"), ("cancelled", None),
+    ]
+
+
+def test_a_full_buffer_drops_the_oldest_rows(ledger, monkeypatch):
+    monkeypatch.setattr(get_settings(), "usage_max_buffer", 3)
+    for meeting_id in range(5):
+        record_cache_hit("summarize", meeting_id)
+    assert [row["meeting_id"] for row in ledger._buffer] == [2, 3, 4]
+    assert ledger.dropped == 2
+
+
+def test_flush_writes_rows_the_usage_routes_aggregate(client, session, ledger):
+    meeting = Meeting(title="Metered")
+    session.add(meeting)
+    session.commit()
+
+    with usage_scope(meeting_id=meeting.id, source="api"):
+        with provider_call("summarize", "usage-test"):
+            note_usage(model="usage-model", prompt_tokens=300, completion_tokens=100, retries=2)
+        with pytest.raises(RuntimeError):
+            with provider_call("summarize", "usage-test"):
+                note_usage(model="usage-model")
+                raise RuntimeError("rate limited")
+        with provider_call("transcribe", "usage-test"):
+            note_usage(model="usage-model", audio_seconds=42.5)
+        record_cache_hit("summarize", meeting.id)
+    assert ledger.flush() == 4
+    assert ledger.flush() == 0
+
+    [by_model] = [row for row in client.get("/api/usage/by-model").json() if row["provider"] == "usage-test"]
+    assert {key: by_model[key] for key in ("model", "calls", "errors", "cache_hits", "retries", "prompt_tokens",
+                                           "completion_tokens", "total_tokens", "audio_seconds")} == {
+        "model": "usage-model", "calls": 3, "errors": 1, "cache_hits": 0, "retries": 2, "prompt_tokens": 300,
+        "completion_tokens": 100, "total_tokens": 400, "audio_seconds": 42.5,
+    }
+
+    [by_meeting] = [row for row in client.get("/api/usage/by-meeting", params={"order_by": "calls"}).json()
+                    if row["meeting_id"] == meeting.id]
+    assert (by_meeting["title"], by_meeting["calls"], by_meeting["cache_hits"]) == ("Metered", 3, 1)
+    only_transcribe = client.get("/api/usage/by-meeting", params={"operation": "transcribe"}).json()
+    assert [row["audio_seconds"] for row in only_transcribe if row["meeting_id"] == meeting.id] == [42.5]
+
+    today = client.get("/api/usage/by-day").json()[0]
+    assert today["calls"] >= 3 and today["total_tokens"] >= 400
+    assert client.get("/api/usage/by-day", params={"since": "2999-01-01T00:00:00"}).json() == []
+    assert len(client.get(f"/api/meetings/{meeting.id}/usage").json()) == 4
+
+
+class _Completions:
+    """Fails with ``errors`` in turn, then answers"""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        message = SimpleNamespace(content='{"bullets": ["ok"], "decisions": [], "risks": []}')
+        return SimpleNamespace(
+            model="gpt-4o-mini", choices=[SimpleNamespace(message=message)],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5),
+        )
+
+
+def _openai(completions, monkeypatch):
+    monkeypatch.setattr(openai_provider, "RETRY_BASE_DELAY_SEC", 0.0)
+    provider = OpenAIProvider("sk-test")
+    assert provider.client.max_retries == 0
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return provider
+
+
+def _connection_error():
+    return openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+
+
+def test_openai_retries_are_counted_in_the_ledger(ledger, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)  # the provider logs parsed responses under ./logs
+    completions = _Completions(_connection_error(), _connection_error())
+    provider = _openai(completions, monkeypatch)
+
+    with provider_call("summarize", "openai"):
+        data = asyncio.run(provider.summarize("We met.", known_actions=[]))
+    assert data.bullets == ["ok"]
+    assert completions.calls == 3
+    assert ledger._buffer[-1]["retries"] == 2
+
+
+def test_openai_gives_up_after_the_configured_retries(ledger, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(get_settings(), "provider_max_retries", 1)
+    completions = _Completions(*(_connection_error() for _ in range(3)))
+    provider = _openai(completions, monkeypatch)
+
+    with pytest.raises(Exception, match="Connection error"):
+        with provider_call("summarize", "openai"):
+            asyncio.run(provider.summarize("We met.", known_actions=[]))
+    assert completions.calls == 2
+    assert (ledger._buffer[-1]["status"], ledger._buffer[-1]["retries"]) == ("error", 1)